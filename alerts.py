@@ -0,0 +1,202 @@
+import json
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from attribution import describe
+try:
+    import winsound
+    HAS_WINSOUND = True
+except ImportError:
+    HAS_WINSOUND = False
+
+DEFAULT_RULES = [
+    {"metric": "cpu", "threshold": 92, "clear": 85, "min_duration": 3, "cooldown": 60, "label": "CPU"},
+    {"metric": "ram", "threshold": 92, "clear": 88, "min_duration": 3, "cooldown": 60, "label": "RAM"},
+]
+
+class Incident:
+    def __init__(self, rule, start, value):
+        self.metric = rule.metric
+        self.label = rule.label
+        self.threshold = rule.threshold
+        self.start = start
+        self.end = None
+        self.peak = value
+        self.peak_ts = start
+        # Filled by the engine's ProcessAttribution: resource -> [(process name, rate)], ranked by `resource`
+        self.resource = "cpu"
+        self.offenders = {}
+
+    def culprits(self, n=3):
+        return describe(self.offenders, self.resource, n)
+
+    def duration(self):
+        return (self.end or time.time()) - self.start
+
+    def to_dict(self):
+        return {"metric": self.metric, "label": self.label, "threshold": self.threshold, "start": self.start,
+                "end": self.end, "peak": self.peak, "peak_ts": self.peak_ts,
+                "offenders": {r: [{"name": n, "rate": v} for n, v in rows] for r, rows in self.offenders.items()}}
+
+class Rule:
+    # idle -> pending (above threshold, waiting for min_duration) -> active (incident open)
+    # -> idle once the value drops to `clear` (hysteresis). No new incident opens within `cooldown`.
+    def __init__(self, metric, threshold, clear=None, min_duration=0.0, cooldown=0.0, label=None):
+        self.metric = metric
+        self.threshold = threshold
+        self.clear = threshold if clear is None else clear
+        self.min_duration = min_duration
+        self.cooldown = cooldown
+        self.label = label or metric.upper()
+        self.state = "idle"
+        self.since = 0.0
+        self.last_end = float("-inf")
+        self.incident = None
+
+    def step(self, val, now):
+        if self.state == "active":
+            inc = self.incident
+            if val > inc.peak:
+                inc.peak, inc.peak_ts = val, now
+            if val <= self.clear:
+                inc.end = now
+                self.state, self.incident, self.last_end = "idle", None, now
+                return "end", inc
+            return None
+        if val < self.threshold:
+            self.state = "idle"
+            return None
+        if self.state == "idle":
+            if now - self.last_end < self.cooldown: return None
+            self.state, self.since = "pending", now
+            self.incident = Incident(self, now, val)
+        inc = self.incident
+        if val > inc.peak:
+            inc.peak, inc.peak_ts = val, now
+        if now - self.since >= self.min_duration:
+            self.state = "active"
+            return "start", inc
+        return None
+
+class SoundSink:
+    def emit(self, events):
+        if HAS_WINSOUND and any(kind == "start" for kind, _ in events):
+            try: winsound.Beep(1000, 200)
+            except RuntimeError: pass
+
+class FileSink:
+    # Same daily peak_log_YYYYMMDD.txt as before, but one line per incident instead of one per tick
+    def emit(self, events):
+        ends = [inc for kind, inc in events if kind == "end"]
+        if not ends: return
+        fn = f"peak_log_{datetime.now().strftime('%Y%m%d')}.txt"
+        t = lambda ts: datetime.fromtimestamp(ts).strftime('%H:%M:%S')
+        with open(fn, "a") as f:
+            for inc in ends:
+                top = inc.culprits()
+                f.write(f"[{t(inc.peak_ts)}] PEAK: {inc.label} @ {inc.peak:.1f}% ({t(inc.start)}-{t(inc.end)}, {inc.duration():.0f}s)"
+                        + (f" top: {top}" if top else "") + "\n")
+
+class DesktopSink:
+    def emit(self, events):
+        starts = [inc for kind, inc in events if kind == "start"]
+        if not starts: return
+        try:
+            from plyer import notification
+        except ImportError:
+            return
+        msg = ", ".join(f"{inc.label} @ {inc.peak:.0f}%" + (f" ({inc.culprits(1)})" if inc.offenders else "") for inc in starts)
+        try: notification.notify(title="SysPulse Alert", message=msg, app_name="SysPulse", timeout=5)
+        except Exception: pass
+
+class WebhookSink:
+    def __init__(self, url, timeout=2.0):
+        self.url = url
+        self.timeout = timeout
+
+    def emit(self, events):
+        body = json.dumps([{"event": kind, **inc.to_dict()} for kind, inc in events]).encode()
+        import urllib.request  # sink thread only; keeps http.client off the startup path
+        req = urllib.request.Request(self.url, data=body, headers={"Content-Type": "application/json"})
+        try: urllib.request.urlopen(req, timeout=self.timeout).close()
+        except OSError: pass
+
+class SinkQueue:
+    # Delivers events on a background thread, batching whatever arrives within `window` seconds
+    def __init__(self, sinks, window=0.5, max_batch=100):
+        self.sinks = sinks
+        self.window = window
+        self.max_batch = max_batch
+        self.q = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="alert-sinks")
+        self._thread.start()
+
+    def put(self, event):
+        self.q.put(event)
+
+    def _run(self):
+        while True:
+            first = self.q.get()
+            if first is None: return
+            batch = [first]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                try: ev = self.q.get(timeout=max(0, deadline - time.monotonic()))
+                except queue.Empty: break
+                if ev is None:
+                    self._deliver(batch)
+                    return
+                batch.append(ev)
+            self._deliver(batch)
+
+    def _deliver(self, batch):
+        for sink in self.sinks:
+            try: sink.emit(batch)
+            except Exception: pass
+
+    def stop(self):
+        self.q.put(None)
+
+def build_sinks(config):
+    sinks = []
+    names = config.get("alert_sinks", ["sound", "file", "desktop"])
+    if "sound" in names: sinks.append(SoundSink())
+    if "file" in names: sinks.append(FileSink())
+    if "desktop" in names: sinks.append(DesktopSink())
+    if config.get("alert_webhook"): sinks.append(WebhookSink(config["alert_webhook"]))
+    return sinks
+
+class AlertEngine:
+    def __init__(self, rules=None, sinks=None):
+        self.rules = [Rule(**r) for r in (DEFAULT_RULES if rules is None else rules)]
+        self.sinks = SinkQueue(sinks or [])
+        self.incidents = deque(maxlen=100)
+        self.active = {}
+        self.attribution = None  # attribution.ProcessAttribution; incidents then carry their top offenders
+
+    def evaluate(self, values, now=None):
+        # One state-machine step per rule; sinks never run on the calling thread
+        now = time.time() if now is None else now
+        for rule in self.rules:
+            val = values.get(rule.metric)
+            if val is None: continue
+            ev = rule.step(val, now)
+            if ev is None: continue
+            kind, inc = ev
+            if kind == "start":
+                self.active[rule.metric] = inc
+                if self.attribution: self.attribution.begin(inc)
+            else:
+                self.active.pop(rule.metric, None)
+                if self.attribution: self.attribution.end(inc)
+                self.incidents.append(inc)
+            self.sinks.put(ev)
+
+    def busy(self):
+        # Some rule is pending or active, i.e. its timing depends on frequent samples
+        return any(r.state != "idle" for r in self.rules)
+
+    def stop(self):
+        self.sinks.stop()
@@ -0,0 +1,204 @@
+import bisect
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from array import array
+from history import numpy
+
+# Segment layout: a 4 KiB header (fixed part + JSON field list) followed by fixed-width records
+# of one float64 timestamp and one float32 per field. Every INDEX_STRIDE-th timestamp is also
+# appended to a small ".idx" sidecar so range queries only touch the pages they need.
+MAGIC = b"SPA1"
+VERSION = 1
+HEADER_SIZE = 4096
+HEADER = struct.Struct("<4sHHII")  # magic, version, record size, capacity, record count
+COUNT_OFFSET = 12
+INDEX_STRIDE = 64
+SEGMENT_RECORDS = 86400  # one day at 1 Hz, ~2.6 MB with the default fields
+
+FIELDS = ("cpu", "ram", "cpu_t", "gpu_v", "gpu_t", "vram")
+
+class Segment:
+    def __init__(self, path, fields=None, capacity=SEGMENT_RECORDS, writable=False):
+        self.path = path
+        self.idx_path = path[:-4] + ".idx"
+        if fields is not None:
+            self._create(path, fields, capacity)
+        self.writable = writable
+        self.f = open(path, "r+b" if writable else "rb")
+        self.mm = mmap.mmap(self.f.fileno(), 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+        magic, version, rsize, self.capacity, _ = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path}: not a SysPulse archive segment")
+        n = struct.unpack_from("<H", self.mm, HEADER.size)[0]
+        self.fields = tuple(json.loads(bytes(self.mm[HEADER.size + 2:HEADER.size + 2 + n])))
+        self.rec = struct.Struct("<d" + "f" * len(self.fields))
+        self.idx = open(self.idx_path, "ab") if writable else None
+
+    @staticmethod
+    def _create(path, fields, capacity):
+        rec = struct.Struct("<d" + "f" * len(fields))
+        names = json.dumps(list(fields)).encode()
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, rec.size, capacity, 0))
+            f.write(struct.pack("<H", len(names)) + names)
+            f.truncate(HEADER_SIZE + rec.size * capacity)
+        open(path[:-4] + ".idx", "wb").close()
+
+    @property
+    def count(self):
+        return struct.unpack_from("<I", self.mm, COUNT_OFFSET)[0]
+
+    def full(self):
+        return self.count >= self.capacity
+
+    def append(self, ts, values):
+        n = self.count
+        self.rec.pack_into(self.mm, HEADER_SIZE + n * self.rec.size, ts, *values)
+        # The count is published after the record, so a reader never sees a half-written row
+        struct.pack_into("<I", self.mm, COUNT_OFFSET, n + 1)
+        if n % INDEX_STRIDE == 0:
+            self.idx.write(struct.pack("<d", ts))
+            self.idx.flush()
+
+    def ts_at(self, i):
+        return struct.unpack_from("<d", self.mm, HEADER_SIZE + i * self.rec.size)[0]
+
+    def first_ts(self):
+        return self.ts_at(0) if self.count else None
+
+    def last_ts(self):
+        n = self.count
+        return self.ts_at(n - 1) if n else None
+
+    def find(self, t):
+        # First record with ts >= t: the sparse index narrows it to one stride, then bisect inside
+        n = self.count
+        index = array("d")
+        try:
+            with open(self.idx_path, "rb") as f: index.frombytes(f.read())
+        except OSError: pass
+        j = bisect.bisect_left(index, t)
+        lo = max(0, (j - 1) * INDEX_STRIDE)
+        hi = min(n, j * INDEX_STRIDE) if j < len(index) else n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.ts_at(mid) < t: lo = mid + 1
+            else: hi = mid
+        return lo
+
+    def read(self, i0, i1, fields):
+        cols = {"t": array("d")}
+        cols.update({f: array("d") for f in fields})
+        if i1 <= i0: return cols
+        pos = {f: self.fields.index(f) for f in fields if f in self.fields}
+        np = numpy()
+        if np:
+            dtype = np.dtype([("t", "<f8")] + [(f, "<f4") for f in self.fields])
+            rows = np.frombuffer(self.mm, dtype=dtype, count=i1 - i0, offset=HEADER_SIZE + i0 * self.rec.size)
+            cols["t"].frombytes(rows["t"].tobytes())
+            for f in fields:
+                col = rows[f].astype("<f8") if f in pos else np.full(i1 - i0, np.nan)
+                cols[f].frombytes(col.tobytes())
+            del rows
+            return cols
+        with memoryview(self.mm) as mv:
+            for row in self.rec.iter_unpack(mv[HEADER_SIZE + i0 * self.rec.size:HEADER_SIZE + i1 * self.rec.size]):
+                cols["t"].append(row[0])
+                for f in fields:
+                    cols[f].append(row[pos[f] + 1] if f in pos else float("nan"))
+        return cols
+
+    def close(self):
+        try: self.mm.close()
+        except (BufferError, ValueError): pass
+        self.f.close()
+        if self.idx: self.idx.close()
+
+class MetricsArchive:
+    # Append-only, segment-rotated store. Only the engine thread appends; queries may come from any thread.
+    def __init__(self, path="archive", fields=FIELDS, retention_days=7, segment_records=SEGMENT_RECORDS):
+        self.path = path
+        self.fields = tuple(fields)
+        self.retention = retention_days * 86400
+        self.segment_records = segment_records
+        self.current = None
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        self.enforce_retention()  # segments that expired while nothing was running
+
+    def segment_paths(self):
+        names = sorted(n for n in os.listdir(self.path) if n.startswith("seg_") and n.endswith(".spa"))
+        return [os.path.join(self.path, n) for n in names]
+
+    def _open_current(self, ts):
+        paths = self.segment_paths()
+        if paths:
+            # Resume the last segment after a restart if it is compatible and has room
+            try:
+                seg = Segment(paths[-1], writable=True)
+                if seg.fields == self.fields and not seg.full():
+                    return seg
+                seg.close()
+            except (OSError, ValueError):
+                pass
+        path = os.path.join(self.path, f"seg_{int(ts * 1000):015d}.spa")
+        return Segment(path, self.fields, self.segment_records, writable=True)
+
+    def append(self, ts, values):
+        with self._lock:
+            if self.current is None or self.current.full():
+                if self.current:
+                    self.current.close()
+                    self.enforce_retention(ts)
+                self.current = self._open_current(ts)
+            self.current.append(ts, [values.get(f, 0.0) or 0.0 for f in self.fields])
+
+    def enforce_retention(self, now=None):
+        # Runs on open, on every segment rotation and from the engine's hourly "retention" job, so a
+        # slow-filling archive still sheds old segments; only ever called from the appending thread
+        cutoff = (now or time.time()) - self.retention
+        current = self.current.path if self.current else None
+        for path in self.segment_paths():
+            if path == current: continue
+            try:
+                seg = Segment(path)
+                last = seg.last_ts()
+                seg.close()
+            except (OSError, ValueError):
+                continue
+            if last is None or last < cutoff:
+                for p in (path, path[:-4] + ".idx"):
+                    try: os.remove(p)
+                    except OSError: pass
+
+    def query(self, t0, t1, fields=None):
+        # Returns {"t": array, field: array, ...} for t0 <= ts < t1, reading only the matching records
+        fields = tuple(fields or self.fields)
+        out = {"t": array("d")}
+        out.update({f: array("d") for f in fields})
+        paths = self.segment_paths()
+        starts = [int(os.path.basename(p)[4:-4]) / 1000 for p in paths]
+        first = max(0, bisect.bisect_right(starts, t0) - 1)
+        for i in range(first, len(paths)):
+            if starts[i] >= t1: break
+            try: seg = Segment(paths[i])
+            except (OSError, ValueError): continue
+            try:
+                cols = seg.read(seg.find(t0), seg.find(t1), fields)
+            finally:
+                seg.close()
+            for k, col in cols.items():
+                out[k].extend(col)
+        return out
+
+    def close(self):
+        with self._lock:
+            if self.current:
+                self.current.mm.flush()
+                self.current.close()
+                self.current = None
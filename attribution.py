@@ -0,0 +1,177 @@
+import heapq
+import math
+import os
+import sys
+import time
+import psutil
+
+# What each resource's weight is per sample, and how a rate over a window is shown:
+#   cpu  CPU seconds         -> % of one core
+#   rss  resident MB x sec   -> MB
+#   io   bytes read+written  -> B/s
+#   ctx  context switches    -> switches/s
+RESOURCES = ("cpu", "rss", "io", "ctx")
+UNITS = {"cpu": ("%", 100.0), "rss": (" MB", 1.0), "io": (" B/s", 1.0), "ctx": ("/s", 1.0)}
+# Alert metric -> resource its offenders are ranked by (anything else: cpu)
+METRIC_RESOURCE = {"cpu": "cpu", "ram": "rss", "cpu_t": "cpu"}
+ATTRS = ("name", "create_time", "cpu_times", "memory_info", "io_counters", "num_ctx_switches")
+
+def iter_psutil():
+    # (pid, name, start, cpu seconds, rss bytes, io bytes, context switches) per process
+    for p in psutil.process_iter(ATTRS, ad_value=None):
+        info = p.info
+        times = info["cpu_times"]
+        if times is None: continue
+        io, ctx, mem = info["io_counters"], info["num_ctx_switches"], info["memory_info"]
+        yield (p.pid, info["name"] or str(p.pid), info["create_time"], times.user + times.system,
+               mem.rss if mem else 0, io.read_bytes + io.write_bytes if io else 0,
+               ctx.voluntary + ctx.involuntary if ctx else 0)
+
+def iter_proc(root="/proc"):
+    # Same tuples straight from /proc/<pid>/{stat,status,io}, about half the cost of psutil's per-process
+    # objects. io is only readable for our own processes without privileges and counts as 0 otherwise.
+    tick = os.sysconf("SC_CLK_TCK")
+    page = os.sysconf("SC_PAGE_SIZE")
+    for entry in os.scandir(root):
+        if not entry.name.isdigit(): continue
+        base = entry.path
+        try:
+            with open(base + "/stat", "rb") as f: stat = f.read()
+            with open(base + "/status", "rb") as f: status = f.read()
+        except OSError:
+            continue  # exited meanwhile
+        i = stat.rfind(b")")
+        fields = stat[i + 2:].split()
+        ctx = 0
+        for key in (b"voluntary_ctxt_switches:", b"nonvoluntary_ctxt_switches:"):
+            j = status.find(key)
+            if j >= 0: ctx += int(status[j + len(key):status.index(b"\n", j)])
+        io = 0
+        try:
+            with open(base + "/io", "rb") as f:
+                for line in f:
+                    if line.startswith((b"read_bytes", b"write_bytes")): io += int(line.split()[1])
+        except OSError:
+            pass
+        yield (int(entry.name), stat[stat.find(b"(") + 1:i].decode(errors="replace"), int(fields[19]),
+               (int(fields[11]) + int(fields[12])) / tick, int(fields[21]) * page, io, ctx)
+
+class SpaceSaving:
+    # Weighted Space-Saving (Metwally et al., 2005): at most k counters. An unseen key takes over the
+    # smallest counter and inherits its count as its error bound, so any key whose true total exceeds
+    # total/k is guaranteed to be present and counts are over-estimated by at most `error`.
+    # The smallest counter comes from a lazy min-heap with one (count, key) entry per key. Weights are
+    # positive, so an entry can only lag behind its counter: adding to a tracked key stays a dict update,
+    # and an eviction re-pushes stale entries it meets at the top until the top is current, O(log k)
+    # amortized instead of a scan over all k counters.
+    __slots__ = ("k", "counts", "errors", "heap")
+
+    def __init__(self, k=64):
+        self.k = k
+        self.counts = {}
+        self.errors = {}
+        self.heap = []
+
+    def add(self, key, w):
+        c = self.counts
+        if key in c:
+            c[key] += w
+        elif len(c) < self.k:
+            c[key] = w
+            self.errors[key] = 0.0
+            heapq.heappush(self.heap, (w, key))
+        else:
+            heap = self.heap
+            while heap[0][0] != c[heap[0][1]]:
+                heapq.heapreplace(heap, (c[heap[0][1]], heap[0][1]))
+            floor, victim = heap[0]
+            del c[victim], self.errors[victim]
+            c[key] = floor + w
+            self.errors[key] = floor
+            heapq.heapreplace(heap, (floor + w, key))
+
+    def decay(self, f):
+        for key in self.counts:
+            self.counts[key] *= f
+            self.errors[key] *= f
+        # Scaling every entry by the same f > 0 keeps the heap ordered (and stale entries stale)
+        self.heap = [(count * f, key) for count, key in self.heap]
+
+    def top(self, n):
+        # [(key, count, error)], largest first
+        best = sorted(self.counts.items(), key=lambda kv: kv[1], reverse=True)[:n]
+        return [(key, count, self.errors[key]) for key, count in best]
+
+class ProcessAttribution:
+    # Per-process CPU, RSS, disk I/O and context-switch deltas on every sample(). Instances are told apart
+    # by (pid, start time) only while alive; the heavy-hitter summaries key by process name, so a build
+    # forking thousands of short-lived compilers shows up as one offender and memory stays at k counters
+    # per resource however many processes come and go.
+    #   recent: exponentially decayed summaries (half_life seconds), what is heavy right now
+    #   begin(incident) / end(incident): a fresh summary per open incident, covering exactly its window
+    def __init__(self, k=64, half_life=30.0, clock=time.monotonic):
+        self.source = iter_proc if sys.platform.startswith("linux") and os.path.exists("/proc/self/stat") else iter_psutil
+        self.k = k
+        self.half_life = half_life
+        self.clock = clock
+        self.prev = {}  # pid -> (start time, cpu seconds, io bytes, context switches)
+        self.recent = {r: SpaceSaving(k) for r in RESOURCES}
+        self.windows = {}  # id(incident) -> (start, {resource: SpaceSaving})
+        self.samples = 0
+        self._last = None
+
+    def sample(self):
+        now = self.clock()
+        dt = now - self._last if self._last is not None else 0.0
+        self._last = now
+        if dt > 0:
+            f = 0.5 ** (dt / self.half_life)
+            for s in self.recent.values(): s.decay(f)
+        sinks = [self.recent] + [w for _, w in self.windows.values()]
+        prev = self.prev
+        alive = {}
+        for pid, name, start, cpu, rss, io, ctx in self.source():
+            cur = (start, cpu, io, ctx)
+            alive[pid] = cur
+            old = prev.get(pid)
+            if old is None or old[0] != start:
+                old = None if self.samples else cur  # first sample only sets baselines
+            weights = (("cpu", cpu - old[1] if old else cpu),
+                       ("rss", rss / 1048576 * dt),
+                       ("io", io - old[2] if old else io),
+                       ("ctx", ctx - old[3] if old else ctx))
+            # A process born since the last sample is charged everything it used so far
+            for r, w in weights:
+                if w > 0:
+                    for summaries in sinks: summaries[r].add(name, w)
+        self.prev = alive
+        self.samples += 1
+
+    def top(self, resource, n=5):
+        # Recent offenders as (name, rate) in the resource's display units
+        tau = self.half_life / math.log(2)  # a steady rate r accumulates r * tau in a decayed sum
+        scale = UNITS[resource][1]
+        return [(key, count / tau * scale) for key, count, _ in self.recent[resource].top(n)]
+
+    def offenders(self, n=5):
+        return {r: self.top(r, n) for r in RESOURCES}
+
+    def begin(self, incident, n=5):
+        # Incident opened: start its own window and attach who is heavy right now
+        self.windows[id(incident)] = (self.clock(), {r: SpaceSaving(self.k) for r in RESOURCES})
+        incident.resource = METRIC_RESOURCE.get(incident.metric, "cpu")
+        incident.offenders = self.offenders(n)
+
+    def end(self, incident, n=5):
+        # Incident closed: replace the snapshot with totals over its whole window
+        entry = self.windows.pop(id(incident), None)
+        if entry is None: return
+        start, summaries = entry
+        span = max(self.clock() - start, 1e-9)
+        incident.offenders = {r: [(key, count / span * UNITS[r][1]) for key, count, _ in s.top(n)]
+                              for r, s in summaries.items() if s.counts} or incident.offenders
+
+def describe(offenders, resource, n=3):
+    # "stress 180%, python 12%"
+    unit = UNITS[resource][0]
+    return ", ".join(f"{name} {v:.0f}{unit}" for name, v in (offenders or {}).get(resource, [])[:n])
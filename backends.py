@@ -0,0 +1,163 @@
+import os
+import sys
+import psutil
+
+# One combined sample per fast tick. Counter maps hold plain tuples:
+#   net:  nic -> (bytes_recv, bytes_sent, packets_recv, packets_sent)
+#   disk: dev -> (read_bytes, write_bytes, read_count, write_count, read_time + write_time in ms)
+#   cores: one (user, system, iowait, idle, total) cumulative-time tuple per logical CPU
+# net_wrap/disk_wrap: per-field modulus of those counters where they can wrap, None where they cannot
+class Sample:
+    __slots__ = ("cpu", "mem_total", "mem_used", "mem_percent", "net", "disk", "cores")
+
+    def __init__(self):
+        self.cpu = 0.0
+        self.mem_total = self.mem_used = 0
+        self.mem_percent = 0.0
+        self.net = {}
+        self.disk = {}
+        self.cores = []
+
+class PsutilBackend:
+    name = "psutil"
+    # psutil's io counters default to nowrap=True and already unwind wraps across calls
+    net_wrap = disk_wrap = None
+
+    def __init__(self):
+        self.sample_obj = Sample()
+        psutil.cpu_percent()  # baseline for the first interval
+
+    def sample(self):
+        s = self.sample_obj
+        s.cpu = psutil.cpu_percent()
+        vm = psutil.virtual_memory()
+        s.mem_total, s.mem_used, s.mem_percent = vm.total, vm.used, vm.percent
+        s.net = {nic: (c.bytes_recv, c.bytes_sent, c.packets_recv, c.packets_sent)
+                 for nic, c in psutil.net_io_counters(pernic=True).items()}
+        s.disk = {dev: (c.read_bytes, c.write_bytes, c.read_count, c.write_count, c.read_time + c.write_time)
+                  for dev, c in (psutil.disk_io_counters(perdisk=True) or {}).items()}
+        s.cores = [core_times(t) for t in psutil.cpu_times(percpu=True)]
+        return s
+
+def core_times(t):
+    # Folds the platform-specific cpu_times fields into (user, system, iowait, idle, total)
+    user = t.user + getattr(t, "nice", 0.0)
+    system = t.system + sum(getattr(t, f, 0.0) for f in ("irq", "softirq", "interrupt", "dpc"))
+    iowait = getattr(t, "iowait", 0.0)
+    total = sum(t) - getattr(t, "guest", 0.0) - getattr(t, "guest_nice", 0.0)
+    return user, system, iowait, t.idle, total
+
+class ProcFile:
+    # Kept open for the life of the engine and re-read from offset 0 with preadv into one reusable buffer
+    def __init__(self, path, size=16384):
+        self.fd = os.open(path, os.O_RDONLY)
+        self.buf = bytearray(size)
+
+    def read(self):
+        while True:
+            n = os.preadv(self.fd, [self.buf], 0)
+            if n < len(self.buf): return n
+            self.buf = bytearray(len(self.buf) * 2)
+
+    def close(self):
+        os.close(self.fd)
+
+def _kb(buf, n, key):
+    i = buf.find(key, 0, n)
+    if i < 0: return None
+    i += len(key)
+    return int(buf[i:buf.index(b"k", i)]) * 1024
+
+class LinuxBackend:
+    # Reads /proc/stat, /proc/meminfo, /proc/net/dev and /proc/diskstats directly and computes the
+    # same numbers psutil does (cpu_percent, virtual_memory, net/disk io counters) without namedtuples
+    name = "linux"
+    # /proc/net/dev and /proc/diskstats print unsigned longs: 32 bits on a 32-bit kernel (diskstats
+    # counts 512-byte sectors, so its byte fields wrap at 2**32 sectors), 64 bits everywhere else
+    if sys.maxsize < 2 ** 32:
+        net_wrap = (2 ** 32,) * 4
+        disk_wrap = (2 ** 41, 2 ** 41, 2 ** 32, 2 ** 32, 2 ** 32)
+    else:
+        net_wrap = disk_wrap = None
+
+    def __init__(self, root="/proc"):
+        self.stat = ProcFile(f"{root}/stat")
+        self.meminfo = ProcFile(f"{root}/meminfo")
+        self.netdev = ProcFile(f"{root}/net/dev")
+        self.diskstats = ProcFile(f"{root}/diskstats")
+        self.sample_obj = Sample()
+        self._cpu = None
+        self.read_cpu()
+
+    def read_cpu(self):
+        n = self.stat.read()
+        # "cpu  user nice system idle iowait irq softirq steal guest guest_nice", then one "cpuN" line per core.
+        # guest/guest_nice are already included in user/nice, so they are left out like psutil does.
+        cores = []
+        agg = None
+        for line in bytes(self.stat.buf[:n]).split(b"\n"):
+            if not line.startswith(b"cpu"): break
+            f = [int(x) for x in line.split()[1:9]]
+            if agg is None:
+                agg = f
+            else:
+                cores.append((f[0] + f[1], f[2] + f[5] + f[6], f[4], f[3], sum(f)))
+        self.sample_obj.cores = cores
+        total = sum(agg)
+        idle = agg[3] + agg[4]
+        prev, self._cpu = self._cpu, (total, idle)
+        if prev is None: return 0.0
+        dt = total - prev[0]
+        if dt <= 0: return 0.0
+        return round(min(100.0, max(0.0, (dt - (idle - prev[1])) / dt * 100)), 1)
+
+    def read_mem(self):
+        n = self.meminfo.read()
+        buf = self.meminfo.buf
+        total = _kb(buf, n, b"MemTotal:")
+        free = _kb(buf, n, b"MemFree:")
+        buffers = _kb(buf, n, b"Buffers:") or 0
+        cached = (_kb(buf, n, b"\nCached:") or 0) + (_kb(buf, n, b"SReclaimable:") or 0)
+        avail = _kb(buf, n, b"MemAvailable:")
+        if avail is None: avail = free + buffers + cached
+        # Same definition as psutil >= 6: used = total - available
+        used = total - avail
+        return total, used, round(used / total * 100, 1)
+
+    def read_net(self):
+        n = self.netdev.read()
+        out = {}
+        # Two header lines, then "  nic: rx_bytes rx_packets ... (8 rx fields) tx_bytes tx_packets ..."
+        for line in bytes(self.netdev.buf[:n]).splitlines()[2:]:
+            name, _, rest = line.partition(b":")
+            f = rest.split()
+            out[name.strip().decode()] = (int(f[0]), int(f[8]), int(f[1]), int(f[9]))
+        return out
+
+    def read_disk(self):
+        n = self.diskstats.read()
+        out = {}
+        # "major minor name reads merged sectors read_ms writes merged sectors write_ms ..."
+        for line in bytes(self.diskstats.buf[:n]).splitlines():
+            f = line.split()
+            if len(f) < 11: continue
+            out[f[2].decode()] = (int(f[5]) * 512, int(f[9]) * 512, int(f[3]), int(f[7]), int(f[6]) + int(f[10]))
+        return out
+
+    def sample(self):
+        s = self.sample_obj
+        s.cpu = self.read_cpu()
+        s.mem_total, s.mem_used, s.mem_percent = self.read_mem()
+        s.net = self.read_net()
+        s.disk = self.read_disk()
+        return s
+
+    def close(self):
+        for f in (self.stat, self.meminfo, self.netdev, self.diskstats):
+            f.close()
+
+def make_backend(name="auto"):
+    if name in ("auto", "linux") and sys.platform.startswith("linux") and hasattr(os, "preadv"):
+        try: return LinuxBackend()
+        except (OSError, ValueError): pass
+    return PsutilBackend()
@@ -0,0 +1,457 @@
+import argparse
+import gc
+import json
+import math
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import tkinter as tk
+from collections import namedtuple
+
+def summarize(samples):
+    s = sorted(samples)
+    pick = lambda p: s[min(len(s) - 1, int(p / 100 * len(s)))]
+    return {"n": len(s), "mean_ms": sum(s) / len(s) * 1000, "p50_ms": pick(50) * 1000, "p99_ms": pick(99) * 1000}
+
+def fake_series(i, n=600, phase=0.0):
+    return [50 + 40 * math.sin((i + k) / 25 + phase) for k in range(n)]
+
+# ---- History chart: full matplotlib redraw vs blitting vs native canvas ----
+
+def bench_charts(frames=200):
+    from charts import BlitChart, TkLineChart
+
+    class FullRedrawChart(BlitChart):
+        # What the dashboard did before: rasterize the whole figure every tick
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            for ln in self.lines.values(): ln.set_animated(False)
+
+        def update(self, data):
+            for key, y in data.items(): self.lines[key].set_ydata(y)
+            self.canvas.draw()
+
+    lines = [("cpu", "CPU", "#3a7ebf"), ("ram", "RAM", "#e91e63")]
+    root = tk.Tk()
+    root.geometry("820x320")
+    results = {}
+    for name, engine in (("matplotlib_full", FullRedrawChart), ("matplotlib_blit", BlitChart), ("native", TkLineChart)):
+        box = tk.Frame(root)
+        box.pack(fill="both", expand=True)
+        chart = engine(box, lines, True)
+        chart.widget.pack(fill="both", expand=True)
+        root.update()
+        times = []
+        for i in range(frames):
+            data = {"cpu": fake_series(i), "ram": fake_series(i, phase=1.0)}
+            t0 = time.perf_counter()
+            chart.update(data)
+            root.update_idletasks()
+            times.append(time.perf_counter() - t0)
+        results[name] = summarize(times)
+        chart.destroy()
+        box.destroy()
+    root.destroy()
+    return results
+
+# ---- Deterministic fake psutil / NVML for the engine collectors ----
+
+_vmem = namedtuple("svmem", "total available percent used free")
+_netio = namedtuple("snetio", "bytes_sent bytes_recv packets_sent packets_recv errin errout dropin dropout")
+_diskio = namedtuple("sdiskio", "read_count write_count read_bytes write_bytes read_time write_time")
+_cputimes = namedtuple("scputimes", "user nice system idle iowait irq softirq steal guest guest_nice")
+_part = namedtuple("sdiskpart", "device mountpoint fstype opts")
+_usage = namedtuple("sdiskusage", "total used free percent")
+_batt = namedtuple("sbattery", "percent secsleft power_plugged")
+
+class FakePsutil:
+    # The parts of psutil the engine touches; every counter advances by a fixed, tick-derived step
+    Error = Exception
+
+    def __init__(self, ncores=8, nics=3, disks=2):
+        self.ncores, self.nics, self.disks = ncores, nics, disks
+        self.tick = 0
+
+    def _wave(self, k, lo=0.0, hi=100.0):
+        return lo + (hi - lo) * (0.5 + 0.5 * math.sin(self.tick / 17 + k))
+
+    def cpu_percent(self, interval=None, percpu=False):
+        self.tick += 1
+        return round(self._wave(0), 1)
+
+    def cpu_count(self, logical=True):
+        return self.ncores
+
+    def cpu_times(self, percpu=False):
+        t = self.tick
+        out = [_cputimes(100 + t * (1 + i % 3), t * 0.1, 50 + t * 0.5, 1000 + t * (3 - i % 3), t * 0.05, 0, t * 0.02, 0, 0, 0)
+               for i in range(self.ncores)]
+        return out if percpu else out[0]
+
+    def virtual_memory(self):
+        total = 16 * 1024 ** 3
+        pct = round(self._wave(1, 30, 70), 1)
+        used = int(total * pct / 100)
+        return _vmem(total, total - used, pct, used, total - used)
+
+    def net_io_counters(self, pernic=False):
+        t = self.tick
+        return {f"eth{i}": _netio(t * 4096 * (i + 1), t * 65536 * (i + 1), t * 4, t * 50, 0, 0, 0, 0) for i in range(self.nics)}
+
+    def disk_io_counters(self, perdisk=False):
+        t = self.tick
+        return {f"sd{chr(97 + i)}": _diskio(t * 10, t * 5, t * 40960, t * 20480, t * 3, t * 2) for i in range(self.disks)}
+
+    def disk_partitions(self, all=False):
+        return [_part(f"/dev/sd{chr(97 + i)}1", "/" if i == 0 else f"/mnt/d{i}", "ext4", "rw") for i in range(self.disks)]
+
+    def disk_usage(self, path):
+        return _usage(512 * 1024 ** 3, 256 * 1024 ** 3, 256 * 1024 ** 3, 50.0)
+
+    def sensors_battery(self):
+        return _batt(round(self._wave(2, 20, 100)), 3600, False)
+
+class FakeNVML:
+    _util = namedtuple("nvmlUtilization", "gpu memory")
+    _mem = namedtuple("nvmlMemory", "total free used")
+
+    def __init__(self, clock):
+        self.clock = clock
+
+    def nvmlDeviceGetUtilizationRates(self, handle):
+        return self._util(int(self.clock._wave(3)), 10)
+
+    def nvmlDeviceGetTemperature(self, handle, sensor):
+        return int(self.clock._wave(4, 40, 80))
+
+    def nvmlDeviceGetMemoryInfo(self, handle):
+        return self._mem(8 * 1024 ** 3, 6 * 1024 ** 3, 2 * 1024 ** 3)
+
+    def nvmlShutdown(self):
+        pass
+
+def fake_engine(workdir, ncores=8, **config):
+    # A SysEngine whose psutil/NVML calls all land on FakePsutil/FakeNVML (psutil backend, no sensors)
+    import backends, collectors, engine as engine_mod
+    from sensors import SensorHub
+    fake = FakePsutil(ncores)
+    for mod in (backends, collectors, engine_mod): mod.psutil = fake
+    eng = engine_mod.SysEngine({"backend": "psutil", "alert_sinks": [], "archive_enabled": True,
+                                "archive_dir": os.path.join(workdir, "archive"), **config})
+    eng.sensors = SensorHub(backends=[])
+    eng.nvml, eng.gpu_handle = FakeNVML(fake), "gpu0"
+    eng.callback = lambda stats: None
+    eng.scheduler.add("fast", eng.refresh_interval, eng.collect_fast)  # registered, never run
+    eng.collect_disks()
+    eng.collect_battery()
+    return eng, fake
+
+def rss_kb():
+    import psutil
+    return psutil.Process().memory_info().rss // 1024
+
+# ---- Engine: per-collector tick cost, allocations, RSS growth ----
+
+def bench_engine(ticks=2000, ncores=8):
+    with tempfile.TemporaryDirectory() as workdir:
+        eng, fake = fake_engine(workdir, ncores)
+        snap = eng.backend.sample()
+        cases = {
+            "collect_fast": eng.collect_fast,
+            "collect_disks": eng.collect_disks,
+            "collect_sensors": eng.collect_sensors,
+            "collect_battery": eng.collect_battery,
+            "backend.sample": eng.backend.sample,
+            "cores.sample": lambda: eng.cores.sample(snap.cores),
+            "netio.sample": lambda: eng.netio.sample(snap.net),
+            "diskio.sample_io": lambda: eng.diskio.sample_io(snap.disk),
+        }
+        results = {}
+        for name, fn in cases.items():
+            for _ in range(20): fn()  # warm caches, series and EWMA seeds
+            times = []
+            for _ in range(ticks):
+                t0 = time.perf_counter()
+                fn()
+                times.append(time.perf_counter() - t0)
+            results[name] = summarize(times)
+
+        # Allocation profile of a full tick; traced separately, tracemalloc slows everything down
+        tracemalloc.start()
+        peaks = []
+        for _ in range(200):
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            eng.collect_fast()
+            peaks.append(tracemalloc.get_traced_memory()[1] - base)
+        tracemalloc.stop()
+        peaks.sort()
+
+        # The collectors as the scheduler runs them: failures are counted per job instead of raised, so
+        # they only show up here
+        for name, fn in (("disks", eng.collect_disks), ("battery", eng.collect_battery), ("self", eng.monitor.sample),
+                         ("fast", eng.collect_fast)):
+            eng.scheduler.add(name, 0.005, fn)
+        runner = threading.Thread(target=eng.scheduler.run, daemon=True)
+        runner.start()
+        time.sleep(0.5)
+        eng.scheduler.stop()
+        runner.join()
+        jobs = eng.scheduler.report()
+        failing = [f"{name}:{r['last_error']}" for name, r in jobs.items() if r["errors"]]
+        results["scheduled"] = {"runs": sum(r["runs"] for r in jobs.values()), "errors": sum(r["errors"] for r in jobs.values()),
+                                "failing": "; ".join(failing) or "none"}
+
+        # Long run: anything still allocated afterwards (net of gc) grew with the tick count. Compressed
+        # history grows by design (bounded by its retention, see the history suite), so it is off here.
+        eng.stop()
+        eng, fake = fake_engine(os.path.join(workdir, "leak"), ncores, history_retention_hours=0)
+        for _ in range(20): eng.collect_fast()
+        gc.collect()
+        blocks0, rss0 = sys.getallocatedblocks(), rss_kb()
+        t0 = time.perf_counter()
+        for _ in range(ticks * 5): eng.collect_fast()
+        elapsed = time.perf_counter() - t0
+        gc.collect()
+        results["memory"] = {
+            "ticks": ticks * 5,
+            "alloc_peak_kb_p50": peaks[len(peaks) // 2] / 1024,
+            "alloc_peak_kb_max": peaks[-1] / 1024,
+            "retained_blocks_per_tick": (sys.getallocatedblocks() - blocks0) / (ticks * 5),
+            "rss_growth_kb": rss_kb() - rss0,
+            "ticks_per_s": ticks * 5 / elapsed,
+        }
+        eng.stop()
+    return results
+
+# ---- UI: on_engine_data, GaugeChart.draw, chart update (needs a display, e.g. xvfb-run) ----
+
+def bench_ui(frames=300):
+    try:
+        import customtkinter
+        from ui import MainApp, GaugeChart
+    except ImportError as e:
+        return {"skipped": {"reason": str(e)}}
+    from utils import ConfigManager
+    with tempfile.TemporaryDirectory() as workdir:
+        eng, fake = fake_engine(workdir)
+        for _ in range(5): eng.collect_fast()
+        try:
+            app = MainApp(dict(ConfigManager.DEFAULTS), eng)
+        except tk.TclError as e:
+            eng.stop()
+            return {"skipped": {"reason": str(e)}}
+        app.update()
+        gauge = GaugeChart(app, title="BENCH")
+        gauge.pack()
+        app.update()
+
+        def timed(fn):
+            times = []
+            for _ in range(frames):
+                eng.collect_fast()
+                data = eng.snapshots.current
+                t0 = time.perf_counter()
+                fn(data)
+                app.update_idletasks()
+                times.append(time.perf_counter() - t0)
+            return summarize(times)
+
+        def gauge_draw(data):
+            gauge.shown = data.cpu
+            gauge.draw()
+
+        results = {
+            "on_engine_data": timed(app.on_engine_data),
+            "gauge_draw": timed(gauge_draw),
+            "chart_update": timed(lambda data: app.draw_chart()),
+        }
+        app.destroy()
+        eng.stop()
+    return results
+
+# ---- Startup: imports, engine construction, first painted dashboard (fresh interpreter per run) ----
+
+STARTUP_SCRIPT = r"""
+import json, sys, time, threading
+t0 = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+out = {}
+from utils import ConfigManager
+from engine import SysEngine
+out["import_engine_ms"] = (time.perf_counter() - t0) * 1000
+config = dict(ConfigManager.DEFAULTS, archive_dir=sys.argv[2], alert_sinks=[])
+t = time.perf_counter()
+engine = SysEngine(config)
+out["engine_init_ms"] = (time.perf_counter() - t) * 1000
+try:
+    t = time.perf_counter()
+    from ui import MainApp
+    out["import_ui_ms"] = (time.perf_counter() - t) * 1000
+    app = MainApp(config, engine)
+    app.update()
+    out["first_paint_ms"] = (time.perf_counter() - t0) * 1000
+    threading.Thread(target=engine.update_loop, args=(app.dispatcher.submit,), daemon=True).start()
+    while not app.dispatcher.frames and time.perf_counter() - t0 < 10:
+        app.update()
+        time.sleep(0.002)
+    out["first_data_ms"] = (time.perf_counter() - t0) * 1000
+    app.update()
+    out["chart_ready"] = bool(getattr(app, "chart", None))
+    app.exit_app()
+except Exception as e:
+    out["ui_skipped"] = repr(e)[:200]
+    engine.stop()
+out["total_ms"] = (time.perf_counter() - t0) * 1000
+print(json.dumps(out))
+"""
+
+def bench_startup(runs=5):
+    import subprocess
+    here = os.path.dirname(os.path.abspath(__file__))
+    samples = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for _ in range(runs):
+            t0 = time.perf_counter()
+            res = subprocess.run([sys.executable, "-c", STARTUP_SCRIPT, here, os.path.join(workdir, "archive")],
+                                 capture_output=True, text=True, cwd=workdir, timeout=60)
+            wall = (time.perf_counter() - t0) * 1000
+            try: r = json.loads(res.stdout.strip().splitlines()[-1])
+            except (ValueError, IndexError): return {"failed": {"stderr": res.stderr[-500:]}}
+            r["process_ms"] = wall
+            samples.append(r)
+    results = {}
+    for key in samples[0]:
+        vals = [r[key] for r in samples if isinstance(r.get(key), float)]
+        if vals:
+            vals.sort()
+            results[key] = {"p50_ms": vals[len(vals) // 2], "max_ms": vals[-1]}
+        elif key == "ui_skipped":
+            results[key] = {"reason": samples[0][key]}
+    return results
+
+# ---- Compressed history chunks: size and codec throughput per signal shape ----
+
+def fake_signal(kind, n, seed=7):
+    # Deterministic 1 Hz samples with a few ms of scheduling jitter, shaped like real series
+    import random
+    rnd = random.Random(seed)
+    ts = 1.7e9
+    for i in range(n):
+        ts += 1.0 + rnd.uniform(-0.002, 0.002)
+        if kind == "cpu": v = round(max(0.0, 12 + 10 * math.sin(i / 300) + rnd.gauss(0, 4)), 1)
+        elif kind == "temp": v = float(round(55 + 8 * math.sin(i / 900)))
+        elif kind == "net": v = rnd.expovariate(1 / 800) if rnd.random() < 0.3 else 0.0
+        else: v = 0.0  # idle counter
+        yield ts, v
+
+def bench_history(n=20000):
+    from chunks import ChunkedSeries
+    from history import QUANTUM
+    results = {}
+    for kind in ("cpu", "temp", "net", "idle"):
+        points = list(fake_signal(kind, n))
+        for codec, quantum in (("quantized", QUANTUM), ("xor", None)):
+            series = ChunkedSeries(n * 2, quantum)
+            t0 = time.perf_counter()
+            for ts, v in points: series.add(ts, v)
+            encode = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            decoded = sum(1 for _ in series.iter())
+            decode = time.perf_counter() - t0
+            assert decoded == n
+            bps = series.nbytes() / n
+            results[f"{kind}_{codec}"] = {"bytes_per_sample": bps, "ratio": 16 / bps, "week_mb": bps * 604800 / 1e6,
+                                          "encode_us": encode / n * 1e6, "decode_us": decode / n * 1e6,
+                                          "decode_per_s": n / decode}
+
+    # Chart viewport over a day of 1 Hz history: per-frame cost should not grow with the range
+    from history import HistoryStore
+    from viewport import Viewport
+    history = HistoryStore(retention=86400)
+    for ts, v in fake_signal("cpu", 86400): history.add("cpu", v, ts)
+    now = [ts]
+    vp = Viewport(history, ("cpu",), clock=lambda: now[0])
+    gen = fake_signal("cpu", 400, seed=8)
+    for preset in ("1m", "10m", "1h", "24h"):
+        vp.set_range(preset)
+        times = []
+        for _ in range(100):
+            now[0] += 1.0
+            history.add("cpu", next(gen)[1], now[0])
+            t0 = time.perf_counter()
+            vp.query(800)
+            times.append(time.perf_counter() - t0)
+        results[f"viewport_{preset}"] = summarize(times)
+    vp.zoom(-7200, -3600)
+    t0 = time.perf_counter()
+    vp.query(800)
+    results["viewport_zoom_1h"] = {"cold_ms": (time.perf_counter() - t0) * 1000}
+    return results
+
+SUITES = {"charts": bench_charts, "engine": bench_engine, "ui": bench_ui, "startup": bench_startup, "history": bench_history}
+
+# Absolute budgets per (suite, case, metric); a result above its budget fails the run.
+# --baseline additionally fails anything that got slower than a previous run by more than --tolerance.
+BUDGETS = {
+    ("engine", "collect_fast", "p99_ms"): 5.0,
+    ("engine", "backend.sample", "p99_ms"): 2.0,
+    ("engine", "memory", "rss_growth_kb"): 2048,
+    ("engine", "memory", "retained_blocks_per_tick"): 0.1,
+    ("ui", "on_engine_data", "p99_ms"): 16.0,
+    ("ui", "gauge_draw", "p99_ms"): 2.0,
+    ("ui", "chart_update", "p99_ms"): 16.0,
+    ("startup", "first_paint_ms", "p50_ms"): 300.0,
+    ("startup", "import_engine_ms", "p50_ms"): 100.0,
+    ("history", "cpu_quantized", "bytes_per_sample"): 4.0,
+    ("history", "idle_quantized", "bytes_per_sample"): 1.5,
+    ("history", "cpu_quantized", "decode_us"): 10.0,
+    ("history", "viewport_24h", "p99_ms"): 16.0,
+}
+# Metrics compared against the baseline; lower is better for all of them
+REGRESSION_METRICS = ("p50_ms", "p99_ms", "alloc_peak_kb_p50", "retained_blocks_per_tick", "rss_growth_kb",
+                      "bytes_per_sample", "encode_us", "decode_us")
+
+def check(results, baseline=None, tolerance=0.25):
+    failures = []
+    for (suite, case, metric), limit in BUDGETS.items():
+        v = results.get(suite, {}).get(case, {}).get(metric)
+        if v is not None and v > limit:
+            failures.append(f"{suite}/{case} {metric}={v:.3f} over budget {limit}")
+    for suite, cases in (baseline or {}).items():
+        for case, old in cases.items():
+            new = results.get(suite, {}).get(case)
+            if not new or not isinstance(old, dict): continue
+            for metric in REGRESSION_METRICS:
+                if metric in old and metric in new and new[metric] > max(old[metric] * (1 + tolerance), old[metric] + 0.01):
+                    failures.append(f"{suite}/{case} {metric} {old[metric]:.3f} -> {new[metric]:.3f}")
+    return failures
+
+def main():
+    ap = argparse.ArgumentParser(description="SysPulse micro-benchmarks")
+    ap.add_argument("suite", nargs="*", default=list(SUITES), choices=list(SUITES))
+    ap.add_argument("--json", help="write results to this file")
+    ap.add_argument("--baseline", help="previous --json output to compare against")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs the baseline (0.25 = 25%%)")
+    args = ap.parse_args()
+
+    results = {}
+    for name in args.suite:
+        results[name] = SUITES[name]()
+        for case, r in results[name].items():
+            print(f"{name:>8} {case:<18} " + "  ".join(f"{k}={v:.3f}" if isinstance(v, float) else f"{k}={v}" for k, v in r.items()))
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f: baseline = json.load(f).get("results")
+    failures = check(results, baseline, args.tolerance)
+    for msg in failures: print("REGRESSION", msg)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"results": results, "budgets": {"/".join(k): v for k, v in BUDGETS.items()}, "failures": failures}, f, indent=4)
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+import tkinter as tk
+
+# Palette shared by both chart engines: (figure bg, plot bg, text/ticks, grid)
+THEMES = {
+    True: ("#1a1a1a", "#1e1e1e", "#dddddd", "#333333"),
+    False: ("#ffffff", "#f9f9f9", "#333333", "#dddddd"),
+}
+
+def fmt_offset(sec):
+    # Axis label for a time offset in seconds (<= 0): "now", "-45s", "-10m", "-6h"
+    sec = -sec
+    if sec < 1: return "now"
+    if sec < 120: return f"-{sec:.0f}s"
+    if sec < 7200: return f"-{sec / 60:.0f}m"
+    return f"-{sec / 3600:.0f}h"
+
+class BlitChart:
+    # matplotlib chart that renders axes, grid and legend once into a cached background and
+    # only redraws the line artists on top of it each frame
+    def __init__(self, master, lines, is_dark=True, ylim=(0, 105), npoints=600):
+        # matplotlib costs a few hundred ms to import, so only this engine pays for it, on first use
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        self.fig = Figure(figsize=(8, 3), dpi=100)
+        self.ax = self.fig.add_subplot()
+        self.ax.set_ylim(*ylim)
+        self.ax.set_xlim(0, npoints - 1)
+        self.ax.grid(True, linewidth=0.5)
+        self.lines = {}
+        for key, label, color in lines:
+            ln, = self.ax.plot(range(npoints), [0] * npoints, color=color, label=label, animated=True)
+            self.lines[key] = ln
+        self.legend = self.ax.legend(loc="upper right", frameon=False)
+
+        self.canvas = FigureCanvasTkAgg(self.fig, master=master)
+        self.fig.tight_layout()
+        self.widget = self.canvas.get_tk_widget()
+        self._bg = None
+        self._npoints = npoints
+        self._xlim = None
+        # Every full draw (first map, resize, restyle) refreshes the cached background
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+        self.restyle(is_dark)
+
+    def _on_draw(self, event):
+        self._bg = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_lines()
+
+    def _draw_lines(self):
+        for ln in self.lines.values():
+            self.ax.draw_artist(ln)
+        self.canvas.blit(self.fig.bbox)
+
+    def set_xlim(self, lo, hi):
+        # Switches to time mode: update() then takes (x, y) pairs with x in [lo, hi]
+        if self._xlim == (lo, hi): return
+        if self._xlim is None:
+            from matplotlib.ticker import FuncFormatter
+            self.ax.xaxis.set_major_formatter(FuncFormatter(lambda v, pos: fmt_offset(v)))
+        self._xlim = (lo, hi)
+        self.ax.set_xlim(lo, hi)
+        self._bg = None
+
+    def x_at(self, px):
+        # Data x under a widget pixel column (for drag-to-zoom)
+        ratio = getattr(self.canvas, "device_pixel_ratio", 1) or 1
+        return self.ax.transData.inverted().transform((px * ratio, 0))[0]
+
+    def update(self, data):
+        for key, y in data.items():
+            ln = self.lines[key]
+            if isinstance(y, tuple):
+                ln.set_data(*y)
+                continue
+            if len(y) != self._npoints:
+                self._npoints = len(y)
+                self.ax.set_xlim(0, max(1, self._npoints - 1))
+                self._bg = None
+            ln.set_data(range(len(y)), y)
+        if self._bg is None:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self._bg)
+        self._draw_lines()
+
+    def restyle(self, is_dark, colors=None):
+        fig_bg, ax_bg, fg, grid = THEMES[bool(is_dark)]
+        self.fig.patch.set_facecolor(fig_bg)
+        self.ax.set_facecolor(ax_bg)
+        self.ax.tick_params(colors=fg)
+        self.ax.grid(True, color=grid, linewidth=0.5)
+        for spine in self.ax.spines.values():
+            spine.set_color(grid)
+        for key, color in (colors or {}).items():
+            self.lines[key].set_color(color)
+        for text in self.legend.get_texts():
+            text.set_color(fg)
+        handles = getattr(self.legend, "legend_handles", None) or self.legend.legendHandles
+        for handle, ln in zip(handles, self.lines.values()):
+            handle.set_color(ln.get_color())
+        self._bg = None
+        self.canvas.draw_idle()
+
+    def destroy(self):
+        self.widget.destroy()
+        self.fig.clear()
+
+class TkLineChart:
+    # Native Tk canvas renderer: one polyline item per series, moved with coords() each frame
+    def __init__(self, master, lines, is_dark=True, ylim=(0, 105), height=300):
+        self.widget = tk.Canvas(master, height=height, highlightthickness=0)
+        self.ylim = ylim
+        self.w, self.h = 1, 1
+        self.pad = 8
+        self.xlim = None  # set_xlim() switches to (x, y) pairs
+        self._xs = (0, 0, ())
+        self._last = {}
+        self.grid = [self.widget.create_line(0, 0, 0, 0, width=1) for _ in range(4)]
+        self.lines = {}
+        self.labels = {}
+        for key, label, color in lines:
+            self.lines[key] = self.widget.create_line(0, 0, 0, 0, fill=color, width=1.5)
+            self.labels[key] = self.widget.create_text(0, 0, text=label, fill=color, anchor="ne", font=("Outfit", 9, "bold"))
+        self.widget.bind("<Configure>", self._on_resize)
+        self.restyle(is_dark)
+
+    def _on_resize(self, event):
+        self.w, self.h = max(1, event.width), max(1, event.height)
+        p = self.pad
+        for i, item in enumerate(self.grid):
+            y = self._y((i + 1) * 25)
+            self.widget.coords(item, p, y, self.w - p, y)
+        for i, item in enumerate(self.labels.values()):
+            self.widget.coords(item, self.w - p - 50 * i, p)
+        self._xs = (0, 0, ())
+        if self._last: self.update(self._last)
+
+    def _y(self, v):
+        lo, hi = self.ylim
+        return self.h - self.pad - (v - lo) / (hi - lo) * (self.h - 2 * self.pad)
+
+    def _x_positions(self, n):
+        if self._xs[:2] != (n, self.w):
+            step = (self.w - 2 * self.pad) / max(1, n - 1)
+            self._xs = (n, self.w, [self.pad + i * step for i in range(n)])
+        return self._xs[2]
+
+    def set_xlim(self, lo, hi):
+        self.xlim = (lo, hi)
+
+    def x_at(self, px):
+        lo, hi = self.xlim or (0, 1)
+        return lo + (px - self.pad) / max(1, self.w - 2 * self.pad) * (hi - lo)
+
+    def update(self, data):
+        self._last = data
+        lo, hi = self.ylim
+        scale = (self.h - 2 * self.pad) / (hi - lo)
+        base = self.h - self.pad + lo * scale
+        for key, y in data.items():
+            if isinstance(y, tuple):
+                x, y = y
+                x0, x1 = self.xlim
+                xscale = (self.w - 2 * self.pad) / ((x1 - x0) or 1)
+                xs = [self.pad + (v - x0) * xscale for v in x]
+            else:
+                xs = None
+            n = len(y)
+            if n < 2:
+                self.widget.coords(self.lines[key], 0, 0, 0, 0)
+                continue
+            xs = xs or self._x_positions(n)
+            coords = [0.0] * (2 * n)
+            coords[0::2] = xs
+            coords[1::2] = [base - v * scale for v in y]
+            self.widget.coords(self.lines[key], coords)
+
+    def restyle(self, is_dark, colors=None):
+        fig_bg, ax_bg, fg, grid = THEMES[bool(is_dark)]
+        self.widget.configure(bg=ax_bg)
+        for item in self.grid:
+            self.widget.itemconfig(item, fill=grid)
+        for key, color in (colors or {}).items():
+            self.widget.itemconfig(self.lines[key], fill=color)
+            self.widget.itemconfig(self.labels[key], fill=color)
+
+    def destroy(self):
+        self.widget.destroy()
+
+CHART_ENGINES = {"matplotlib": BlitChart, "native": TkLineChart}
+
+class DragZoom:
+    # Rubber band on either chart engine's Tk widget: drag selects an x range and calls on_zoom(x0, x1)
+    # in data units; double-click or right-click calls on_reset()
+    def __init__(self, chart, on_zoom, on_reset):
+        self.chart = chart
+        self.on_zoom = on_zoom
+        self.on_reset = on_reset
+        self._x0 = None
+        self._band = None
+        w = chart.widget
+        w.bind("<ButtonPress-1>", self._press, add="+")
+        w.bind("<B1-Motion>", self._drag, add="+")
+        w.bind("<ButtonRelease-1>", self._release, add="+")
+        w.bind("<Double-Button-1>", lambda e: on_reset(), add="+")
+        w.bind("<Button-3>", lambda e: on_reset(), add="+")
+
+    def _press(self, event):
+        self._x0 = event.x
+
+    def _drag(self, event):
+        if self._x0 is None: return
+        w = self.chart.widget
+        if self._band is None:
+            self._band = w.create_rectangle(self._x0, 0, event.x, w.winfo_height(), outline="#888888", dash=(3, 3))
+        w.coords(self._band, self._x0, 0, event.x, w.winfo_height())
+
+    def _release(self, event):
+        if self._band is not None:
+            self.chart.widget.delete(self._band)
+            self._band = None
+            if abs(event.x - self._x0) > 4:
+                self.on_zoom(self.chart.x_at(self._x0), self.chart.x_at(event.x))
+        self._x0 = None
+
+def heat_palette(bg, steps=101):
+    # 0% fades in from the background, then blue -> yellow -> red
+    stops = [(0.0, bg), (0.3, "#2e86de"), (0.7, "#f1c40f"), (1.0, "#e74c3c")]
+    rgb = lambda c: tuple(int(c[i:i + 2], 16) for i in (1, 3, 5))
+    out = []
+    for i in range(steps):
+        x = i / (steps - 1)
+        for (x0, c0), (x1, c1) in zip(stops, stops[1:]):
+            if x <= x1:
+                f = (x - x0) / (x1 - x0)
+                a, b = rgb(c0), rgb(c1)
+                out.append("#%02x%02x%02x" % tuple(round(p + (q - p) * f) for p, q in zip(a, b)))
+                break
+    return out
+
+class CoreHeatmap:
+    # Cores on the y axis, time on the x axis, all in one PhotoImage used as a ring of pixel columns.
+    # Each tick writes a single column and moves two image items, so cost stays flat as cores grow.
+    def __init__(self, master, ncores, width=600, is_dark=True):
+        self.w = width
+        self.widget = tk.Canvas(master, width=width, height=1, highlightthickness=0)
+        self.img = None
+        self.is_dark = is_dark
+        self._resize(ncores)
+
+    def _resize(self, ncores):
+        self.ncores = max(1, ncores)
+        self.row_h = max(1, min(6, 192 // self.ncores))
+        self.h = self.ncores * self.row_h
+        self.img = tk.PhotoImage(width=self.w, height=self.h)
+        self.widget.delete("all")
+        self.widget.configure(height=self.h)
+        self.items = [self.widget.create_image(0, 0, anchor="nw", image=self.img) for _ in range(2)]
+        self.head = -1
+        self.restyle(self.is_dark)
+
+    def update(self, busy):
+        if len(busy) != self.ncores:
+            self._resize(len(busy))
+        self.head = (self.head + 1) % self.w
+        pal = self.palette
+        col = " ".join("{%s}" % pal[int(v)] for v in busy for _ in range(self.row_h))
+        self.img.put(col, to=(self.head, 0))
+        # Newest column sits at the right edge; the second copy shows the older columns to its left
+        x = self.w - 1 - self.head
+        self.widget.coords(self.items[0], x, 0)
+        self.widget.coords(self.items[1], x - self.w, 0)
+
+    def restyle(self, is_dark, colors=None):
+        self.is_dark = is_dark
+        bg = THEMES[bool(is_dark)][1]
+        self.palette = heat_palette(bg)
+        self.widget.configure(bg=bg)
+        self.img.put(bg, to=(0, 0, self.w, self.h))
+
+    def destroy(self):
+        self.widget.destroy()
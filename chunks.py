@@ -0,0 +1,232 @@
+import struct
+from collections import deque
+from array import array
+
+# Gorilla-style time-series chunks (Pelkonen et al., VLDB 2015), bit-packed MSB first.
+#   timestamps  integer ms; the first is kept in the chunk header (t0), then delta-of-delta:
+#               '0' | '10' + 7 bits | '110' + 9 bits | '1110' + 12 bits | '1111' + 64 bits (zigzag)
+#   values      quantum set: value / quantum rounded to an int, then the delta to the previous one with
+#               '0' | '10' + 7 bits | '110' + 12 bits | '1110' + 20 bits | '1111' + 64 bits (zigzag);
+#               the first value is a delta against 0
+#               quantum None: exact doubles, XOR with the previous one: '0' same value | '10' + meaningful
+#               bits inside the previous leading/trailing-zero window | '11' + 5 bits leading zeros +
+#               6 bits length - 1 + meaningful bits; the first value is XORed against 0
+# A chunk takes CHUNK_SAMPLES samples and is then sealed: its bits become an immutable bytes object
+# that is only decoded when a query reaches it.
+CHUNK_SAMPLES = 1024
+DOD_BUCKETS = ((0b10, 2, 7), (0b110, 3, 9), (0b1110, 4, 12), (0b1111, 4, 64))
+DELTA_BUCKETS = ((0b10, 2, 7), (0b110, 3, 12), (0b1110, 4, 20), (0b1111, 4, 64))
+_D = struct.Struct(">d")
+_Q = struct.Struct(">Q")
+
+def _f2i(v):
+    return _Q.unpack(_D.pack(v))[0]
+
+def _i2f(n):
+    return _D.unpack(_Q.pack(n))[0]
+
+class BitWriter:
+    __slots__ = ("out", "acc", "n")
+
+    def __init__(self):
+        self.out = bytearray()
+        self.acc = 0
+        self.n = 0
+
+    def write(self, value, bits):
+        self.acc = (self.acc << bits) | value
+        self.n += bits
+        if self.n >= 64:
+            keep = self.n & 7
+            self.out += (self.acc >> keep).to_bytes(self.n >> 3, "big")
+            self.acc &= (1 << keep) - 1
+            self.n = keep
+
+    def getvalue(self):
+        # Everything written so far, zero-padded to a whole byte; the writer stays usable
+        if not self.n: return bytes(self.out)
+        pad = -self.n & 7
+        return bytes(self.out) + (self.acc << pad).to_bytes((self.n + pad) >> 3, "big")
+
+    def nbytes(self):
+        return len(self.out) + ((self.n + 7) >> 3)
+
+class BitReader:
+    __slots__ = ("data", "pos", "acc", "n")
+
+    def __init__(self, data):
+        self.data = data
+        self.pos = 0
+        self.acc = 0
+        self.n = 0
+
+    def read(self, bits):
+        while self.n < bits:
+            chunk = self.data[self.pos:self.pos + 8]
+            self.pos += 8
+            self.acc = (self.acc << (len(chunk) * 8)) | int.from_bytes(chunk, "big")
+            self.n += len(chunk) * 8
+            if not chunk:
+                raise EOFError
+        self.n -= bits
+        v = self.acc >> self.n
+        self.acc &= (1 << self.n) - 1
+        return v
+
+    def bit(self):
+        return self.read(1)
+
+def _put_signed(w, v, buckets):
+    if v == 0:
+        w.write(0, 1)
+        return
+    z = v << 1 if v >= 0 else ((-v) << 1) - 1
+    for prefix, plen, bits in buckets:
+        if z < 1 << bits:
+            w.write(prefix, plen)
+            w.write(z, bits)
+            return
+
+class Chunk:
+    __slots__ = ("quantum", "t0", "t1", "count", "data", "_w", "_prev_t", "_prev_d", "_prev_v", "_lead", "_trail")
+
+    def __init__(self, quantum=None):
+        self.quantum = quantum
+        self.t0 = self.t1 = 0.0
+        self.count = 0
+        self.data = None  # bytes once sealed
+        self._w = BitWriter()
+        self._prev_t = self._prev_d = 0
+        self._prev_v = 0
+        self._lead = self._trail = -1
+
+    @property
+    def sealed(self):
+        return self.data is not None
+
+    def append(self, ts, val):
+        w = self._w
+        t = round(ts * 1000)
+        if not self.count:
+            self.t0 = ts
+            self._prev_t = t
+        else:
+            d = t - self._prev_t
+            _put_signed(w, d - self._prev_d, DOD_BUCKETS)
+            self._prev_t, self._prev_d = t, d
+        self.t1 = ts
+        if self.quantum:
+            q = round(val / self.quantum)
+            _put_signed(w, q - self._prev_v, DELTA_BUCKETS)
+            self._prev_v = q
+        else:
+            self._put_xor(_f2i(val))
+        self.count += 1
+        if self.count >= CHUNK_SAMPLES: self.seal()
+
+    def _put_xor(self, v):
+        w = self._w
+        x = v ^ self._prev_v
+        self._prev_v = v
+        if not x:
+            w.write(0, 1)
+            return
+        lead = min(64 - x.bit_length(), 31)
+        trail = (x & -x).bit_length() - 1
+        if self._lead >= 0 and lead >= self._lead and trail >= self._trail:
+            w.write(0b10, 2)
+            w.write(x >> self._trail, 64 - self._lead - self._trail)
+            return
+        self._lead, self._trail = lead, trail
+        n = 64 - lead - trail
+        w.write(0b11, 2)
+        w.write(lead, 5)
+        w.write(n - 1, 6)
+        w.write(x >> trail, n)
+
+    def seal(self):
+        if self.data is None:
+            self.data = self._w.getvalue()
+            self._w = None
+
+    def nbytes(self):
+        return len(self.data) if self.data is not None else self._w.nbytes()
+
+    def __iter__(self):
+        # Streaming decode: (ts, value) pairs, oldest first; the open chunk decodes what it has so far
+        if not self.count: return
+        r = BitReader(self.data if self.data is not None else self._w.getvalue())
+        quantum = self.quantum
+        t = round(self.t0 * 1000)
+        d = 0
+        v = 0
+        lead = trail = 0
+        for i in range(self.count):
+            if i:
+                d += _read_signed(r, DOD_BUCKETS)
+                t += d
+            if quantum:
+                v += _read_signed(r, DELTA_BUCKETS)
+                yield t / 1000, v * quantum
+            else:
+                if r.bit():
+                    if r.bit():
+                        lead = r.read(5)
+                        n = r.read(6) + 1
+                        trail = 64 - lead - n
+                    else:
+                        n = 64 - lead - trail
+                    v ^= r.read(n) << trail
+                yield t / 1000, _i2f(v)
+
+def _read_signed(r, buckets):
+    if not r.bit(): return 0
+    last = len(buckets) - 1
+    for i, (_, _, bits) in enumerate(buckets):
+        if i == last or not r.bit(): break
+    z = r.read(bits)
+    return (z >> 1) if not z & 1 else -((z + 1) >> 1)
+
+class ChunkedSeries:
+    # Long-retention half of a Series: sealed chunks older than `retention` seconds are dropped whole
+    def __init__(self, retention, quantum=None):
+        self.retention = retention
+        self.quantum = quantum
+        self.sealed = deque()
+        self.open = Chunk(quantum)
+
+    def add(self, ts, val):
+        self.open.append(ts, val)
+        if self.open.sealed:
+            self.sealed.append(self.open)
+            self.open = Chunk(self.quantum)
+            while self.sealed and self.sealed[0].t1 < ts - self.retention:
+                self.sealed.popleft()
+
+    def chunks(self, start=None, end=None):
+        for c in self.sealed:
+            if start is not None and c.t1 < start: continue
+            if end is not None and c.t0 > end: return
+            yield c
+        if self.open.count and (end is None or self.open.t0 <= end): yield self.open
+
+    def iter(self, start=None, end=None):
+        # Streaming (ts, value) over [start, end]; chunks outside the range are never decoded
+        for c in self.chunks(start, end):
+            for ts, v in c:
+                if start is not None and ts < start: continue
+                if end is not None and ts > end: return
+                yield ts, v
+
+    def range(self, start=None, end=None):
+        t, v = array("d"), array("d")
+        for ts, val in self.iter(start, end):
+            t.append(ts)
+            v.append(val)
+        return t, v
+
+    def count(self):
+        return sum(c.count for c in self.sealed) + self.open.count
+
+    def nbytes(self):
+        return sum(c.nbytes() for c in self.sealed) + self.open.nbytes()
@@ -0,0 +1,210 @@
+import os
+import time
+from array import array
+import psutil
+
+def counter_delta(cur, old, wrap=None):
+    # Monotonic counter delta. wrap is the counter's modulus when the source really is narrow (None when it
+    # is 64-bit or already unwrapped): only a drop from its upper half is unwound, anything else going
+    # backwards (interface reset, re-plug, driver reload) is a reset and gives None, the caller reseeds
+    d = cur - old
+    if d >= 0: return d
+    if wrap and old > wrap >> 1: return d + wrap
+    return None
+
+class NetCollector:
+    # Per-NIC byte and packet rates from net_io_counters(pernic=True) deltas, EWMA-smoothed
+    FIELDS = ("rx", "tx", "rx_pps", "tx_pps")
+
+    def __init__(self, alpha=0.3, wrap=None, clock=time.monotonic):
+        self.alpha = alpha
+        self.wrap = wrap or (None,) * 4  # per-field counter modulus, see backends.py
+        self.clock = clock
+        self.prev = {}    # nic -> (timestamp, (bytes_recv, bytes_sent, packets_recv, packets_sent))
+        self.rates = {}   # nic -> {"rx": B/s, "tx": B/s, "rx_pps": ..., "tx_pps": ...}
+
+    def sample(self, counters=None):
+        # counters: nic -> (bytes_recv, bytes_sent, packets_recv, packets_sent), as produced by backends.py
+        now = self.clock()
+        if counters is None:
+            counters = {nic: (c.bytes_recv, c.bytes_sent, c.packets_recv, c.packets_sent)
+                        for nic, c in psutil.net_io_counters(pernic=True).items()}
+        for nic, cur in counters.items():
+            prev = self.prev.get(nic)
+            self.prev[nic] = (now, cur)
+            if prev is None: continue
+            dt = now - prev[0]
+            if dt <= 0: continue
+            # The first interval seeds the average instead of ramping up from zero
+            seed = nic not in self.rates
+            rates = self.rates.setdefault(nic, dict.fromkeys(self.FIELDS, 0.0))
+            for key, new, old, wrap in zip(self.FIELDS, cur, prev[1], self.wrap):
+                d = counter_delta(new, old, wrap)
+                if d is None: continue
+                r = d / dt
+                rates[key] = r if seed else rates[key] + self.alpha * (r - rates[key])
+        # Adapters that disappeared take their state with them
+        for nic in [n for n in self.prev if n not in counters]:
+            del self.prev[nic]
+            self.rates.pop(nic, None)
+        return self.rates
+
+    def total(self):
+        return sum(r["rx"] + r["tx"] for r in self.rates.values())
+
+# Filesystems that never hold user data; on container hosts these are most of the mount table
+PSEUDO_FS = {
+    "tmpfs", "devtmpfs", "ramfs", "overlay", "squashfs", "proc", "sysfs", "cgroup", "cgroup2", "devpts",
+    "mqueue", "hugetlbfs", "debugfs", "tracefs", "securityfs", "pstore", "bpf", "autofs", "fusectl",
+    "configfs", "nsfs", "efivarfs", "binfmt_misc", "fuse.lxcfs", "fuse.snapfuse", "fuse.portal", "iso9660",
+}
+
+# Block devices whose I/O is never worth a series of its own (the data lands on a real disk anyway)
+VIRTUAL_DEVS = ("loop", "ram", "zram")
+
+SYSFS_BLOCK = "/sys/class/block"
+
+def block_device(device, sysfs=SYSFS_BLOCK):
+    # Whole block device behind a mounted device, as named in the I/O counters (/dev/sda1 -> sda,
+    # /dev/nvme0n1p2 -> nvme0n1, /dev/mapper/root -> dm-0); None when sysfs does not know it
+    name = os.path.basename(os.path.realpath(device))
+    path = os.path.join(sysfs, name)
+    if not os.path.exists(path): return None
+    if os.path.exists(os.path.join(path, "partition")):
+        name = os.path.basename(os.path.dirname(os.path.realpath(path)))
+    return name
+
+def block_devices(parts, sysfs=SYSFS_BLOCK):
+    # block_device() of every mounted partition; None without sysfs, where the device names in the
+    # counters cannot be matched to mounts
+    if not os.path.isdir(sysfs): return None
+    return {dev for dev in (block_device(part.device, sysfs) for part in parts) if dev}
+
+class DiskCollector:
+    # Partition topology is cached and only re-read when the mount table changes; capacity is
+    # sampled on the slow schedule and per-device I/O rates on the fast one, for the block devices
+    # behind that topology only (not every loop, ram, zram device and partition in diskstats)
+    FIELDS = ("read", "write", "read_iops", "write_iops", "latency")
+
+    def __init__(self, alpha=0.3, topology_ttl=60.0, wrap=None, sysfs=SYSFS_BLOCK, clock=time.monotonic):
+        self.alpha = alpha
+        self.sysfs = sysfs
+        self.wrap = wrap or (None,) * 5
+        self.topology_ttl = topology_ttl
+        self.clock = clock
+        self.parts = None
+        self._parts_at = 0.0
+        self._poll = None
+        self._mounts = None
+        self.capacity = []
+        self.devices = None  # block_devices() of the cached topology
+        self.parents = {}  # partition device -> block_device()
+        self.prev = {}
+        self.rates = {}
+        try:
+            # Linux signals mount table changes on /proc/self/mounts as POLLPRI
+            import select
+            self._mounts = open("/proc/self/mounts", "rb")
+            self._mounts.read()
+            self._poll = select.poll()
+            self._poll.register(self._mounts, select.POLLPRI | select.POLLERR)
+        except (OSError, ImportError, AttributeError):
+            self._poll = None
+
+    def _mounts_changed(self):
+        if self._poll is None:
+            return self.clock() - self._parts_at > self.topology_ttl
+        if not self._poll.poll(0): return False
+        self._mounts.seek(0)
+        self._mounts.read()
+        return True
+
+    def partitions(self):
+        if self.parts is None or self._mounts_changed():
+            parts, seen = [], set()
+            for part in psutil.disk_partitions(all=False):
+                if part.fstype in PSEUDO_FS or 'cdrom' in part.opts or part.device.startswith("/dev/loop"):
+                    continue
+                if not part.fstype or part.device in seen: continue  # empty drives, bind mounts
+                seen.add(part.device)
+                parts.append(part)
+            self.parts = parts
+            self.parents = {part.device: block_device(part.device, self.sysfs) for part in parts}
+            self.devices = block_devices(parts, self.sysfs)
+            self._parts_at = self.clock()
+        return self.parts
+
+    def sample_capacity(self):
+        # "dev": the block device whose I/O rates belong to this filesystem (Snapshot.disk_io)
+        disks = []
+        for part in self.partitions():
+            try:
+                usage = psutil.disk_usage(part.mountpoint)
+                dev = self.parents.get(part.device) or os.path.basename(part.device)
+                disks.append({"name": part.device, "mount": part.mountpoint, "dev": dev, "total": usage.total, "used": usage.percent})
+            except OSError: pass
+        self.capacity = disks
+        return disks
+
+    def sample_io(self, counters=None):
+        # counters: dev -> (read_bytes, write_bytes, read_count, write_count, busy ms), as produced by backends.py
+        now = self.clock()
+        if counters is None:
+            counters = {dev: (c.read_bytes, c.write_bytes, c.read_count, c.write_count, c.read_time + c.write_time)
+                        for dev, c in (psutil.disk_io_counters(perdisk=True) or {}).items()}
+        if self.parts is None: self.partitions()
+        # Without a usable topology (no sysfs, nothing matched) at least the virtual devices are left out
+        devices = self.devices
+        if devices: counters = {dev: cur for dev, cur in counters.items() if dev in devices}
+        else: counters = {dev: cur for dev, cur in counters.items() if not dev.startswith(VIRTUAL_DEVS)}
+        for dev, cur in counters.items():
+            prev = self.prev.get(dev)
+            self.prev[dev] = (now, cur)
+            if prev is None: continue
+            dt = now - prev[0]
+            if dt <= 0: continue
+            d = [counter_delta(new, old, wrap) for new, old, wrap in zip(cur, prev[1], self.wrap)]
+            if None in d: continue
+            ops = d[2] + d[3]
+            # Average time per completed request over the interval, in ms (psutil reports ms)
+            sample = (d[0] / dt, d[1] / dt, d[2] / dt, d[3] / dt, d[4] / ops if ops else 0.0)
+            seed = dev not in self.rates
+            rates = self.rates.setdefault(dev, dict.fromkeys(self.FIELDS, 0.0))
+            for key, r in zip(self.FIELDS, sample):
+                rates[key] = r if seed else rates[key] + self.alpha * (r - rates[key])
+        for dev in [n for n in self.prev if n not in counters]:
+            del self.prev[dev]
+            self.rates.pop(dev, None)
+        return self.rates
+
+class CoreCollector:
+    # Per-core utilisation plus a user/system/iowait breakdown from cumulative CPU time deltas
+    def __init__(self):
+        self.prev = []
+        self.busy = array("d")
+        self.user = array("d")
+        self.system = array("d")
+        self.iowait = array("d")
+
+    def sample(self, cores):
+        n = len(cores)
+        if n != len(self.prev):
+            # First sample or CPU hotplug: resize and start a fresh baseline
+            for arr in (self.busy, self.user, self.system, self.iowait):
+                del arr[:]
+                arr.extend([0.0] * n)
+            self.prev = cores
+            return
+        for i, (cur, old) in enumerate(zip(cores, self.prev)):
+            dt = cur[4] - old[4]
+            if dt <= 0: continue
+            scale = 100.0 / dt
+            self.user[i] = (cur[0] - old[0]) * scale
+            self.system[i] = (cur[1] - old[1]) * scale
+            self.iowait[i] = (cur[2] - old[2]) * scale
+            self.busy[i] = min(100.0, max(0.0, 100.0 - (cur[3] - old[3] + cur[2] - old[2]) * scale))
+        self.prev = cores
+
+    def breakdown(self):
+        n = len(self.busy) or 1
+        return sum(self.user) / n, sum(self.system) / n, sum(self.iowait) / n
@@ -1,82 +1,170 @@
 import psutil
 import threading
 import time
-import socket
-import requests
 import platform
 import os
-try:
-    import wmi
-    HAS_WMI = True
-except ImportError:
-    HAS_WMI = False
-import winsound
-from datetime import datetime
-try:
-    import pynvml
-    HAS_GPU = True
-except ImportError:
-    HAS_GPU = False
+from history import HistoryStore, RAW_CAPACITY, TIERS
+from scheduler import Scheduler, AdaptiveRate
+from netprobe import NetProbe
+from procs import ProcessSampler
+from archive import MetricsArchive
+from alerts import AlertEngine, build_sinks
+from collectors import NetCollector, DiskCollector, CoreCollector
+from backends import make_backend
+from sensors import SensorHub
+from selfstats import SelfMonitor, Profiler
+from attribution import ProcessAttribution
+from snapshot import SnapshotBuffer, fill, NAN
+
+# Seconds between runs of each slow collector; "fast" (CPU/RAM/GPU + publish) follows refresh_interval.
+# "sensors" only wakes the hub, which then reads each sensor on its own period.
+PERIODS = {"disks": 30.0, "sensors": 1.0, "battery": 60.0, "procs": 2.0, "self": 2.0, "attribution": 2.0, "retention": 3600.0}
+# Series recorded into history straight from the snapshot every tick
+RECORDED = ("cpu", "ram", "cpu_t", "gpu_v", "gpu_t", "vram")
+# Values whose stability lets the fast tick back off (percent or degrees; adaptive_threshold applies to each)
+ADAPTIVE_KEYS = ("cpu", "ram", "cpu_t", "gpu_v", "vram")
+# Ring poll period in sampler-process mode while someone is looking / while idle (the ring holds 64 ticks)
+REMOTE_POLL = (0.1, 2.0)
 
 class SysEngine:
-    def __init__(self):
+    def __init__(self, config=None):
+        config = config or {}
+        self.config = config
         self.is_running = True
-        self.stats = {}
-        self.history = {"cpu": [0] * 600, "ram": [0] * 600}
-        self.refresh_interval = 1.0
+        # sampler "process": collection runs in a separate process (sampler.py) and this engine only
+        # reads its shared-memory ring, so Tk/matplotlib work no longer delays or pollutes the samples
+        self.remote = config.get("sampler", "thread") == "process"
+        self.sampler = None
+        self.reader = None
+        self.snapshots = SnapshotBuffer()  # snapshots.current is the latest published tick
+        self.history = HistoryStore(retention=config.get("history_retention_hours", 24) * 3600)
+        # Compressed retention costs ~1-3 bytes per sample, ~100-250 KB per series and day at 1 s. Per-core
+        # and per-adapter/device series can number in the hundreds, so cores only keep the raw window and a
+        # 1min tier, adapters and devices the usual tiers plus one hour of full-resolution chunks.
+        self.history.configure("core:", RAW_CAPACITY, ((60, 1440),), retention=0)
+        for prefix in ("net:", "io:"): self.history.configure(prefix, RAW_CAPACITY, TIERS, min(3600, self.history.retention))
+        self.profiler = Profiler(config.get("profile_dir", "profiles"))
+        self.scheduler = Scheduler(profiler=self.profiler)
+        self.monitor = SelfMonitor()
+        self.monitor.sources["collectors"] = self.scheduler.report
+        self.periods = dict(PERIODS)
+        self._refresh = config.get("refresh_rate", 1.0)
+        # Adaptive sampling: the fast tick backs off while values are stable (up to a lower ceiling while
+        # someone is looking), and with no consumer at all the slow collectors and probes stretch too
+        self.adaptive = config.get("adaptive", True)
+        self.rate = AdaptiveRate(self._refresh, config.get("adaptive_ceiling", 10.0), threshold=config.get("adaptive_threshold", 5.0))
+        self.rate_ceiling = self.rate.ceiling
+        self.visible_ceiling = config.get("adaptive_visible_ceiling", 2.0)
+        self.idle_factor = config.get("adaptive_idle_factor", 4.0)
+        self.consumers = set()  # UI surfaces currently showing live data ("window", "overlay", "procs", ...)
+        self._idle = False
+        self.callback = None
+        self.listeners = []  # extra consumers of every published snapshot (exporter, ...)
+        self.recorders = []  # see every tick even while idle (the sampler process's ring writer)
+        self.exporter = None
+        if config.get("exporter_port"):
+            from exporter import MetricsExporter
+            try:
+                self.exporter = MetricsExporter(config.get("exporter_host", "127.0.0.1"), config["exporter_port"]).start()
+                self.listeners.append(self.exporter.publish)
+            except OSError:
+                self.exporter = None
+        self.agent = None
+        if config.get("fleet_target"):
+            from fleet import Agent
+            self.agent = Agent(config["fleet_target"], config.get("fleet_name") or None)
+            self.listeners.append(self.agent.publish)
+        self.net = NetProbe()
+        self.net_interval = self.net.interval
+        self.procs = ProcessSampler()
+        self.backend = make_backend(config.get("backend", "auto"))
+        self.netio = NetCollector(wrap=self.backend.net_wrap)
+        self.diskio = DiskCollector(wrap=self.backend.disk_wrap)
+        self.cores = CoreCollector()
+        # With a sampler process, alerts and the archive run there, next to the data
+        self.alerts = AlertEngine([], []) if self.remote else AlertEngine(config.get("alert_rules"), build_sinks(config))
+        # Per-process CPU/RSS/IO/context-switch heavy hitters; incidents carry their top offenders
+        self.attribution = None
+        if config.get("attribution", True) and not self.remote:
+            self.attribution = ProcessAttribution(config.get("attribution_slots", 64))
+            self.alerts.attribution = self.attribution
+        self.archive = None
+        if config.get("archive_enabled", True) and not self.remote:
+            try: self.archive = MetricsArchive(config.get("archive_dir", "archive"), retention_days=config.get("archive_retention_days", 7))
+            except OSError: pass
+        self.disks = []
+        self.batt = None
+        self.cpu_temp = 0
         self.gpu_handle = None
-        self.wmi_conn = None
-        
-        try:
-            if HAS_WMI:
-                self.wmi_conn = wmi.WMI(namespace="root\\wmi")
-        except: pass
+        self.gpu_name = "N/A"
+        self.nvml = None
+        self.sensors = SensorHub(periods=config.get("sensor_periods"))
 
-        if HAS_GPU:
-            try:
-                pynvml.nvmlInit()
-                self.gpu_handle = pynvml.nvmlDeviceGetHandleByIndex(0)
-                gpu_name = pynvml.nvmlDeviceGetName(self.gpu_handle)
-                if isinstance(gpu_name, bytes): gpu_name = gpu_name.decode()
-                self.gpu_name = gpu_name
-            except:
-                self.gpu_name = "N/A"
-        else:
-            self.gpu_name = "N/A"
-
-    def get_cpu_temp(self):
+    def init_gpu(self):
+        # NVML is optional and slow to load; it is brought up on the engine thread, off the startup path
         try:
-            if HAS_WMI and self.wmi_conn:
-                temps = self.wmi_conn.MSAcpi_ThermalZoneTemperature()
-                if temps:
-                    return (temps[0].CurrentTemperature / 10.0) - 273.15
-            return 0
-        except: return 0
-
-    def play_alert(self):
-        try: winsound.Beep(1000, 200)
-        except: pass
-
-    def get_ips(self):
-        try:
-            local_ip = socket.gethostbyname(socket.gethostname())
-            public_ip = requests.get('https://api.ipify.org', timeout=2).text
-            return local_ip, public_ip
-        except:
-            return "127.0.0.1", "Unknown"
+            import pynvml
+            pynvml.nvmlInit()
+            handle = pynvml.nvmlDeviceGetHandleByIndex(0)
+            gpu_name = pynvml.nvmlDeviceGetName(handle)
+        except Exception:
+            return
+        self.gpu_name = gpu_name.decode() if isinstance(gpu_name, bytes) else gpu_name
+        self.nvml, self.gpu_handle = pynvml, handle
 
-    def get_ping(self):
-        try:
-            # Simple ping test to a fast DNS
-            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            s.settimeout(1)
-            start = time.time()
-            s.connect(("8.8.8.8", 53))
-            ping = (time.time() - start) * 1000
-            s.close()
-            return f"{int(ping)} ms"
-        except:
-            return "N/A"
+    @property
+    def refresh_interval(self):
+        return self._refresh
+
+    @refresh_interval.setter
+    def refresh_interval(self, val):
+        self._refresh = val
+        self.rate.base = val
+        self.rate.reset()
+        self.scheduler.set_period("fast", val)
+        if self.sampler: self.sampler.ring.set_control(refresh=val)
+
+    def set_consumer(self, name, on):
+        # Called by the UI whenever a live surface appears or goes away
+        had = bool(self.consumers)
+        if on: self.consumers.add(name)
+        else: self.consumers.discard(name)
+        self._apply_idle()
+        if self.sampler: self.sampler.ring.set_control(consumers=bool(self.consumers))
+        if on and not had:
+            # Someone started looking: fresh data now, base rate from here on
+            self.rate.reset()
+            self.scheduler.set_period("fast", REMOTE_POLL[0] if self.remote else self._refresh)
+            self.scheduler.kick("fast")
+
+    def _apply_idle(self):
+        idle = self.adaptive and not self.consumers and not self.listeners
+        if idle == self._idle: return
+        self._idle = idle
+        f = self.idle_factor if idle else 1.0
+        for name in ("disks", "sensors", "battery", "self", "attribution"):
+            self.scheduler.set_period(name, self.periods[name] * f)
+        self.net.interval = self.net_interval * f
+
+    def _next_period(self, values):
+        if not self.adaptive: return self._refresh
+        self.rate.ceiling = self.rate_ceiling if self._idle else self.visible_ceiling
+        if self.alerts.busy(): self.rate.reset()  # pending/active rules keep their timing resolution
+        return self.rate.update({k: values.get(k, 0.0) for k in ADAPTIVE_KEYS})
+
+    def self_stats(self):
+        # SysPulse's own CPU%/RSS/threads plus duration histograms of every collector and UI phase
+        return self.monitor.snapshot()
+
+    def expire_archive(self):
+        if self.archive:
+            try: self.archive.enforce_retention()
+            except OSError: pass
+
+    def watch_processes(self, on):
+        # The process sampler only runs while someone is looking at the process table
+        if on: self.scheduler.add("procs", self.periods["procs"], self.procs.sample)
+        else: self.scheduler.remove("procs")
 
     def kill_process(self, pid):
         try:
@@ -86,85 +174,168 @@ class SysEngine:
         except:
             return False
 
-    def log_peak(self, metric, val):
-        fn = f"peak_log_{datetime.now().strftime('%Y%m%d')}.txt"
-        with open(fn, "a") as f:
-            f.write(f"[{datetime.now().strftime('%H:%M:%S')}] PEAK: {metric} @ {val}%\n")
+    def collect_disks(self):
+        self.disks = self.diskio.sample_capacity()
+        now = time.time()
+        for d in self.disks: self.history.add(f"disk:{d['name']}", d["used"], now)
 
-    def update_loop(self, callback):
-        local_ip, public_ip = self.get_ips()
-        ping_counter = 0
-        current_ping = "..."
+    def collect_sensors(self):
+        now = time.time()
+        for sensor in self.sensors.sample():
+            if sensor.value is not None: self.history.add(f"sensor:{sensor.key}", sensor.value, now)
+        self.cpu_temp = self.sensors.cpu_temp()
+
+    def collect_battery(self):
+        self.batt = psutil.sensors_battery()
+
+    def collect_fast(self):
+        # CPU, RAM and raw net/disk counters in one pass over the backend
+        snap = self.backend.sample()
+        cpu = snap.cpu
+        self.cores.sample(snap.cores)
+        user, system, iowait = self.cores.breakdown()
+
+        # Network throughput (B/s per adapter)
+        self.netio.sample(snap.net)
+        net_speed = self.netio.total()
 
-        while self.is_running:
+        # Disk I/O (per device)
+        self.diskio.sample_io(snap.disk)
+
+        # GPU & VRAM
+        gv, gt, vram = 0, 0, 0
+        if self.gpu_handle:
             try:
-                cpu = psutil.cpu_percent()
-                ram = psutil.virtual_memory()
-                net_speed = 0
-                adapter_speeds = {}
-                
-                # Disk
-                disks = []
-                for part in psutil.disk_partitions():
-                    if 'fixed' in part.opts or 'rw' in part.opts:
-                        try:
-                            usage = psutil.disk_usage(part.mountpoint)
-                            disks.append({"name": part.device, "total": usage.total, "used": usage.percent})
-                        except: pass
-
-                if cpu > 92 or ram.percent > 92:
-                    self.play_alert()
-                    if cpu > 92: self.log_peak("CPU", cpu)
-                    if ram.percent > 92: self.log_peak("RAM", ram.percent)
-
-                ctemp = self.get_cpu_temp()
-
-                # GPU & VRAM
-                gv, gt, vram = 0, 0, 0
-                if self.gpu_handle:
-                    try:
-                        res = pynvml.nvmlDeviceGetUtilizationRates(self.gpu_handle)
-                        gv = res.gpu
-                        gt = pynvml.nvmlDeviceGetTemperature(self.gpu_handle, 0)
-                        v_info = pynvml.nvmlDeviceGetMemoryInfo(self.gpu_handle)
-                        vram = (v_info.used / v_info.total) * 100
-                    except: pass
-                
-                # Battery
-                batt = psutil.sensors_battery()
-                
-                if ping_counter % 8 == 0:
-                    current_ping = self.get_ping()
-                ping_counter += 1
-
-                self.history["cpu"].append(cpu)
-                self.history["cpu"].pop(0)
-                self.history["ram"].append(ram.percent)
-                self.history["ram"].pop(0)
-
-                self.stats = {
-                    "cpu": cpu,
-                    "cpu_t": ctemp,
-                    "ram_p": ram.percent,
-                    "ram_gb": f"{ram.used/(1024**3):.1f}GB",
-                    "gpu_v": gv,
-                    "gpu_t": gt,
-                    "vram": vram,
-                    "net": net_speed,
-                    "adapters": adapter_speeds,
-                    "ping": current_ping,
-                    "batt": batt,
-                    "disks": disks,
-                    "ip": f"L: {local_ip} | P: {public_ip}"
-                }
-                
-                callback(self.stats)
-                time.sleep(max(0.1, self.refresh_interval - 0.5))
-            except Exception as e:
-                pass
+                res = self.nvml.nvmlDeviceGetUtilizationRates(self.gpu_handle)
+                gv = res.gpu
+                gt = self.nvml.nvmlDeviceGetTemperature(self.gpu_handle, 0)
+                v_info = self.nvml.nvmlDeviceGetMemoryInfo(self.gpu_handle)
+                vram = (v_info.used / v_info.total) * 100
+            except: pass
+
+        # Fill the back buffer; readers keep seeing the previous snapshot until publish()
+        now = time.time()
+        out = self.snapshots.back()
+        out.ts = now
+        out.cpu, out.cpu_t = cpu, self.cpu_temp
+        out.cpu_user, out.cpu_system, out.cpu_iowait = user, system, iowait
+        out.ram_p, out.ram_used, out.ram_total = snap.mem_percent, snap.mem_used, snap.mem_total
+        out.gpu_v, out.gpu_t, out.vram = gv, gt, vram
+        out.net = net_speed
+        fill(out.cores, self.cores.busy)
+        rates = self.netio.rates
+        out.nic_names = tuple(rates)
+        fill(out.nics, [v for r in rates.values() for v in (r["rx"], r["tx"])])
+        rates = self.diskio.rates
+        out.dev_names = tuple(rates)
+        fill(out.devs, [r[k] for r in rates.values() for k in ("read", "write", "read_iops", "write_iops", "latency")])
+        out.disks = self.disks
+        out.batt = self.batt.percent if self.batt else NAN
+        out.batt_plugged = float(self.batt.power_plugged) if self.batt and self.batt.power_plugged is not None else NAN
+        out.ping = self.net.ping_ms()
+        out.latency = self.net.latency()
+        out.ips = self.net.ips()
+        out.jitter = self.scheduler.jobs["fast"].last_jitter * 1000
+        out.self_cpu, out.self_rss, out.self_threads = self.monitor.cpu, self.monitor.rss, self.monitor.threads
+
+        self.record(out)
+        self.alerts.evaluate(out, now)
+        if self.archive:
+            try: self.archive.append(now, out)
+            except (OSError, ValueError): self.archive = None
+        self.snapshots.publish(out)
+        for fn in self.recorders:
+            try: fn(out)
+            except Exception: pass
+        self.scheduler.set_period("fast", self._next_period(out))
+        if self._idle: return  # nobody to publish to; history, alerts and the archive are already fed
+        self.deliver(out)
+
+    def record(self, out):
+        # History series for one tick, all taken from the snapshot (rates in KB/s)
+        now = out.ts
+        for name in RECORDED: self.history.add(name, out.get(name), now)
+        self.history.add("cpu:user", out.cpu_user, now)
+        self.history.add("cpu:system", out.cpu_system, now)
+        self.history.add("cpu:iowait", out.cpu_iowait, now)
+        for i, v in enumerate(out.cores):
+            self.history.add(f"core:{i}", v, now)
+        self.history.add("net", out.net / 1024, now)
+        for i, nic in enumerate(out.nic_names):
+            rx, tx = out.nic(i)
+            self.history.add(f"net:{nic}:rx", rx / 1024, now)
+            self.history.add(f"net:{nic}:tx", tx / 1024, now)
+        for i, dev in enumerate(out.dev_names):
+            read, write, _, _, latency = out.dev(i)
+            self.history.add(f"io:{dev}:read", read / 1024, now)
+            self.history.add(f"io:{dev}:write", write / 1024, now)
+            self.history.add(f"io:{dev}:latency", latency, now)
+        batt = out.get("batt")
+        if batt is not None: self.history.add("batt", batt, now)
+
+    def deliver(self, out):
+        for fn in self.listeners:
+            try: fn(out)
+            except Exception: pass
+        if self.consumers or not self.adaptive: self.callback(out)
+
+    def collect_remote(self):
+        # Sampler-process mode: history gets every record written since the last poll, consumers the newest
+        if self.reader.ring.head() == self.reader.last: return
+        out = self.snapshots.back()
+        latest = None
+        for snap in self.reader.poll(out):
+            self.record(snap)
+            latest = snap
+        self.gpu_name = self.reader.meta.get("gpu_name", self.gpu_name)
+        if latest is not out: return  # newest record was overwritten mid-read; the next poll reuses the slot
+        self.disks = out.disks
+        # self_*: SysPulse's footprint across both processes
+        out.self_cpu += self.monitor.cpu
+        out.self_rss += self.monitor.rss
+        out.self_threads += self.monitor.threads
+        self.snapshots.publish(out)
+        self.scheduler.set_period("fast", REMOTE_POLL[self._idle is True])
+        if self._idle: return
+        self.deliver(out)
+
+    def update_loop(self, callback):
+        self.callback = callback
+        if self.remote:
+            from sampler import SamplerProcess, RingReader
+            self.sampler = SamplerProcess(self.config)
+            self.sampler.ring.set_control(consumers=bool(self.consumers))
+            self.reader = RingReader(self.sampler.ring)
+            self.scheduler.add("self", self.periods["self"], self.monitor.sample)
+            self.scheduler.add("fast", REMOTE_POLL[0], self.collect_remote)
+            self._idle = None
+            self._apply_idle()
+            self.scheduler.run()
+            return
+        self.net.start()
+        self.init_gpu()
+
+        # Slow collectors go first so the first published sample already has their data
+        for name, fn in (("disks", self.collect_disks), ("sensors", self.collect_sensors),
+                         ("battery", self.collect_battery), ("self", self.monitor.sample)):
+            self.scheduler.add(name, self.periods[name], fn)
+        if self.attribution: self.scheduler.add("attribution", self.periods["attribution"], self.attribution.sample)
+        if self.archive: self.scheduler.add("retention", self.periods["retention"], self.expire_archive, delay=self.periods["retention"])
+        self.scheduler.add("fast", self.refresh_interval, self.collect_fast)
+        self._idle = None
+        self._apply_idle()
+        self.scheduler.run()
 
     def stop(self):
         self.is_running = False
+        self.scheduler.stop()
+        self.net.stop()
+        self.alerts.stop()
+        self.sensors.close()
+        if self.exporter: self.exporter.stop()
+        if self.agent: self.agent.close()
+        if self.archive: self.archive.close()
+        if self.sampler: self.sampler.stop()
         if self.gpu_handle:
-            try: pynvml.nvmlShutdown()
+            try: self.nvml.nvmlShutdown()
             except: pass
@@ -0,0 +1,113 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from snapshot import known
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+def _esc(v):
+    return str(v).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def _fmt(v):
+    return repr(float(v))
+
+def render(snap, prefix="syspulse"):
+    # OpenMetrics exposition of one engine snapshot
+    out = []
+
+    def family(name, help_text, samples, unit=None):
+        samples = [(labels, v) for labels, v in samples if v is not None and known(v)]
+        if not samples: return
+        full = f"{prefix}_{name}"
+        out.append(f"# TYPE {full} gauge")
+        if unit: out.append(f"# UNIT {full} {unit}")
+        out.append(f"# HELP {full} {help_text}")
+        for labels, v in samples:
+            lbl = "{" + ",".join(f'{k}="{_esc(x)}"' for k, x in labels.items()) + "}" if labels else ""
+            out.append(f"{full}{lbl} {_fmt(v)}")
+
+    family("cpu_usage_percent", "Total CPU utilisation.", [({}, snap.cpu)])
+    family("cpu_mode_percent", "CPU time share by mode.",
+           [({"mode": "user"}, snap.cpu_user), ({"mode": "system"}, snap.cpu_system), ({"mode": "iowait"}, snap.cpu_iowait)])
+    family("cpu_core_usage_percent", "Per-core CPU utilisation.", [({"core": i}, v) for i, v in enumerate(snap.cores)])
+    family("cpu_temperature_celsius", "CPU temperature.", [({}, snap.cpu_t)], "celsius")
+    family("memory_usage_percent", "RAM in use.", [({}, snap.ram_p)])
+    family("memory_used_bytes", "RAM in use.", [({}, snap.ram_used)], "bytes")
+    family("gpu_usage_percent", "GPU core utilisation.", [({}, snap.gpu_v)])
+    family("gpu_temperature_celsius", "GPU temperature.", [({}, snap.gpu_t)], "celsius")
+    family("gpu_memory_usage_percent", "GPU memory in use.", [({}, snap.vram)])
+
+    nics = [(n, snap.nic(i)) for i, n in enumerate(snap.nic_names)]
+    family("network_receive_bytes_per_second", "Receive rate per interface.", [({"device": n}, r[0]) for n, r in nics])
+    family("network_transmit_bytes_per_second", "Transmit rate per interface.", [({"device": n}, r[1]) for n, r in nics])
+    ping = snap.ping
+    family("network_latency_seconds", "Best average TCP connect time to the probe targets.",
+           [({}, ping / 1000 if ping != float("inf") else None)], "seconds")
+    probes = snap.latency
+    family("network_probe_rtt_seconds", "TCP connect time per probe target over the last round.",
+           [({"target": r["target"], "stat": k}, r[k] / 1000 if r[k] is not None else None)
+            for r in probes for k in ("min", "avg", "max")], "seconds")
+    family("network_probe_jitter_seconds", "Mean difference between consecutive connect times per probe target.",
+           [({"target": r["target"]}, r["jitter"] / 1000 if r["jitter"] is not None else None) for r in probes], "seconds")
+    family("network_probe_loss_percent", "Failed connects per probe target over the last round.",
+           [({"target": r["target"]}, r["loss"]) for r in probes])
+
+    io = [(d, snap.dev(i)) for i, d in enumerate(snap.dev_names)]
+    family("disk_read_bytes_per_second", "Read throughput per device.", [({"device": d}, r[0]) for d, r in io])
+    family("disk_write_bytes_per_second", "Write throughput per device.", [({"device": d}, r[1]) for d, r in io])
+    family("disk_read_iops", "Completed reads per second per device.", [({"device": d}, r[2]) for d, r in io])
+    family("disk_write_iops", "Completed writes per second per device.", [({"device": d}, r[3]) for d, r in io])
+    family("disk_request_latency_seconds", "Average time per completed request.", [({"device": d}, r[4] / 1000) for d, r in io], "seconds")
+    family("filesystem_usage_percent", "Filesystem capacity in use.",
+           [({"device": d["name"], "mountpoint": d.get("mount", "")}, d["used"]) for d in snap.disks])
+    family("filesystem_size_bytes", "Filesystem size.",
+           [({"device": d["name"], "mountpoint": d.get("mount", "")}, d["total"]) for d in snap.disks], "bytes")
+
+    family("battery_percent", "Battery charge.", [({}, snap.batt)])
+    family("self_cpu_percent", "CPU used by SysPulse itself.", [({}, snap.self_cpu)])
+    family("self_resident_memory_bytes", "Resident memory of SysPulse itself.", [({}, snap.self_rss)], "bytes")
+    family("self_threads", "Threads in the SysPulse process.", [({}, snap.self_threads)])
+    out.append("# EOF\n")
+    return "\n".join(out).encode()
+
+class MetricsExporter:
+    # The exposition is rendered once per engine tick; a scrape only writes the cached bytes
+    def __init__(self, host="127.0.0.1", port=9464):
+        self.host = host
+        self.port = port
+        self.body = b"# EOF\n"
+        self.scrapes = 0
+        self.server = None
+
+    def publish(self, snap):
+        self.body = render(snap)
+
+    def start(self):
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = exporter.body  # one reference read; publish() swaps it atomically
+                exporter.scrapes += 1
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True, name="exporter").start()
+        return self
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
@@ -0,0 +1,386 @@
+import asyncio
+import socket
+import struct
+import threading
+import time
+from collections import deque
+from history import HistoryStore
+
+# Wire format v1. Each frame is
+#   header  <2sBBIdH  magic "SP", version, flags, seq, timestamp, field count
+#   keyframe only: host name, then the field names (u8 length + utf-8 each)
+#   values: one zigzag varint per field, quantized to 1/100. Keyframes carry absolute values,
+#           other frames the difference to the previous frame, so a quiet host sends ~1 byte per field.
+# Over TCP every frame is prefixed with its u16 length; over UDP one datagram is one frame and deltas
+# are taken against the last keyframe instead (flag KEYREF), so a lost datagram costs only itself.
+MAGIC = b"SP"
+VERSION = 1
+KEYFRAME = 0x01
+KEYREF = 0x02
+HEADER = struct.Struct("<2sBBIdH")
+LENGTH = struct.Struct("<H")
+SCALE = 100
+KEYFRAME_EVERY = 30
+# A UDP peer's decoder is forgotten after this long without a datagram (agents report every few seconds
+# at most, so this is many report intervals) and the oldest go first past UDP_PEERS
+UDP_IDLE = 60.0
+UDP_PEERS = 4096
+
+# Scalar snapshot fields sent by agents (net in B/s); per-core values follow as core:N
+FIELDS = ("cpu", "ram_p", "cpu_t", "gpu_v", "gpu_t", "vram", "net")
+
+def put_varint(out, n):
+    z = n << 1 if n >= 0 else ((-n) << 1) - 1
+    while z >= 0x80:
+        out.append((z & 0x7f) | 0x80)
+        z >>= 7
+    out.append(z)
+
+def get_varint(buf, i):
+    z = shift = 0
+    while True:
+        b = buf[i]
+        i += 1
+        z |= (b & 0x7f) << shift
+        if b < 0x80: break
+        shift += 7
+    return (z >> 1) if not z & 1 else -((z + 1) >> 1), i
+
+def _put_str(out, s):
+    b = s.encode()[:255]
+    out.append(len(b))
+    out += b
+
+def _get_str(buf, i):
+    n = buf[i]
+    return bytes(buf[i + 1:i + 1 + n]).decode(), i + 1 + n
+
+def snapshot_fields(snap):
+    names = list(FIELDS)
+    values = [snap.get(f, 0.0) for f in FIELDS]
+    names += [f"core:{i}" for i in range(len(snap.cores))]
+    values += snap.cores
+    return names, values
+
+class FrameEncoder:
+    def __init__(self, host, keyframe_every=KEYFRAME_EVERY, keyref=False):
+        self.host = host
+        self.keyframe_every = keyframe_every
+        self.keyref = keyref
+        self.names = None
+        self.prev = None
+        self.seq = 0
+
+    def reset(self):
+        # Next frame becomes a keyframe (new connection, decoder lost sync, ...)
+        self.names = None
+
+    def encode(self, ts, names, values):
+        q = [round(v * SCALE) for v in values]
+        key = names != self.names or self.seq % self.keyframe_every == 0
+        flags = (KEYFRAME if key else 0) | (KEYREF if self.keyref else 0)
+        out = bytearray(HEADER.pack(MAGIC, VERSION, flags, self.seq & 0xffffffff, ts, len(q)))
+        if key:
+            _put_str(out, self.host)
+            for n in names: _put_str(out, n)
+            for v in q: put_varint(out, v)
+            self.names = list(names)
+        else:
+            for v, p in zip(q, self.prev): put_varint(out, v - p)
+        if key or not self.keyref: self.prev = q
+        self.seq += 1
+        return bytes(out)
+
+class FrameDecoder:
+    # One per agent stream; delta frames are dropped until a keyframe re-establishes the baseline
+    def __init__(self):
+        self.host = None
+        self.names = None
+        self.prev = None
+        self.seq = None
+        self.key = None
+        self.key_seq = None
+        self.dropped = 0
+
+    def decode(self, buf):
+        magic, version, flags, seq, ts, n = HEADER.unpack_from(buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("bad frame")
+        i = HEADER.size
+        if flags & KEYFRAME:
+            self.host, i = _get_str(buf, i)
+            names = []
+            for _ in range(n):
+                name, i = _get_str(buf, i)
+                names.append(name)
+            q = []
+            for _ in range(n):
+                v, i = get_varint(buf, i)
+                q.append(v)
+            self.names = names
+            self.key, self.key_seq = q, seq
+        elif flags & KEYREF:
+            # Any frame after the current keyframe decodes; late frames from an older epoch do not
+            if self.key_seq is None or not 0 < (seq - self.key_seq) & 0xffffffff < 0x80000000 or n != len(self.key):
+                self.dropped += 1
+                return None
+            q = []
+            for p in self.key:
+                d, i = get_varint(buf, i)
+                q.append(p + d)
+        else:
+            if self.prev is None or self.seq is None or seq != (self.seq + 1) & 0xffffffff or n != len(self.prev):
+                self.dropped += 1
+                self.prev = None
+                return None
+            q = []
+            for p in self.prev:
+                d, i = get_varint(buf, i)
+                q.append(p + d)
+        self.prev, self.seq = q, seq
+        return self.host, seq, ts, dict(zip(self.names, (v / SCALE for v in q)))
+
+class Agent:
+    # Headless sender: register publish() as an engine listener. publish() only queues the values; a
+    # background thread encodes and sends them, so a slow or unreachable aggregator never holds up the
+    # sampling thread. The queue keeps the newest `backlog` ticks and drops the oldest beyond that
+    # (before encoding, so the delta chain stays intact).
+    def __init__(self, target, host=None, timeout=1.0, retry=5.0, backlog=64):
+        scheme, _, addr = target.rpartition("://")
+        self.udp = scheme == "udp"
+        h, _, p = addr.rpartition(":")
+        self.addr = (h or "127.0.0.1", int(p))
+        self.encoder = FrameEncoder(host or socket.gethostname(), keyref=self.udp)
+        self.timeout = timeout
+        self.retry = retry
+        self.sock = None
+        self._next_try = 0.0
+        self.sent = 0
+        self.bytes = 0
+        self.dropped = 0
+        self.pending = deque(maxlen=backlog)
+        self._cv = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, daemon=True, name="fleet-agent")
+        self._thread.start()
+
+    def _connect(self):
+        if self.udp:
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        else:
+            self.sock = socket.create_connection(self.addr, timeout=self.timeout)
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.encoder.reset()
+
+    def publish(self, snap):
+        names, values = snapshot_fields(snap)
+        with self._cv:
+            if len(self.pending) == self.pending.maxlen: self.dropped += 1
+            self.pending.append((snap.ts or time.time(), names, values))
+            self._cv.notify()
+
+    def _run(self):
+        while True:
+            with self._cv:
+                while not self.pending and not self._closed: self._cv.wait()
+                if self._closed: break
+                item = self.pending.popleft()
+            self._send(*item)
+        self._disconnect()
+
+    def _send(self, ts, names, values):
+        if self.sock is None:
+            if time.monotonic() < self._next_try:
+                self.dropped += 1
+                return
+            try:
+                self._connect()
+            except OSError:
+                self.dropped += 1
+                self._next_try = time.monotonic() + self.retry
+                return
+        frame = self.encoder.encode(ts, names, values)
+        try:
+            if self.udp: self.sock.sendto(frame, self.addr)
+            else: self.sock.sendall(LENGTH.pack(len(frame)) + frame)
+            self.sent += 1
+            self.bytes += len(frame)
+        except OSError:
+            self._disconnect()
+            self._next_try = time.monotonic() + self.retry
+
+    def _disconnect(self):
+        if self.sock:
+            try: self.sock.close()
+            except OSError: pass
+            self.sock = None
+
+    def close(self):
+        with self._cv:
+            self._closed = True
+            self._cv.notify()
+        self._thread.join(self.timeout + 1.0)
+
+class HostState:
+    def __init__(self, name):
+        self.name = name
+        self.history = HistoryStore(600, ((60, 1440),))
+        self.last = {}
+        self.last_seen = 0.0  # aggregator's clock, so agents' clock skew cannot make hosts look dead
+        self.frames = 0
+        self.addr = None
+
+class Aggregator:
+    # Accepts agents over TCP and UDP on one asyncio loop and merges them into per-host history stores
+    def __init__(self, host="0.0.0.0", port=9470, udp_idle=UDP_IDLE, udp_peers=UDP_PEERS, clock=time.monotonic):
+        self.host = host
+        self.port = port
+        self.hosts = {}
+        self.loop = None
+        self._servers = []
+        self.udp_idle = udp_idle
+        self.udp_peers = udp_peers
+        self.clock = clock
+        self._udp = {}  # peer address -> (FrameDecoder, last datagram), least recently heard first
+
+    def merge(self, decoded, addr=None):
+        if decoded is None: return
+        name, seq, ts, values = decoded
+        st = self.hosts.get(name)
+        if st is None:
+            st = self.hosts[name] = HostState(name)
+        for k in FIELDS:
+            if k in values: st.history.add(k, values[k], ts)
+        st.last = values
+        st.last_seen = time.time()
+        st.frames += 1
+        st.addr = addr
+
+    async def _handle_tcp(self, reader, writer):
+        dec = FrameDecoder()
+        addr = writer.get_extra_info("peername")
+        try:
+            while True:
+                n = LENGTH.unpack(await reader.readexactly(LENGTH.size))[0]
+                self.merge(dec.decode(await reader.readexactly(n)), addr)
+        except (asyncio.IncompleteReadError, asyncio.CancelledError, ConnectionError, ValueError, struct.error, IndexError):
+            pass
+        finally:
+            writer.close()
+
+    def _handle_udp(self, data, addr):
+        now = self.clock()
+        udp = self._udp
+        entry = udp.pop(addr, None)
+        dec = entry[0] if entry else FrameDecoder()
+        udp[addr] = (dec, now)  # re-inserted, so the dict stays ordered by last datagram
+        # Peers that went quiet (agent gone, or back on a new source port) and anything past the cap
+        while len(udp) > 1:
+            first = next(iter(udp))
+            if len(udp) <= self.udp_peers and now - udp[first][1] < self.udp_idle: break
+            del udp[first]
+        try: self.merge(dec.decode(data), addr)
+        except (ValueError, struct.error, IndexError): pass
+
+    async def start(self):
+        self.loop = asyncio.get_running_loop()
+        server = await asyncio.start_server(self._handle_tcp, self.host, self.port, backlog=1024)
+        self.port = server.sockets[0].getsockname()[1]
+        agg = self
+
+        class UDP(asyncio.DatagramProtocol):
+            def datagram_received(self, data, addr):
+                agg._handle_udp(data, addr)
+
+        transport, _ = await self.loop.create_datagram_endpoint(UDP, local_addr=(self.host, self.port))
+        try: transport.get_extra_info("socket").setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+        except OSError: pass
+        self._servers = [server, transport]
+        return self
+
+    def start_thread(self):
+        # For the UI process: run the loop on a daemon thread and return once the sockets are bound
+        ready = threading.Event()
+        error = []
+
+        def run():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            try:
+                loop.run_until_complete(self.start())
+            except OSError as e:
+                error.append(e)
+                return
+            finally:
+                ready.set()
+            loop.run_forever()
+
+        threading.Thread(target=run, daemon=True, name="aggregator").start()
+        ready.wait(5)
+        if error: raise error[0]
+        return self
+
+    async def close(self):
+        for s in self._servers: s.close()
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for t in tasks: t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stop(self):
+        # Only for start_thread(); asyncio.run() users cancel their own task
+        loop, self.loop = self.loop, None
+        if not loop: return
+        async def _close():
+            await self.close()
+            loop.stop()
+        asyncio.run_coroutine_threadsafe(_close(), loop)
+
+    def snapshot(self):
+        return sorted(self.hosts.values(), key=lambda h: h.name)
+
+def run_agent(target, name=None):
+    # Headless: no UI, no Tk; every published snapshot goes to the aggregator
+    from engine import SysEngine
+    from utils import ConfigManager
+    config = ConfigManager.load()
+    config["fleet_target"] = target
+    if name: config["fleet_name"] = name
+    engine = SysEngine(config)
+    try:
+        engine.update_loop(lambda snap: None)
+    except KeyboardInterrupt:
+        engine.stop()
+
+def run_aggregator(port, host="0.0.0.0"):
+    agg = Aggregator(host, port)
+
+    async def report():
+        await agg.start()
+        print(f"aggregating on {host}:{agg.port} (tcp+udp)")
+        while True:
+            await asyncio.sleep(10)
+            now = time.time()
+            live = sum(1 for h in agg.hosts.values() if now - h.last_seen < 10)
+            print(f"{len(agg.hosts)} hosts, {live} live, {sum(h.frames for h in agg.hosts.values())} frames")
+
+    try:
+        asyncio.run(report())
+    except KeyboardInterrupt:
+        pass
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(description="SysPulse fleet agent / aggregator")
+    sub = ap.add_subparsers(dest="mode", required=True)
+    a = sub.add_parser("agent", help="stream this host's snapshots")
+    a.add_argument("target", help="tcp://host:port or udp://host:port")
+    a.add_argument("--name", help="host name reported to the aggregator")
+    g = sub.add_parser("aggregate", help="collect snapshots from agents")
+    g.add_argument("port", type=int, nargs="?", default=9470)
+    g.add_argument("--host", default="0.0.0.0")
+    args = ap.parse_args()
+    if args.mode == "agent": run_agent(args.target, args.name)
+    else: run_aggregator(args.port, args.host)
+
+if __name__ == "__main__":
+    main()
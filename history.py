@@ -0,0 +1,188 @@
+from array import array
+import time
+from chunks import ChunkedSeries
+
+_np = False
+
+def numpy():
+    # numpy costs ~100ms to import, so it is loaded on first use (None when not installed)
+    global _np
+    if _np is False:
+        try:
+            import numpy as np
+            _np = np
+        except ImportError:
+            _np = None
+    return _np
+
+# (resolution in seconds, number of buckets kept)
+# 10s -> 1h, 1min -> 24h, 10min -> 7 days
+TIERS = ((10, 360), (60, 1440), (600, 1008))
+RAW_CAPACITY = 600
+# Long look-back keeps every sample in compressed chunks, values quantized to this step
+QUANTUM = 0.01
+
+class RingBuffer:
+    # Fixed-capacity float ring. Every value is written twice (at i and i+capacity),
+    # so the newest `capacity` samples are always one contiguous run and view() never copies.
+    def __init__(self, capacity, fill=0.0):
+        self.capacity = capacity
+        self.data = array("d", [fill]) * (capacity * 2)
+        self.head = 0  # start of the window, i.e. the oldest sample
+        self.count = 0
+        np = numpy()
+        self._np = np.frombuffer(self.data, dtype=np.float64) if np else None
+
+    def append(self, val):
+        i = self.head
+        self.data[i] = val
+        self.data[i + self.capacity] = val
+        self.head = i + 1 if i + 1 < self.capacity else 0
+        if self.count < self.capacity:
+            self.count += 1
+
+    def view(self, n=None):
+        # Last n samples, oldest first (whole window, padded with the fill value, by default)
+        end = self.head + self.capacity
+        start = end - (self.capacity if n is None else min(n, self.capacity))
+        if self._np is not None:
+            return self._np[start:end]
+        return memoryview(self.data)[start:end]
+
+    def valid(self):
+        return self.view(self.count)
+
+    def last(self):
+        return self.data[self.head + self.capacity - 1]
+
+    def __len__(self):
+        return self.capacity
+
+    def nbytes(self):
+        return self.data.itemsize * len(self.data)
+
+class Tier:
+    # One roll-up resolution: min/max/mean per bucket plus the bucket start time
+    def __init__(self, resolution, capacity):
+        self.resolution = resolution
+        self.t = RingBuffer(capacity)
+        self.lo = RingBuffer(capacity)
+        self.hi = RingBuffer(capacity)
+        self.mean = RingBuffer(capacity)
+        self._bucket = None
+        self._lo = self._hi = self._sum = 0.0
+        self._n = 0
+
+    def add(self, ts, val):
+        bucket = int(ts // self.resolution)
+        if bucket != self._bucket:
+            self.flush()
+            self._bucket = bucket
+            self._lo = self._hi = val
+        elif val < self._lo: self._lo = val
+        elif val > self._hi: self._hi = val
+        self._sum += val
+        self._n += 1
+
+    def flush(self):
+        if not self._n: return
+        self.t.append(self._bucket * self.resolution)
+        self.lo.append(self._lo)
+        self.hi.append(self._hi)
+        self.mean.append(self._sum / self._n)
+        self._sum = 0.0
+        self._n = 0
+
+    def nbytes(self):
+        return sum(r.nbytes() for r in (self.t, self.lo, self.hi, self.mean))
+
+class Series:
+    # Raw samples at the sampling rate, rolled up automatically into the coarser tiers.
+    # With a retention (seconds) every sample also goes into compressed chunks for range() queries.
+    def __init__(self, capacity=RAW_CAPACITY, tiers=TIERS, retention=0, quantum=QUANTUM):
+        self.t = RingBuffer(capacity)
+        self.raw = RingBuffer(capacity)
+        self.tiers = [Tier(res, cap) for res, cap in tiers]
+        self.chunks = ChunkedSeries(retention, quantum) if retention else None
+
+    def add(self, val, ts=None):
+        if ts is None: ts = time.time()
+        self.t.append(ts)
+        self.raw.append(val)
+        for tier in self.tiers:
+            tier.add(ts, val)
+        if self.chunks: self.chunks.add(ts, val)
+
+    def range(self, start=None, end=None):
+        # (timestamps, values) arrays for [start, end] at full resolution: decoded from the chunks
+        # reaching into the range, or cut from the raw window when there is no long retention
+        if self.chunks: return self.chunks.range(start, end)
+        t, v = array("d"), array("d")
+        for ts, val in zip(self.t.valid(), self.raw.valid()):
+            if (start is None or ts >= start) and (end is None or ts <= end):
+                t.append(ts)
+                v.append(val)
+        return t, v
+
+    def tier(self, resolution):
+        for tier in self.tiers:
+            if tier.resolution == resolution:
+                return tier
+        raise KeyError(resolution)
+
+    def nbytes(self):
+        n = self.t.nbytes() + self.raw.nbytes() + sum(t.nbytes() for t in self.tiers)
+        return n + (self.chunks.nbytes() if self.chunks else 0)
+
+class HistoryStore:
+    # One Series per metric. history["cpu"] is the raw window as a zero-copy view.
+    def __init__(self, capacity=RAW_CAPACITY, tiers=TIERS, retention=0):
+        self.capacity = capacity
+        self.tier_spec = tiers
+        self.retention = retention  # seconds of compressed full-resolution history per series (0: none)
+        self.specs = []  # (name prefix, capacity, tiers, retention) overrides, e.g. leaner per-core series
+        self.series = {}
+
+    def configure(self, prefix, capacity, tiers, retention=None):
+        self.specs.append((prefix, capacity, tiers, self.retention if retention is None else retention))
+
+    def _new(self, name):
+        capacity, tiers, retention = self.capacity, self.tier_spec, self.retention
+        for prefix, cap, t, r in self.specs:
+            if name.startswith(prefix):
+                capacity, tiers, retention = cap, t, r
+                break
+        s = self.series[name] = Series(capacity, tiers, retention)
+        return s
+
+    def add(self, name, val, ts=None):
+        s = self.series.get(name)
+        if s is None:
+            s = self._new(name)
+        s.add(val, ts)
+
+    def record(self, ts, values):
+        for name, val in values.items():
+            self.add(name, val, ts)
+
+    def get(self, name):
+        return self.series.get(name)
+
+    def range(self, name, start=None, end=None):
+        s = self.series.get(name)
+        return s.range(start, end) if s else (array("d"), array("d"))
+
+    def names(self):
+        return list(self.series)
+
+    def __contains__(self, name):
+        return name in self.series
+
+    def __getitem__(self, name):
+        s = self.series.get(name)
+        if s is None:
+            s = self._new(name)
+        return s.raw.view()
+
+    def nbytes(self):
+        return sum(s.nbytes() for s in self.series.values())
@@ -0,0 +1,68 @@
+import json
+import os
+import platform
+import socket
+import threading
+from datetime import datetime
+import psutil
+
+CACHE_FILE = "inventory.json"
+
+def collect(gpu_name="N/A"):
+    # The info page, section by section; slow calls (cpu_freq, net_if_addrs, uname) all live here
+    u = platform.uname()
+    freq = psutil.cpu_freq()
+    svmem = psutil.virtual_memory()
+    net_data = {}
+    for interface, addrs in psutil.net_if_addrs().items():
+        for addr in addrs:
+            if addr.family == socket.AF_INET:
+                net_data[interface] = addr.address
+    return {
+        "🌐 Operating System": {
+            "OS": f"{u.system} {u.release}",
+            "Build": platform.version(),
+            "Architecture": u.machine,
+            "Node Name": u.node,
+            "Boot Time": datetime.fromtimestamp(psutil.boot_time()).strftime("%Y-%m-%d %H:%M:%S")
+        },
+        "🧠 Processor (CPU)": {
+            "Processor": u.processor,
+            "Physical Cores": psutil.cpu_count(logical=False),
+            "Total Threads": psutil.cpu_count(logical=True),
+            "Max Frequency": f"{freq.max:.0f}MHz" if freq and freq.max else "N/A"
+        },
+        "⚡ Memory (RAM)": {
+            "Total RAM": f"{svmem.total / (1024**3):.2f} GB",
+            "Available": f"{svmem.available / (1024**3):.2f} GB",
+            "Swap Total": f"{psutil.swap_memory().total / (1024**3):.2f} GB"
+        },
+        "🎮 Graphics (GPU)": {"Active GPU": gpu_name},
+        "📡 Network Adapters": net_data,
+    }
+
+class Inventory:
+    # Served from the copy saved by the previous run right away; refresh() re-collects it on a
+    # background thread, saves it and calls back with the new sections
+    def __init__(self, path=CACHE_FILE):
+        self.path = path
+        self.sections = {}
+        self.fresh = False
+        try:
+            with open(path, encoding="utf-8") as f: self.sections = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def refresh(self, gpu_name=lambda: "N/A", on_done=None):
+        def run():
+            try: sections = collect(gpu_name())
+            except Exception: return
+            self.sections, self.fresh = sections, True
+            try:
+                tmp = self.path + ".tmp"
+                with open(tmp, "w", encoding="utf-8") as f: json.dump(sections, f, indent=4, ensure_ascii=False)
+                os.replace(tmp, self.path)
+            except OSError:
+                pass
+            if on_done: on_done(sections)
+        threading.Thread(target=run, daemon=True, name="inventory").start()
@@ -3,9 +3,6 @@ from utils import ConfigManager, LANGUAGES, ACCENTS
 from engine import SysEngine
 from ui import MainApp
 import threading
-import keyboard
-import pystray
-from PIL import Image, ImageDraw
 import os
 import sys
 
@@ -47,6 +44,12 @@ class StartupDialog(ctk.CTk):
         self.quit()     # Stop mainloop
 
 def create_tray_icon(app):
+    try:
+        import pystray
+        from PIL import Image, ImageDraw
+    except ImportError:
+        return  # no tray on this platform/install; the window stays the only entry point
+
     def on_quit(icon, item):
         icon.stop()
         app.exit_app()
@@ -59,13 +62,25 @@ def create_tray_icon(app):
     d = ImageDraw.Draw(img)
     d.rectangle([16, 16, 48, 48], fill='white')
     
+    def on_profile(icon, item):
+        app.after(0, app.toggle_profiler)
+
     menu = pystray.Menu(
         pystray.Item('Show/Hide', on_show),
+        pystray.Item(lambda item: 'Stop Profiling' if app.engine.profiler.active else 'Start Profiling', on_profile),
         pystray.Item('Exit', on_quit)
     )
     icon = pystray.Icon("SysPulse", img, "SysPulse Elite", menu)
     icon.run()
 
+def register_hotkeys(app):
+    try:
+        import keyboard  # optional; needs root on Linux
+        keyboard.add_hotkey('alt+s', lambda: app.after(0, app.toggle_visibility))
+        keyboard.add_hotkey('alt+g', lambda: app.after(0, app.toggle_overlay))
+    except Exception:
+        pass
+
 def main():
     config = ConfigManager.load()
     
@@ -74,15 +89,19 @@ def main():
         setup.mainloop()
         config = ConfigManager.load()
     
-    engine = SysEngine()
-    app = MainApp(config, engine)
+    engine = SysEngine(config)
+    fleet = None
+    if config.get("fleet_port"):
+        from fleet import Aggregator
+        try: fleet = Aggregator(config.get("fleet_host", "0.0.0.0"), config["fleet_port"]).start_thread()
+        except OSError: fleet = None
+    app = MainApp(config, engine, fleet)
     
-    # Global Hotkeys
-    keyboard.add_hotkey('alt+s', app.toggle_visibility)
-    keyboard.add_hotkey('alt+g', app.toggle_overlay)
+    # Global Hotkeys, registered off the startup path
+    threading.Thread(target=register_hotkeys, args=(app,), daemon=True).start()
     
     # Start engine thread
-    thread = threading.Thread(target=engine.update_loop, args=(app.on_engine_data,), daemon=True)
+    thread = threading.Thread(target=engine.update_loop, args=(app.dispatcher.submit,), daemon=True)
     thread.start()
     
     # Start Tray in background
@@ -0,0 +1,124 @@
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Fast public DNS resolvers; a TCP connect to port 53 is a cheap, privilege-free ping
+TARGETS = [("8.8.8.8", 53), ("1.1.1.1", 53)]
+
+class TTLCache:
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def put(self, key, val, ttl):
+        with self._lock:
+            self._data[key] = (val, time.monotonic() + ttl)
+
+    def get(self, key, default=None):
+        item = self._data.get(key)
+        if item is None or item[1] < time.monotonic():
+            return default
+        return item[0]
+
+def tcp_latency(host, port, timeout=1.0):
+    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    s.settimeout(timeout)
+    try:
+        start = time.perf_counter()
+        s.connect((host, port))
+        return (time.perf_counter() - start) * 1000
+    except OSError:
+        return None
+    finally:
+        s.close()
+
+def probe_target(host, port, count=3, timeout=1.0):
+    rtts = [r for r in (tcp_latency(host, port, timeout) for _ in range(count)) if r is not None]
+    res = {"target": f"{host}:{port}", "sent": count, "recv": len(rtts),
+           "loss": (count - len(rtts)) / count * 100, "min": None, "avg": None, "max": None, "jitter": None}
+    if rtts:
+        res["min"] = min(rtts)
+        res["avg"] = sum(rtts) / len(rtts)
+        res["max"] = max(rtts)
+        # Mean difference between consecutive round trips (RFC 3550 style, unsmoothed)
+        res["jitter"] = sum(abs(a - b) for a, b in zip(rtts, rtts[1:])) / (len(rtts) - 1) if len(rtts) > 1 else 0.0
+    return res
+
+def probe_all(targets, count=3, timeout=1.0, pool=None):
+    own = pool is None
+    pool = pool or ThreadPoolExecutor(max_workers=max(1, len(targets)))
+    try:
+        futures = [pool.submit(probe_target, h, p, count, timeout) for h, p in targets]
+        return [f.result() for f in futures]
+    finally:
+        if own: pool.shutdown(wait=False)
+
+def lookup_ips(timeout=2):
+    try: local_ip = socket.gethostbyname(socket.gethostname())
+    except OSError: local_ip = "127.0.0.1"
+    try:
+        import requests  # only needed here, and only on the probe thread
+        public_ip = requests.get('https://api.ipify.org', timeout=timeout).text
+    except Exception: public_ip = "Unknown"
+    return local_ip, public_ip
+
+class NetProbe:
+    # Runs every network probe on its own thread; the sampling loop only reads `cache`
+    def __init__(self, targets=None, interval=8.0, ip_interval=300.0, count=3, timeout=1.0):
+        self.targets = list(targets or TARGETS)
+        self.interval = interval
+        self.ip_interval = ip_interval
+        self.count = count
+        self.timeout = timeout
+        self.cache = TTLCache()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pool = None
+
+    def start(self):
+        if self._thread: return
+        self._stop.clear()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, len(self.targets)) + 1, thread_name_prefix="netprobe")
+        self._thread = threading.Thread(target=self._run, daemon=True, name="netprobe")
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._pool: self._pool.shutdown(wait=False)
+        self._thread = None
+
+    def _refresh_ips(self):
+        self.cache.put("ips", lookup_ips(), self.ip_interval * 2)
+
+    def _run(self):
+        next_ips = 0.0
+        while not self._stop.is_set():
+            now = time.monotonic()
+            try:
+                if now >= next_ips:
+                    # The HTTPS lookup is slow; keep it off the latency probes' critical path
+                    self._pool.submit(self._refresh_ips)
+                    next_ips = now + self.ip_interval
+                results = probe_all(self.targets, self.count, self.timeout, self._pool)
+            except RuntimeError:
+                break  # pool shut down under us
+            ttl = self.interval * 3
+            for r in results:
+                self.cache.put(f"latency:{r['target']}", r, ttl)
+            self.cache.put("latency", tuple(results), ttl)
+            self._stop.wait(self.interval)
+
+    def ping_ms(self):
+        # Best average RTT; NaN before the first probe round, inf when no target answered
+        results = self.cache.get("latency")
+        if results is None: return float("nan")
+        best = [r["avg"] for r in results if r["avg"] is not None]
+        return min(best) if best else float("inf")
+
+    def latency(self):
+        # Per-target stats of the last probe round, () before the first one
+        return self.cache.get("latency", ())
+
+    def ips(self):
+        return self.cache.get("ips", ("127.0.0.1", "Unknown"))
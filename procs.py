@@ -0,0 +1,87 @@
+import heapq
+import threading
+import psutil
+
+SYSTEM_USERS = ('SYSTEM', 'LOCAL SERVICE', 'NETWORK SERVICE', 'ROOT')
+
+class ProcRow:
+    __slots__ = ("pid", "name", "username", "cpu", "mem_mb", "status", "create_time", "is_sys")
+
+    def __init__(self, pid, name, username, create_time):
+        self.pid = pid
+        self.name = name
+        self.username = username
+        self.create_time = create_time
+        self.is_sys = not username or any(s in username.upper() for s in SYSTEM_USERS)
+        self.cpu = 0.0
+        self.mem_mb = 0.0
+        self.status = ""
+
+# Sort keys for ProcessSampler.top(); numeric columns sort descending by default
+COLUMNS = {
+    "name": (lambda r: r.name.lower(), False),
+    "pid": (lambda r: r.pid, False),
+    "cpu": (lambda r: r.cpu, True),
+    "mem": (lambda r: r.mem_mb, True),
+}
+
+class ProcessSampler:
+    # Keeps one psutil.Process per (pid, create_time) alive between samples, so cpu_percent()
+    # measures the delta since the previous sample instead of returning 0 for a fresh object
+    def __init__(self):
+        self.procs = {}   # pid -> (create_time, Process, ProcRow); (pid, create_time) is the identity
+        self.rows = []
+        self.samples = 0
+        self._lock = threading.Lock()
+        self._sampling = threading.Lock()
+
+    def _track(self, pid):
+        p = psutil.Process(pid)
+        with p.oneshot():
+            ct = p.create_time()
+            try: user = p.username()
+            except psutil.Error: user = None
+            row = ProcRow(pid, p.name(), user, ct)
+        p.cpu_percent(None)  # prime the CPU time baseline
+        return ct, p, row
+
+    def sample(self):
+        with self._sampling:
+            self._sample()
+
+    def _sample(self):
+        alive = {}
+        for pid in psutil.pids():
+            entry = self.procs.get(pid)
+            try:
+                # is_running() compares the cached Process's create_time against the pid's current one, so a
+                # reused pid drops its entry and the new process gets its own name, user and CPU baseline
+                if entry is not None and not entry[1].is_running():
+                    entry = None
+                if entry is None:
+                    entry = self._track(pid)
+                p, row = entry[1], entry[2]
+                with p.oneshot():
+                    row.cpu = p.cpu_percent(None)
+                    row.mem_mb = p.memory_info().rss / (1024 * 1024)
+                    row.status = p.status()
+                alive[pid] = entry
+            except psutil.Error:
+                pass
+        # Anything not listed this round has exited and is dropped with its Process object
+        rows = [e[2] for e in alive.values()]
+        with self._lock:
+            self.procs = alive
+            self.rows = rows
+            self.samples += 1
+
+    def top(self, n, column="cpu", descending=None):
+        key, default_desc = COLUMNS[column]
+        desc = default_desc if descending is None else descending
+        with self._lock:
+            rows = self.rows
+        pick = heapq.nlargest if desc else heapq.nsmallest
+        return pick(n, rows, key=key)
+
+    def count(self):
+        return len(self.rows)
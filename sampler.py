@@ -0,0 +1,362 @@
+import itertools
+import json
+import os
+import struct
+import time
+from multiprocessing import shared_memory
+from snapshot import Snapshot, fill
+
+# Shared-memory layout v1, written by one sampler process and read by any number of consumers
+#   header   <4sHHII magic "SPSH", version, core count, slot count, slot size, then at fixed offsets
+#            head (u64, last complete record), meta seq (u64), meta length (u32), consumers (u32),
+#            stop (u32) and refresh interval (f64); the last three are written by the owner
+#   meta     JSON for what rarely changes (adapter/device names, disk capacity, IPs, GPU name)
+#   slots    record n lives in slot n % slots: u64 seq, then f64 only: Snapshot.SCALARS, nic count,
+#            dev count, MAX_NICS * (rx, tx), MAX_DEVS * (read, write, read_iops, write_iops, latency), cores
+# Slots and meta are seqlocked: the writer zeroes (meta: makes odd) the sequence word, writes the body and
+# stores the new sequence last; a reader keeps what it unpacked only if the word reads the same before
+# and after. Readers never write (except the owner's control words), so adding one costs the sampler nothing.
+MAGIC = b"SPSH"
+VERSION = 1
+INFO = struct.Struct("<4sHHII")
+U64 = struct.Struct("<Q")
+U32 = struct.Struct("<I")
+F64 = struct.Struct("<d")
+HEAD, META_SEQ, META_LEN, CONSUMERS, STOP, REFRESH = 16, 24, 32, 36, 40, 48
+META_OFF = 64
+META_SIZE = 16384 - META_OFF
+SLOTS_OFF = 16384
+SLOTS = 64
+MAX_NICS = 16
+MAX_DEVS = 16
+# Each owner creates its own segment, NAME-<owner pid>; consumers in other processes find live ones
+# with find_rings() (Linux lists them in SHM_DIR; elsewhere the name has to be passed explicitly)
+NAME = "syspulse"
+SHM_DIR = "/dev/shm"
+
+def record_struct(ncores):
+    n = len(Snapshot.SCALARS) + 2 + MAX_NICS * Snapshot.NIC_STRIDE + MAX_DEVS * Snapshot.DEV_STRIDE + ncores
+    return struct.Struct(f"<{n}d")
+
+def _track(shm, on):
+    try:
+        from multiprocessing import resource_tracker
+        (resource_tracker.register if on else resource_tracker.unregister)(shm._name, "shared_memory")
+    except Exception:
+        pass  # no tracker (Windows)
+
+_owned = itertools.count(1)
+
+def ring_name(base=NAME):
+    # NAME-<pid>, and NAME-<pid>-<n> for further rings owned by the same process
+    n = next(_owned)
+    return f"{base}-{os.getpid()}" + (f"-{n}" if n > 1 else "")
+
+def _unlink(name):
+    try:
+        old = shared_memory.SharedMemory(name)
+        old.close()
+        old.unlink()
+    except (FileNotFoundError, ValueError):
+        pass
+
+def find_rings(base=NAME, sweep=False):
+    # Names of live owners' segments, newest first; sweep=True unlinks those whose owner died without
+    # cleaning up (killed), which nobody else can still be using
+    try: entries = list(os.scandir(SHM_DIR))
+    except OSError: return []
+    import psutil
+    live = []
+    for e in entries:
+        if not e.name.startswith(base + "-"): continue
+        pid = e.name[len(base) + 1:].split("-")[0]
+        if not pid.isdigit(): continue
+        if psutil.pid_exists(int(pid)):
+            try: live.append((e.stat().st_mtime, e.name))
+            except OSError: pass
+        elif sweep:
+            _unlink(e.name)
+    return [name for _, name in sorted(live, reverse=True)]
+
+class ShmRing:
+    # create=True makes a segment named after this process (see ring_name) and owns its lifetime, so a
+    # second instance never touches the first one's ring; otherwise attach to an existing one by name
+    def __init__(self, name=None, ncores=None, slots=SLOTS, create=False):
+        self.owner = create
+        if create:
+            base = name or NAME
+            find_rings(base, sweep=True)
+            name = ring_name(base)
+            ncores = ncores or os.cpu_count() or 1
+            self.record = record_struct(ncores)
+            size = SLOTS_OFF + slots * (U64.size + self.record.size)
+            try:
+                self.shm = shared_memory.SharedMemory(name, create=True, size=size)
+            except FileExistsError:
+                # Left behind by a dead process that had our pid; nobody live can own it
+                _unlink(name)
+                self.shm = shared_memory.SharedMemory(name, create=True, size=size)
+            INFO.pack_into(self.shm.buf, 0, MAGIC, VERSION, ncores, slots, U64.size + self.record.size)
+        else:
+            if name is None:
+                found = find_rings()
+                if not found: raise FileNotFoundError("no running SysPulse sampler found")
+                name = found[0]
+            self.shm = shared_memory.SharedMemory(name)
+            # Attaching registers the segment with this process's resource tracker, which would unlink
+            # it on exit; only the owner may do that
+            _track(self.shm, False)
+            magic, version, ncores, slots, _ = INFO.unpack_from(self.shm.buf, 0)
+            if magic != MAGIC or version != VERSION:
+                self.shm.close()
+                raise ValueError("not a SysPulse sampler segment")
+            self.record = record_struct(ncores)
+        self.name = name
+        self.buf = self.shm.buf
+        self.ncores = ncores
+        self.slots = slots
+        self.slot_size = U64.size + self.record.size
+
+    def head(self):
+        return U64.unpack_from(self.buf, HEAD)[0]
+
+    def _slot(self, seq):
+        return SLOTS_OFF + (seq % self.slots) * self.slot_size
+
+    # Control words: owner -> sampler
+    def set_control(self, consumers=None, refresh=None, stop=None):
+        if consumers is not None: U32.pack_into(self.buf, CONSUMERS, int(consumers))
+        if refresh is not None: F64.pack_into(self.buf, REFRESH, refresh)
+        if stop is not None: U32.pack_into(self.buf, STOP, int(stop))
+
+    def control(self):
+        return U32.unpack_from(self.buf, CONSUMERS)[0], F64.unpack_from(self.buf, REFRESH)[0], U32.unpack_from(self.buf, STOP)[0]
+
+    def write(self, snap, nic_idx=None, dev_idx=None):
+        # nic_idx/dev_idx: which adapters/devices take the MAX_NICS/MAX_DEVS slots (default: the first ones)
+        seq = self.head() + 1
+        off = self._slot(seq)
+        U64.pack_into(self.buf, off, 0)
+        nics = _pick(snap.nics, Snapshot.NIC_STRIDE, MAX_NICS, nic_idx)
+        devs = _pick(snap.devs, Snapshot.DEV_STRIDE, MAX_DEVS, dev_idx)
+        nn, nd = len(nics) // Snapshot.NIC_STRIDE, len(devs) // Snapshot.DEV_STRIDE
+        nics += [0.0] * (MAX_NICS * Snapshot.NIC_STRIDE - len(nics))
+        devs += [0.0] * (MAX_DEVS * Snapshot.DEV_STRIDE - len(devs))
+        cores = list(snap.cores[:self.ncores])
+        cores += [0.0] * (self.ncores - len(cores))
+        self.record.pack_into(self.buf, off + U64.size, *[getattr(snap, k) for k in Snapshot.SCALARS],
+                              nn, nd, *nics, *devs, *cores)
+        U64.pack_into(self.buf, off, seq)
+        U64.pack_into(self.buf, HEAD, seq)
+        return seq
+
+    def read(self, seq, out):
+        # Fills `out` from record `seq`; False if it was overwritten (reader fell `slots` behind) or torn
+        off = self._slot(seq)
+        if U64.unpack_from(self.buf, off)[0] != seq: return False
+        v = self.record.unpack_from(self.buf, off + U64.size)
+        if U64.unpack_from(self.buf, off)[0] != seq: return False
+        s = len(Snapshot.SCALARS)
+        for name, x in zip(Snapshot.SCALARS, v): setattr(out, name, x)
+        nn, nd = int(v[s]), int(v[s + 1])
+        i = s + 2
+        fill(out.nics, v[i:i + nn * Snapshot.NIC_STRIDE])
+        i += MAX_NICS * Snapshot.NIC_STRIDE
+        fill(out.devs, v[i:i + nd * Snapshot.DEV_STRIDE])
+        i += MAX_DEVS * Snapshot.DEV_STRIDE
+        fill(out.cores, v[i:])
+        return True
+
+    def write_meta(self, meta):
+        data = json.dumps(meta).encode()[:META_SIZE]
+        seq = U64.unpack_from(self.buf, META_SEQ)[0]
+        U64.pack_into(self.buf, META_SEQ, seq + 1)  # odd: being written
+        self.buf[META_OFF:META_OFF + len(data)] = data
+        U32.pack_into(self.buf, META_LEN, len(data))
+        U64.pack_into(self.buf, META_SEQ, seq + 2)
+
+    def meta_seq(self):
+        return U64.unpack_from(self.buf, META_SEQ)[0]
+
+    def read_meta(self):
+        # (seq, dict), or None while a write is in progress
+        seq = self.meta_seq()
+        if seq & 1: return None
+        n = U32.unpack_from(self.buf, META_LEN)[0]
+        data = bytes(self.buf[META_OFF:META_OFF + n])
+        if self.meta_seq() != seq: return None
+        try: return seq, json.loads(data) if data else {}
+        except ValueError: return None
+
+    def close(self):
+        self.buf = None
+        try: self.shm.close()
+        except BufferError: pass
+        if self.owner:
+            _track(self.shm, True)  # a reader sharing our tracker (spawned sampler) may have dropped it
+            try: self.shm.unlink()
+            except FileNotFoundError: pass
+
+def _pick(values, stride, limit, idx):
+    if idx is None: return list(values[:limit * stride])
+    return [v for i in idx for v in values[i * stride:(i + 1) * stride]]
+
+def busiest(values, stride, limit, width=2):
+    # Indices of the `limit` entries with the most traffic (sum of their first `width` fields), kept in
+    # their original order; None when everything fits
+    n = len(values) // stride
+    if n <= limit: return None
+    load = [sum(values[i * stride:i * stride + width]) for i in range(n)]
+    return sorted(sorted(range(n), key=load.__getitem__, reverse=True)[:limit])
+
+class RingWriter:
+    # Engine recorder in the sampler process: every tick goes into the ring, names and slow data into meta.
+    # With more adapters/devices than slots the busiest ones get them (the set, and so meta, only changes
+    # when the ranking does).
+    def __init__(self, ring, engine):
+        self.ring = ring
+        self.engine = engine
+        self._meta = None
+
+    def __call__(self, snap):
+        nic_idx = busiest(snap.nics, Snapshot.NIC_STRIDE, MAX_NICS)
+        dev_idx = busiest(snap.devs, Snapshot.DEV_STRIDE, MAX_DEVS)
+        nics = list(snap.nic_names[:MAX_NICS]) if nic_idx is None else [snap.nic_names[i] for i in nic_idx]
+        devs = list(snap.dev_names[:MAX_DEVS]) if dev_idx is None else [snap.dev_names[i] for i in dev_idx]
+        meta = {"nics": nics, "devs": devs, "disks": snap.disks, "ips": list(snap.ips), "latency": list(snap.latency), "gpu_name": self.engine.gpu_name}
+        if meta != self._meta:
+            self.ring.write_meta(meta)
+            self._meta = meta
+        self.ring.write(snap, nic_idx, dev_idx)
+
+class RingReader:
+    # One per consumer. poll() yields every record written since the previous call (oldest first, at most
+    # one ring's worth) as a Snapshot; the object is reused, so take what you need before the next one.
+    def __init__(self, ring):
+        self.ring = ring
+        self.last = ring.head()
+        self.lost = 0
+        self.meta = {}
+        self._meta_seq = None
+        self._names = ((), ())
+        self.snap = Snapshot()
+
+    def sync_meta(self):
+        if self.ring.meta_seq() == self._meta_seq: return False
+        got = self.ring.read_meta()
+        if got is None: return False
+        self._meta_seq, self.meta = got
+        self._names = (tuple(self.meta.get("nics", ())), tuple(self.meta.get("devs", ())))
+        return True
+
+    def fill_meta(self, out):
+        out.nic_names, out.dev_names = self._names
+        out.disks = self.meta.get("disks", ())
+        out.ips = tuple(self.meta.get("ips", ())) or out.ips
+        out.latency = tuple(self.meta.get("latency", ()))
+
+    def poll(self, out=None):
+        head = self.ring.head()
+        if head == self.last: return
+        self.sync_meta()
+        start = max(self.last + 1, head - self.ring.slots + 1)
+        self.lost += start - self.last - 1
+        self.last = head
+        for seq in range(start, head + 1):
+            snap = out if out is not None and seq == head else self.snap
+            if not self.ring.read(seq, snap):
+                self.lost += 1
+                continue
+            self.fill_meta(snap)
+            snap.seq = seq
+            yield snap
+
+def run_sampler(name, config):
+    # Entry point of the sampler process: an ordinary SysEngine whose only consumer is the ring
+    from engine import SysEngine
+    ring = ShmRing(name)
+    config = dict(config, sampler="thread", exporter_port=0, fleet_target="")
+    engine = SysEngine(config)
+    engine.recorders.append(RingWriter(ring, engine))
+    parent = os.getppid()
+
+    def control():
+        # Owner asked to stop or died; otherwise follow its refresh rate and whether anyone is looking
+        consumers, refresh, stop = ring.control()
+        if stop or os.getppid() != parent:
+            engine.scheduler.stop()
+            return
+        if refresh and refresh != engine.refresh_interval: engine.refresh_interval = refresh
+        if bool(consumers) != ("remote" in engine.consumers): engine.set_consumer("remote", bool(consumers))
+
+    engine.scheduler.add("control", 0.25, control)
+    try:
+        engine.update_loop(lambda snap: None)
+    except KeyboardInterrupt:
+        pass
+    engine.stop()
+    ring.close()
+
+class SamplerProcess:
+    # Owner side: creates the ring, spawns the sampler process and tears both down
+    def __init__(self, config, name=None):
+        self.ring = ShmRing(name or config.get("sampler_name") or NAME, create=True)  # named NAME-<our pid>
+        self.ring.set_control(refresh=config.get("refresh_rate", 1.0))
+        import multiprocessing
+        # spawn, not fork: the owner may already have Tk, NVML and threads
+        self.process = multiprocessing.get_context("spawn").Process(
+            target=run_sampler, args=(self.ring.name, config), daemon=True, name="syspulse-sampler")
+        self.process.start()
+
+    def stop(self, timeout=3.0):
+        self.ring.set_control(stop=True)
+        self.process.join(timeout)
+        if self.process.is_alive(): self.process.terminate()
+        self.ring.close()
+
+def run_exporter(name, port, host="127.0.0.1"):
+    # Extra consumer in its own process: serves /metrics from a running sampler's ring
+    from exporter import MetricsExporter
+    ring = ShmRing(name)
+    reader = RingReader(ring)
+    exporter = MetricsExporter(host, port).start()
+    print(f"exporting {ring.name} on {host}:{exporter.port}")
+    try:
+        while True:
+            latest = None
+            for snap in reader.poll(): latest = snap
+            if latest: exporter.publish(latest)
+            time.sleep(0.25)
+    except KeyboardInterrupt:
+        exporter.stop()
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(description="SysPulse shared-memory sampler consumers")
+    sub = ap.add_subparsers(dest="mode", required=True)
+    e = sub.add_parser("export", help="serve OpenMetrics from a running sampler")
+    e.add_argument("port", type=int)
+    e.add_argument("--name", help="segment name (default: the newest running sampler)")
+    e.add_argument("--host", default="127.0.0.1")
+    t = sub.add_parser("tail", help="print records as they arrive")
+    t.add_argument("--name", help="segment name (default: the newest running sampler)")
+    args = ap.parse_args()
+    try:
+        ring = ShmRing(args.name)
+    except (FileNotFoundError, ValueError) as e:
+        ap.error(str(e))
+    if args.mode == "export":
+        ring.close()
+        run_exporter(ring.name, args.port, args.host)
+        return
+    reader = RingReader(ring)
+    try:
+        while True:
+            for snap in reader.poll():
+                print(f"{snap.seq} {snap.ts:.3f} cpu {snap.cpu:.1f} ram {snap.ram_p:.1f} net {snap.net / 1024:.1f} KB/s")
+            time.sleep(0.25)
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
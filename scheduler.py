@@ -0,0 +1,167 @@
+import heapq
+import threading
+import time
+from selfstats import Histogram
+
+def error_text(e):
+    return None if e is None else f"{type(e).__name__}: {e}"[:200]
+
+class Job:
+    def __init__(self, name, period, fn, anchor):
+        self.name = name
+        self.period = period
+        self.fn = fn
+        # Ticks are anchor + k * period on the monotonic clock, so a slow run never shifts later ticks
+        self.anchor = anchor
+        self.k = 0
+        self.due = anchor
+        self.runs = 0
+        self.skipped = 0
+        self.cost = 0.0
+        self.hist = Histogram()  # run durations
+        self.last_jitter = 0.0
+        self.max_jitter = 0.0
+        self.avg_jitter = 0.0
+        self.errors = 0  # runs that raised; the collector's exception is kept in last_error
+        self.last_error = None
+
+    def advance(self, now):
+        self.k += 1
+        self.due = self.anchor + self.k * self.period
+        if self.due <= now:
+            # Overran one or more periods: drop the missed ticks instead of bursting to catch up
+            k = int((now - self.anchor) / self.period) + 1
+            self.skipped += k - self.k
+            self.k = k
+            self.due = self.anchor + k * self.period
+
+    def stats(self):
+        return {
+            "period": self.period, "runs": self.runs, "skipped": self.skipped,
+            "cost_ms": self.cost * 1000, "jitter_ms": self.last_jitter * 1000,
+            "max_jitter_ms": self.max_jitter * 1000, "avg_jitter_ms": self.avg_jitter * 1000,
+            "errors": self.errors, "last_error": error_text(self.last_error),
+            "duration": self.hist.snapshot()
+        }
+
+class AdaptiveRate:
+    # Stretches a period by `factor` per tick while every watched value stays within `threshold`
+    # of the sample that last reset it (so slow drift counts too); a sharp change snaps back to base
+    def __init__(self, base, ceiling, factor=1.5, threshold=5.0):
+        self.base = base
+        self.ceiling = ceiling
+        self.factor = factor
+        self.threshold = threshold
+        self.period = base
+        self.ref = None
+
+    def reset(self):
+        self.ref = None
+        self.period = self.base
+
+    def update(self, values):
+        ref = self.ref
+        if ref is None or any(abs(v - ref.get(k, v)) >= self.threshold for k, v in values.items()):
+            self.ref = dict(values)
+            self.period = self.base
+        else:
+            self.period = min(self.period * self.factor, max(self.ceiling, self.base))
+        return self.period
+
+class Scheduler:
+    # Runs each collector on its own period from a single thread, earliest deadline first
+    def __init__(self, clock=time.monotonic, profiler=None):
+        self.clock = clock
+        self.profiler = profiler  # selfstats.Profiler; jobs run through it so it can see this thread
+        self.jobs = {}
+        self._heap = []
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+
+    def _push(self, job):
+        self._seq += 1
+        heapq.heappush(self._heap, (job.due, self._seq, job))
+
+    def add(self, name, period, fn, delay=0.0):
+        job = Job(name, period, fn, self.clock() + delay)
+        with self._lock:
+            old = self.jobs.get(name)
+            if old: old.fn = None
+            self.jobs[name] = job
+            self._push(job)
+        self._wake.set()
+        return job
+
+    def remove(self, name):
+        with self._lock:
+            job = self.jobs.pop(name, None)
+            if job: job.fn = None  # lazily dropped when it reaches the top of the heap
+
+    def set_period(self, name, period):
+        job = self.jobs.get(name)
+        if not job or job.period == period: return
+        with self._lock:
+            # Keep the already scheduled tick and re-anchor the grid on it
+            job.anchor = job.due
+            job.k = 0
+            job.period = period
+
+    def kick(self, name):
+        # Run `name` as soon as possible and re-anchor its grid there (the old heap entry goes stale)
+        with self._lock:
+            job = self.jobs.get(name)
+            if not job: return
+            job.anchor = job.due = self.clock()
+            job.k = 0
+            self._push(job)
+        self._wake.set()
+
+    def report(self):
+        return {name: job.stats() for name, job in list(self.jobs.items())}
+
+    def run(self):
+        self._stop.clear()
+        while not self._stop.is_set():
+            self._wake.clear()
+            with self._lock:
+                if not self._heap:
+                    job = None
+                else:
+                    due, _, job = self._heap[0]
+            if job is None:
+                self._wake.wait()
+                continue
+            now = self.clock()
+            if due > now:
+                self._wake.wait(due - now)
+                continue
+            with self._lock:
+                heapq.heappop(self._heap)
+            if job.fn is None or job.due != due:
+                continue
+
+            jitter = now - due
+            job.last_jitter = jitter
+            if jitter > job.max_jitter: job.max_jitter = jitter
+            job.avg_jitter += (jitter - job.avg_jitter) * 0.1
+            try:
+                if self.profiler: self.profiler.call(job.fn)
+                else: job.fn()
+            except Exception as e:
+                # One failing collector must not stop the others; it shows up in report() instead
+                job.errors += 1
+                job.last_error = e
+            end = self.clock()
+            job.cost = end - now
+            job.hist.observe(job.cost)
+            job.runs += 1
+            with self._lock:
+                if job.fn is not None:
+                    job.advance(end)
+                    self._push(job)
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
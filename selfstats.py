@@ -0,0 +1,165 @@
+import bisect
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import psutil
+
+# Upper bucket bounds in seconds (50us .. 1s, then overflow)
+BOUNDS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+class Histogram:
+    # Fixed log-spaced buckets: observe() is a bisect and an increment, nothing is allocated
+    __slots__ = ("counts", "count", "sum", "max", "last")
+
+    def __init__(self):
+        self.counts = [0] * (len(BOUNDS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def observe(self, sec):
+        self.counts[bisect.bisect_left(BOUNDS, sec)] += 1
+        self.count += 1
+        self.sum += sec
+        self.last = sec
+        if sec > self.max: self.max = sec
+
+    def quantile(self, q):
+        # Upper bound of the bucket holding the q-th observation (max for the overflow bucket)
+        if not self.count: return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return BOUNDS[i] if i < len(BOUNDS) else self.max
+        return self.max
+
+    def snapshot(self):
+        return {"count": self.count, "mean_ms": self.sum / self.count * 1000 if self.count else 0.0,
+                "p50_ms": self.quantile(0.5) * 1000, "p99_ms": self.quantile(0.99) * 1000,
+                "max_ms": self.max * 1000, "last_ms": self.last * 1000}
+
+class Timings:
+    # Named histograms, created on first use
+    def __init__(self):
+        self.hists = {}
+
+    def observe(self, name, sec):
+        h = self.hists.get(name)
+        if h is None:
+            h = self.hists[name] = Histogram()
+        h.observe(sec)
+
+    def report(self):
+        return {name: h.snapshot() for name, h in list(self.hists.items())}
+
+class SelfMonitor:
+    # SysPulse's own footprint; sample() runs as a slow engine job, snapshot() is the public view
+    def __init__(self):
+        self.proc = psutil.Process()
+        self.proc.cpu_percent()
+        self.cpu = 0.0
+        self.rss = 0
+        self.threads = 0
+        self.sources = {}  # name -> callable returning a report dict (collectors, ui phases, tk lag, ...)
+
+    def sample(self):
+        with self.proc.oneshot():
+            self.cpu = self.proc.cpu_percent() / (psutil.cpu_count() or 1)
+            self.rss = self.proc.memory_info().rss
+            self.threads = self.proc.num_threads()
+
+    def snapshot(self):
+        out = {"cpu": self.cpu, "rss": self.rss, "threads": self.threads}
+        for name, fn in list(self.sources.items()):
+            try: out[name] = fn()
+            except Exception: pass
+        return out
+
+class TkHeartbeat:
+    # after() tick every `interval` ms; how late it fires is the event-loop lag
+    def __init__(self, root, interval=100):
+        self.root = root
+        self.interval = interval
+        self.hist = Histogram()
+        self._due = time.perf_counter() + interval / 1000
+        self._job = root.after(interval, self._beat)
+
+    def _beat(self):
+        now = time.perf_counter()
+        self.hist.observe(max(0.0, now - self._due))
+        self._due = now + self.interval / 1000
+        self._job = self.root.after(self.interval, self._beat)
+
+    def stop(self):
+        if self._job:
+            self.root.after_cancel(self._job)
+            self._job = None
+
+# From 3.12 cProfile sits on sys.monitoring: one enabled profile sees every thread, but only one may be
+# active in the process at a time. Before that the profile hook is per thread.
+PROCESS_WIDE = sys.version_info >= (3, 12)
+
+class Profiler:
+    # On demand cProfile + tracemalloc. With a per-thread hook the engine scheduler and the UI dispatcher
+    # route their work through call(), which keeps one profile per thread while active; with a process-wide
+    # one toggle() enables a single profile and call() just runs the function. Either way a profiler that
+    # cannot be enabled (another tool holds the hook) never keeps the wrapped call from running.
+    # toggle() starts; the next toggle() writes <dir>/syspulse_<time>.prof (all threads merged) and
+    # .mem.txt (top allocation sites) and returns that path prefix.
+    def __init__(self, directory="profiles"):
+        self.directory = directory
+        self.active = False
+        self.profiles = {}  # thread name (or "process") -> cProfile.Profile
+
+    def call(self, fn, *args):
+        if not self.active or PROCESS_WIDE: return fn(*args)
+        name = threading.current_thread().name
+        prof = self.profiles.get(name)
+        if prof is None:
+            import cProfile
+            prof = self.profiles[name] = cProfile.Profile()
+        try:
+            prof.enable()
+        except ValueError:
+            return fn(*args)
+        try:
+            return fn(*args)
+        finally:
+            prof.disable()
+
+    def toggle(self):
+        if not self.active:
+            self.profiles = {}
+            if PROCESS_WIDE:
+                import cProfile
+                prof = cProfile.Profile()
+                try:
+                    prof.enable()
+                    self.profiles["process"] = prof
+                except ValueError:
+                    pass  # still record allocations
+            tracemalloc.start(10)
+            self.active = True
+            return None
+        self.active = False
+        for prof in self.profiles.values(): prof.disable()
+        snap = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, time.strftime("syspulse_%Y%m%d_%H%M%S"))
+        import pstats
+        stats = None
+        for prof in self.profiles.values():
+            prof.create_stats()
+            if not prof.stats: continue
+            if stats is None: stats = pstats.Stats(prof)
+            else: stats.add(prof)
+        if stats: stats.dump_stats(base + ".prof")
+        with open(base + ".mem.txt", "w") as f:
+            for stat in snap.statistics("lineno")[:50]: f.write(f"{stat}\n")
+        return base
@@ -0,0 +1,147 @@
+import glob
+import os
+import sys
+import time
+
+# Default sampling period per sensor kind, in seconds
+PERIODS = {"temp": 2.0, "fan": 5.0, "in": 10.0}
+
+# Preferred "CPU temperature" sources, best first: (chip or zone type, label or None)
+CPU_SENSORS = [("coretemp", "Package id 0"), ("k10temp", "Tctl"), ("k10temp", "Tdie"), ("zenpower", "Tdie"),
+               ("cpu_thermal", None), ("x86_pkg_temp", None), ("acpitz", None), ("wmi", None)]
+
+class Sensor:
+    __slots__ = ("backend", "kind", "chip", "label", "path", "fd", "scale", "period", "due", "value")
+
+    def __init__(self, backend, kind, chip, label, path=None, scale=1.0, period=None):
+        self.backend = backend
+        self.kind = kind
+        self.chip = chip
+        self.label = label
+        self.path = path
+        self.fd = None
+        self.scale = scale
+        self.period = period or PERIODS.get(kind, 5.0)
+        self.due = 0.0
+        self.value = None
+
+    @property
+    def key(self):
+        return f"{self.chip}/{self.label}"
+
+def _read_text(path):
+    try:
+        with open(path) as f: return f.read().strip()
+    except OSError:
+        return None
+
+class HwmonBackend:
+    # Discovers hwmon/thermal_zone inputs once; each read is a single pread on a descriptor kept open
+    name = "hwmon"
+
+    def __init__(self, root="/sys"):
+        self.root = root
+
+    def discover(self):
+        sensors = []
+        for hw in sorted(glob.glob(os.path.join(self.root, "class", "hwmon", "hwmon*"))):
+            chip = _read_text(os.path.join(hw, "name")) or os.path.basename(hw)
+            for kind, scale in (("temp", 1000.0), ("fan", 1.0), ("in", 1000.0)):
+                for path in sorted(glob.glob(os.path.join(hw, f"{kind}*_input"))):
+                    base = path[:-len("_input")]
+                    label = _read_text(base + "_label") or os.path.basename(base)
+                    sensors.append(Sensor(self, kind, chip, label, path, scale))
+        for zone in sorted(glob.glob(os.path.join(self.root, "class", "thermal", "thermal_zone*"))):
+            ztype = _read_text(os.path.join(zone, "type")) or os.path.basename(zone)
+            sensors.append(Sensor(self, "temp", ztype, os.path.basename(zone), os.path.join(zone, "temp"), 1000.0))
+        for s in sensors:
+            try: s.fd = os.open(s.path, os.O_RDONLY)
+            except OSError: s.fd = None
+        return [s for s in sensors if s.fd is not None]
+
+    def read(self, sensor):
+        try:
+            return int(os.pread(sensor.fd, 32, 0)) / sensor.scale
+        except (OSError, ValueError):
+            return None
+
+    def close(self, sensors):
+        for s in sensors:
+            if s.fd is not None:
+                try: os.close(s.fd)
+                except OSError: pass
+                s.fd = None
+
+class WmiBackend:
+    # Windows ACPI thermal zone through WMI; slow, so it gets a longer default period
+    name = "wmi"
+
+    def __init__(self):
+        import wmi
+        self.conn = wmi.WMI(namespace="root\\wmi")
+
+    def discover(self):
+        return [Sensor(self, "temp", "wmi", "ThermalZone", period=5.0)]
+
+    def read(self, sensor):
+        try:
+            temps = self.conn.MSAcpi_ThermalZoneTemperature()
+            if temps:
+                return (temps[0].CurrentTemperature / 10.0) - 273.15
+        except Exception:
+            pass
+        return None
+
+    def close(self, sensors):
+        pass
+
+def available_backends(root="/sys"):
+    backends = []
+    if os.path.isdir(os.path.join(root, "class", "hwmon")) or os.path.isdir(os.path.join(root, "class", "thermal")):
+        backends.append(HwmonBackend(root))
+    if sys.platform == "win32":
+        try: backends.append(WmiBackend())
+        except Exception: pass  # wmi not installed or WMI unavailable
+    return backends
+
+class SensorHub:
+    # Every sensor from every backend behind one interface, each sampled on its own period
+    def __init__(self, backends=None, periods=None, clock=time.monotonic):
+        self.backends = available_backends() if backends is None else backends
+        self.clock = clock
+        self.sensors = []
+        for b in self.backends:
+            self.sensors.extend(b.discover())
+        for s in self.sensors:
+            if periods and s.kind in periods: s.period = periods[s.kind]
+        self.cpu_sensor = self._pick_cpu()
+
+    def _pick_cpu(self):
+        temps = [s for s in self.sensors if s.kind == "temp"]
+        for chip, label in CPU_SENSORS:
+            for s in temps:
+                if s.chip == chip and (label is None or s.label == label):
+                    return s
+        return temps[0] if temps else None
+
+    def sample(self):
+        # Reads only the sensors whose period has elapsed and returns those
+        now = self.clock()
+        read = []
+        for s in self.sensors:
+            if now >= s.due:
+                s.value = s.backend.read(s)
+                s.due = now + s.period
+                read.append(s)
+        return read
+
+    def cpu_temp(self):
+        s = self.cpu_sensor
+        return s.value if s and s.value is not None else 0
+
+    def values(self, kind=None):
+        return {s.key: s.value for s in self.sensors if (kind is None or s.kind == kind) and s.value is not None}
+
+    def close(self):
+        for b in self.backends:
+            b.close([s for s in self.sensors if s.backend is b])
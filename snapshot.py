@@ -0,0 +1,88 @@
+from array import array
+
+NAN = float("nan")
+
+def known(v):
+    # False for NaN, the "no reading" marker (no battery, no ping result yet)
+    return v == v
+
+class Snapshot:
+    # One engine tick. Only numbers and references to immutable data; formatting is up to the reader.
+    #   cores: busy % per logical CPU
+    #   nic_names / nics: per adapter (rx, tx) in B/s, flattened
+    #   dev_names / devs: per block device (read, write, read_iops, write_iops, latency ms), flattened
+    #   disks: the engine's capacity list (replaced, never mutated), ips: (local, public)
+    #   ping: best average RTT in ms, NaN before the first probe, inf when every target failed
+    #   latency: NetProbe's last round, one dict per target (target, sent, recv, loss %, min/avg/max/jitter ms
+    #            or None), replaced every round and never mutated
+    SCALARS = ("ts", "cpu", "cpu_t", "cpu_user", "cpu_system", "cpu_iowait", "ram_p", "ram_used", "ram_total",
+               "gpu_v", "gpu_t", "vram", "net", "ping", "batt", "batt_plugged", "jitter",
+               "self_cpu", "self_rss", "self_threads")
+    __slots__ = ("seq",) + SCALARS + ("cores", "nic_names", "nics", "dev_names", "devs", "disks", "ips", "latency")
+    NIC_STRIDE = 2
+    DEV_STRIDE = 5
+    # History / alert / archive names that differ from the attribute
+    ALIASES = {"ram": "ram_p"}
+
+    def __init__(self):
+        self.seq = 0
+        for name in self.SCALARS: setattr(self, name, 0.0)
+        self.ping = self.batt = self.batt_plugged = NAN
+        self.cores = array("d")
+        self.nic_names = ()
+        self.nics = array("d")
+        self.dev_names = ()
+        self.devs = array("d")
+        self.disks = ()
+        self.ips = ("127.0.0.1", "Unknown")
+        self.latency = ()
+
+    def get(self, name, default=None):
+        v = getattr(self, self.ALIASES.get(name, name), default)
+        return v if v is None or known(v) else default
+
+    def nic(self, i):
+        j = i * self.NIC_STRIDE
+        return self.nics[j], self.nics[j + 1]
+
+    def dev(self, i):
+        j = i * self.DEV_STRIDE
+        return tuple(self.devs[j:j + self.DEV_STRIDE])
+
+    def disk_io(self, disk):
+        # I/O rates of the block device behind one `disks` entry, None when it has none
+        dev = disk.get("dev") or disk["name"].rsplit("/", 1)[-1]
+        if dev not in self.dev_names: return None
+        return self.dev(self.dev_names.index(dev))
+
+def fill(buf, values):
+    # Resizes an array in place only when the element count changes
+    n = len(values)
+    if len(buf) != n:
+        del buf[n:]
+        buf.extend([0.0] * (n - len(buf)))
+    for i, v in enumerate(values): buf[i] = v
+
+class SnapshotBuffer:
+    # Triple buffer between the engine thread (writer) and any number of readers. The writer fills
+    # back() and publish()es it; a reader takes `current` (one reference read, no lock, no copy) and
+    # may use it until two more publishes have happened, because a slot is only rewritten on the third.
+    # Anything holding a snapshot longer can compare snap.seq with the value it saw first.
+    def __init__(self, slots=3):
+        self.slots = [Snapshot() for _ in range(slots)]
+        self.current = self.slots[0]
+        self.seq = 0
+        self._i = 0
+
+    def back(self):
+        # A slot handed out but never published is handed out again, so failed fills never cycle into `current`
+        if self.slots[self._i] is self.current:
+            self._i = (self._i + 1) % len(self.slots)
+        snap = self.slots[self._i]
+        snap.seq = -1  # being written
+        return snap
+
+    def publish(self, snap):
+        self.seq += 1
+        snap.seq = self.seq
+        self.current = snap
@@ -0,0 +1,144 @@
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from attribution import SpaceSaving, ProcessAttribution, describe, iter_proc, iter_psutil
+
+def skewed_stream(n, keys, seed=3):
+    # Zipf-like load: key i gets weight ~ 1 / (i + 1), plus a long tail of one-off keys
+    rng = random.Random(seed)
+    weights = [1.0 / (i + 1) for i in range(keys)]
+    for _ in range(n):
+        if rng.random() < 0.2:
+            yield f"tail-{rng.randrange(10 ** 6)}", rng.random()
+        else:
+            yield f"key-{rng.choices(range(keys), weights)[0]}", 1.0 + rng.random()
+
+class SpaceSavingTest(unittest.TestCase):
+    def test_top_k_on_skewed_stream(self):
+        k = 32
+        ss = SpaceSaving(k)
+        exact = {}
+        for key, w in skewed_stream(50000, 500):
+            ss.add(key, w)
+            exact[key] = exact.get(key, 0.0) + w
+        total = sum(exact.values())
+        self.assertLessEqual(len(ss.counts), k)
+        truth = sorted(exact, key=exact.get, reverse=True)
+        top = ss.top(5)
+        self.assertEqual([key for key, _, _ in top], truth[:5])
+        for key, count, error in ss.top(k):
+            # Never under-counted, over-counted by at most the recorded error, and error <= total / k
+            self.assertGreaterEqual(count + 1e-9, exact[key])
+            self.assertLessEqual(count - error, exact[key] + 1e-9)
+            self.assertLessEqual(error, total / k + 1e-9)
+        # Every key heavier than total / k is guaranteed to be tracked
+        for key in truth:
+            if exact[key] <= total / k: break
+            self.assertIn(key, ss.counts)
+
+    def test_decay(self):
+        ss = SpaceSaving(4)
+        ss.add("old", 100.0)
+        ss.decay(0.5)
+        ss.add("new", 60.0)
+        self.assertEqual([key for key, _, _ in ss.top(2)], ["new", "old"])
+
+class FakeProcs:
+    # Stands in for /proc: (pid, name, start, cpu s, rss bytes, io bytes, ctx switches) per process
+    def __init__(self):
+        self.procs = {}
+
+    def __call__(self):
+        return [(pid,) + p for pid, p in self.procs.items()]
+
+    def run(self, dt, load):
+        # Advance every process by dt seconds; load: name -> CPU cores used
+        for pid, (name, start, cpu, rss, io, ctx) in self.procs.items():
+            self.procs[pid] = (name, start, cpu + dt * load.get(name, 0.0), rss, io + int(dt * 1000), ctx + 10)
+
+class AttributionTest(unittest.TestCase):
+    def test_synthetic_load(self):
+        now = [0.0]
+        procs = FakeProcs()
+        procs.procs = {1: ("init", 1, 0.0, 10 << 20, 0, 0), 2: ("burner", 5, 0.0, 50 << 20, 0, 0),
+                       3: ("editor", 7, 0.0, 400 << 20, 0, 0)}
+        attr = ProcessAttribution(k=8, half_life=30.0, clock=lambda: now[0])
+        attr.source = procs
+        attr.sample()  # baseline only
+        load = {"burner": 0.9, "editor": 0.05}
+        for _ in range(600):
+            now[0] += 2.0
+            procs.run(2.0, load)
+            # Short-lived compilers: a new pid every sample, all charged to one name
+            pid = 1000 + int(now[0])
+            procs.procs[pid] = ("cc1", pid, 0.2, 30 << 20, 0, 0)
+            procs.procs.pop(pid - 2, None)
+            attr.sample()
+        cpu = dict(attr.top("cpu"))
+        self.assertEqual(attr.top("cpu", 1)[0][0], "burner")
+        self.assertAlmostEqual(cpu["burner"], 90.0, delta=5.0)
+        self.assertAlmostEqual(cpu["cc1"], 10.0, delta=3.0)  # 0.2 CPU s per 2 s
+        self.assertEqual(attr.top("rss", 1)[0][0], "editor")
+        self.assertLessEqual(max(len(s.counts) for s in attr.recent.values()), 8)
+
+        class Incident:
+            metric = "cpu"
+            offenders = None
+        inc = Incident()
+        attr.begin(inc)
+        load["editor"] = 1.5  # the editor runs away while the incident is open
+        for _ in range(30):
+            now[0] += 2.0
+            procs.run(2.0, load)
+            attr.sample()
+        attr.end(inc)
+        self.assertEqual(inc.resource, "cpu")
+        self.assertEqual(inc.offenders["cpu"][0][0], "editor")
+        self.assertAlmostEqual(inc.offenders["cpu"][0][1], 150.0, delta=5.0)
+        self.assertTrue(describe(inc.offenders, "cpu").startswith("editor 150%"))
+        self.assertEqual(attr.windows, {})
+
+class LiveProcessTest(unittest.TestCase):
+    # A real busy loop under a name of its own (the interpreter started through a symlink), ranked by both
+    # process sources against whatever else the machine is running
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        exe = os.path.join(self.dir, "spburner")
+        try: os.symlink(sys.executable, exe)
+        except (OSError, NotImplementedError): self.skipTest("no symlinks")
+        self.burner = subprocess.Popen([exe, "-c", "while True: pass"])
+
+    def tearDown(self):
+        self.burner.kill()
+        self.burner.wait()
+        shutil.rmtree(self.dir)
+
+    def test_busy_loop_ranks_first(self):
+        sources = {"psutil": iter_psutil}
+        if os.path.exists("/proc/self/stat"): sources["proc"] = iter_proc
+        for name, source in sources.items():
+            with self.subTest(source=name):
+                attr = ProcessAttribution(k=16)
+                attr.source = source
+
+                class Incident:
+                    metric = "cpu"
+                inc = Incident()
+                attr.sample()
+                attr.begin(inc)
+                for _ in range(4):
+                    time.sleep(0.25)
+                    attr.sample()
+                attr.end(inc)
+                names = [key for key, _ in inc.offenders["cpu"][:3]]
+                self.assertIn("spburner", names)
+                self.assertGreater(dict(inc.offenders["cpu"])["spburner"], 50.0)  # % of one core
+                self.assertIn("spburner", [key for key, _ in attr.top("cpu", 3)])  # the decayed summary agrees
+
+if __name__ == "__main__":
+    unittest.main()
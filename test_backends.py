@@ -0,0 +1,53 @@
+import os
+import sys
+import unittest
+import psutil
+from backends import LinuxBackend, core_times
+
+@unittest.skipUnless(sys.platform.startswith("linux") and hasattr(os, "preadv"), "reads /proc")
+class LinuxParityTest(unittest.TestCase):
+    # LinuxBackend against psutil on the live /proc. Counters keep moving between the two reads, so every
+    # LinuxBackend value has to land between a psutil read taken just before it and one taken just after.
+    def setUp(self):
+        self.backend = LinuxBackend()
+
+    def tearDown(self):
+        self.backend.close()
+
+    def assertBetween(self, before, value, after, what):
+        for lo, v, hi in zip(before, value, after):
+            self.assertTrue(lo - 1e-6 <= v <= hi + 1e-6, f"{what}: {v} not within [{lo}, {hi}]")
+
+    def test_cpu_times(self):
+        tick = os.sysconf("SC_CLK_TCK")
+        before = [core_times(t) for t in psutil.cpu_times(percpu=True)]
+        self.backend.read_cpu()
+        cores = [tuple(v / tick for v in c) for c in self.backend.sample_obj.cores]
+        after = [core_times(t) for t in psutil.cpu_times(percpu=True)]
+        self.assertEqual(len(cores), len(before))
+        for i, (lo, c, hi) in enumerate(zip(before, cores, after)):
+            self.assertBetween(lo, c, hi, f"cpu{i}")
+
+    def test_net_counters(self):
+        before = {nic: (c.bytes_recv, c.bytes_sent, c.packets_recv, c.packets_sent)
+                  for nic, c in psutil.net_io_counters(pernic=True, nowrap=False).items()}
+        net = self.backend.read_net()
+        after = {nic: (c.bytes_recv, c.bytes_sent, c.packets_recv, c.packets_sent)
+                 for nic, c in psutil.net_io_counters(pernic=True, nowrap=False).items()}
+        self.assertEqual(set(net), set(before))
+        for nic in net:
+            self.assertBetween(before[nic], net[nic], after[nic], nic)
+
+    def test_diskstats(self):
+        def read():
+            return {dev: (c.read_bytes, c.write_bytes, c.read_count, c.write_count, c.read_time + c.write_time)
+                    for dev, c in (psutil.disk_io_counters(perdisk=True, nowrap=False) or {}).items()}
+        before = read()
+        disk = self.backend.read_disk()
+        after = read()
+        self.assertEqual(set(disk), set(before))
+        for dev in before:
+            self.assertBetween(before[dev], disk[dev], after[dev], dev)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import shutil
+import tempfile
+import unittest
+from collections import namedtuple
+from unittest import mock
+from collectors import DiskCollector, block_device
+from snapshot import Snapshot, fill
+from utils import disk_rate_text
+
+Part = namedtuple("Part", "device mountpoint fstype opts")
+Usage = namedtuple("Usage", "total used free percent")
+
+class DiskTopologyTest(unittest.TestCase):
+    # A temporary /sys/class/block laid out like the kernel's: partitions are links into their disk's
+    # directory and carry a "partition" file; loop devices and a device-mapper volume sit alongside
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.sysfs = os.path.join(self.root, "class", "block")
+        os.makedirs(self.sysfs)
+        for disk, parts in (("sda", ("sda1", "sda2")), ("nvme0n1", ("nvme0n1p2",)), ("dm-0", ()), ("loop0", ())):
+            ddir = os.path.join(self.root, "devices", disk)
+            os.makedirs(ddir)
+            os.symlink(ddir, os.path.join(self.sysfs, disk))
+            for p in parts:
+                os.makedirs(os.path.join(ddir, p))
+                open(os.path.join(ddir, p, "partition"), "w").close()
+                os.symlink(os.path.join(ddir, p), os.path.join(self.sysfs, p))
+        # /dev/mapper/root is a link to ../dm-0
+        os.makedirs(os.path.join(self.root, "dev", "mapper"))
+        open(os.path.join(self.root, "dev", "dm-0"), "w").close()
+        self.mapper = os.path.join(self.root, "dev", "mapper", "root")
+        os.symlink("../dm-0", self.mapper)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_block_device(self):
+        self.assertEqual(block_device("/dev/sda1", self.sysfs), "sda")
+        self.assertEqual(block_device("/dev/nvme0n1p2", self.sysfs), "nvme0n1")
+        self.assertEqual(block_device(self.mapper, self.sysfs), "dm-0")
+        self.assertEqual(block_device("/dev/sda", self.sysfs), "sda")
+        self.assertIsNone(block_device("/dev/sdz9", self.sysfs))
+
+    def test_partition_to_rate_text(self):
+        # Capacity entry for a partition -> its disk's I/O rates -> the dashboard's rate label
+        parts = [Part("/dev/sda1", "/", "ext4", "rw"), Part("/dev/nvme0n1p2", "/home", "ext4", "rw"),
+                 Part(self.mapper, "/srv", "xfs", "rw")]
+        now = [0.0]
+        disks = DiskCollector(sysfs=self.sysfs, clock=lambda: now[0])
+        with mock.patch("psutil.disk_partitions", return_value=parts), \
+             mock.patch("psutil.disk_usage", return_value=Usage(100, 40, 60, 40.0)):
+            capacity = disks.sample_capacity()
+        self.assertEqual([d["dev"] for d in capacity], ["sda", "nvme0n1", "dm-0"])
+
+        mb = 1048576
+        counters = lambda k: {"loop0": (k * mb, 0, k, 0, 0), "sda": (k * 2 * mb, k * mb, k, k, k), "sda1": (k * mb, 0, k, 0, 0),
+                              "nvme0n1": (0, k * 4 * mb, 0, k, k), "dm-0": (k * mb // 2, 0, k, 0, 0)}
+        disks.sample_io(counters(1))
+        now[0] = 1.0
+        rates = disks.sample_io(counters(2))
+        self.assertEqual(sorted(rates), ["dm-0", "nvme0n1", "sda"])  # no partitions, no loop devices
+
+        # Fill a snapshot the way SysEngine.collect_fast does
+        snap = Snapshot()
+        snap.dev_names = tuple(rates)
+        fill(snap.devs, [r[k] for r in rates.values() for k in DiskCollector.FIELDS])
+        snap.disks = capacity
+        text = [disk_rate_text(snap.disk_io(d)) for d in snap.disks]
+        self.assertEqual(text, ["R 2.0 W 1.0 MB/s", "R 0.0 W 4.0 MB/s", "R 0.5 W 0.0 MB/s"])
+        self.assertIsNone(snap.disk_io({"name": "/dev/sdz9"}))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import re
+import unittest
+import urllib.error
+import urllib.request
+from exporter import MetricsExporter, CONTENT_TYPE, render
+from snapshot import Snapshot, fill
+
+SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})? (\S+)$')
+LABEL = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"(,|$)')
+
+def parse(text):
+    # Minimal OpenMetrics text parser: {family: {"type", "unit", "help", "samples": [(labels, value)]}}
+    # that also enforces the layout rules a scraper relies on
+    lines = text.split("\n")
+    assert lines[-2:] == ["# EOF", ""], "exposition must end with # EOF and a newline"
+    families, current = {}, None
+    for line in lines[:-2]:
+        if line.startswith("# "):
+            _, kind, name, rest = (line.split(" ", 3) + [""])[:4]
+            if kind == "TYPE":
+                assert name not in families, f"family {name} declared twice"
+                current = families[name] = {"type": rest, "unit": None, "help": None, "samples": []}
+            else:
+                assert current is families.get(name), f"{kind} for {name} outside its family"
+                current[kind.lower()] = rest
+            continue
+        m = SAMPLE.match(line)
+        assert m, f"bad sample line {line!r}"
+        name, labels, value = m.groups()
+        assert current is not None and name == list(families)[-1], f"sample {name} outside its family"
+        parsed = {}
+        if labels:
+            pos = 0
+            for lm in LABEL.finditer(labels):
+                assert lm.start() == pos, f"bad labels {labels!r}"
+                parsed[lm.group(1)] = re.sub(r'\\(.)', lambda e: {"n": "\n"}.get(e.group(1), e.group(1)), lm.group(2))
+                pos = lm.end()
+            assert pos == len(labels), f"bad labels {labels!r}"
+        current["samples"].append((parsed, float(value)))
+    for name, fam in families.items():
+        assert fam["type"] == "gauge" and fam["help"] and fam["samples"], name
+        if fam["unit"]: assert name.endswith("_" + fam["unit"]), name
+    return families
+
+def snapshot():
+    s = Snapshot()
+    s.cpu, s.cpu_user, s.cpu_system, s.cpu_iowait = 37.5, 20.0, 15.0, 2.5
+    s.ram_p, s.ram_used, s.cpu_t = 61.2, 8 * 1024 ** 3, 55.0
+    fill(s.cores, [10.0, 90.0])
+    s.nic_names = ("eth0", 'we"ird\\nic')
+    fill(s.nics, [1000.0, 2000.0, 3.0, 4.0])
+    s.dev_names = ("sda",)
+    fill(s.devs, [4096.0, 8192.0, 1.0, 2.0, 5.0])
+    s.disks = [{"name": "/dev/sda1", "mount": "/", "total": 100 * 1024 ** 3, "used": 42.0}]
+    s.ping = 12.0
+    s.latency = ({"target": "8.8.8.8:53", "sent": 3, "recv": 3, "loss": 0.0, "min": 10.0, "avg": 12.0, "max": 14.0, "jitter": 2.0},
+                 {"target": "1.1.1.1:53", "sent": 3, "recv": 0, "loss": 100.0, "min": None, "avg": None, "max": None, "jitter": None})
+    return s
+
+class ExporterTest(unittest.TestCase):
+    def test_render_parses(self):
+        fams = parse(render(snapshot()).decode())
+        get = lambda name: fams["syspulse_" + name]["samples"]
+        self.assertEqual(get("cpu_usage_percent"), [({}, 37.5)])
+        self.assertEqual(get("cpu_core_usage_percent"), [({"core": "0"}, 10.0), ({"core": "1"}, 90.0)])
+        self.assertEqual(get("network_transmit_bytes_per_second"), [({"device": "eth0"}, 2000.0), ({"device": 'we"ird\\nic'}, 4.0)])
+        self.assertEqual(get("disk_request_latency_seconds"), [({"device": "sda"}, 0.005)])
+        self.assertEqual(get("filesystem_usage_percent"), [({"device": "/dev/sda1", "mountpoint": "/"}, 42.0)])
+        self.assertEqual(get("network_latency_seconds"), [({}, 0.012)])
+        self.assertEqual(get("network_probe_loss_percent"), [({"target": "8.8.8.8:53"}, 0.0), ({"target": "1.1.1.1:53"}, 100.0)])
+        self.assertEqual(len(get("network_probe_rtt_seconds")), 3)  # the failed target has no RTT samples
+        # NaN readings (no battery) leave their family out entirely
+        self.assertNotIn("syspulse_battery_percent", fams)
+
+    def test_scrape(self):
+        exporter = MetricsExporter("127.0.0.1", 0).start()
+        try:
+            url = f"http://127.0.0.1:{exporter.port}/metrics"
+            with urllib.request.urlopen(url, timeout=5) as r:
+                self.assertEqual(parse(r.read().decode()), {})  # nothing published yet
+            exporter.publish(snapshot())
+            with urllib.request.urlopen(url, timeout=5) as r:
+                self.assertEqual(r.headers["Content-Type"], CONTENT_TYPE)
+                fams = parse(r.read().decode())
+            self.assertEqual(fams["syspulse_memory_usage_percent"]["samples"], [({}, 61.2)])
+            self.assertEqual(exporter.scrapes, 2)
+            with self.assertRaises(urllib.error.HTTPError) as err:
+                urllib.request.urlopen(f"http://127.0.0.1:{exporter.port}/nope", timeout=5)
+            self.assertEqual(err.exception.code, 404)
+        finally:
+            exporter.stop()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import time
+import unittest
+from fleet import Agent, Aggregator, FrameEncoder
+from snapshot import Snapshot, fill
+
+def wait_for(cond, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not cond():
+        if time.monotonic() > deadline: return False
+        time.sleep(0.01)
+    return True
+
+class LoopbackFleetTest(unittest.TestCase):
+    # Several TCP and UDP agents against one aggregator on 127.0.0.1
+    def setUp(self):
+        self.agg = Aggregator("127.0.0.1", 0).start_thread()
+        self.agents = []
+
+    def tearDown(self):
+        for a in self.agents: a.close()
+        self.agg.stop()
+
+    def agent(self, scheme, name):
+        a = Agent(f"{scheme}://127.0.0.1:{self.agg.port}", name)
+        self.agents.append(a)
+        return a
+
+    def test_many_agents(self):
+        agents = [self.agent(scheme, f"{scheme}-{i}") for scheme in ("tcp", "udp") for i in range(3)]
+        snap = Snapshot()
+        fill(snap.cores, [0.0] * 4)
+        # Agent clocks an hour behind the aggregator: history keeps their timestamps, liveness does not
+        skewed = time.time() - 3600
+        ticks = 40
+        for k in range(ticks):
+            for i, a in enumerate(agents):
+                snap.ts = skewed + k
+                snap.cpu = 10.0 * i + k * 0.5
+                snap.ram_p = 50.0
+                fill(snap.cores, [k, k + 1, k + 2, i])
+                a.publish(snap)
+            time.sleep(0.002)
+        names = {a.encoder.host for a in agents}
+        self.assertTrue(wait_for(lambda: all(self.agg.hosts.get(n) and self.agg.hosts[n].frames == ticks for n in names)),
+                        {n: h.frames for n, h in self.agg.hosts.items()})
+        now = time.time()
+        for i, a in enumerate(agents):
+            st = self.agg.hosts[a.encoder.host]
+            self.assertAlmostEqual(st.last["cpu"], 10.0 * i + (ticks - 1) * 0.5)
+            self.assertEqual([st.last[f"core:{c}"] for c in range(4)], [ticks - 1, ticks, ticks + 1, i])
+            self.assertLess(now - st.last_seen, 5)
+            self.assertAlmostEqual(st.history.get("cpu").t.last(), skewed + ticks - 1, places=3)
+            self.assertEqual(a.dropped, 0)
+
+    def test_unreachable_aggregator_does_not_block(self):
+        # Nothing listens on the port: publish() must return immediately and the backlog stays bounded
+        port = self.agg.port
+        self.agg.stop()
+        time.sleep(0.1)
+        a = Agent(f"tcp://127.0.0.1:{port}", "offline", backlog=8)
+        self.agents.append(a)
+        snap = Snapshot()
+        t0 = time.perf_counter()
+        for _ in range(200): a.publish(snap)
+        self.assertLess(time.perf_counter() - t0, 0.2)
+        self.assertLessEqual(len(a.pending), 8)
+        self.assertEqual(a.sent, 0)
+
+class UdpPeerTest(unittest.TestCase):
+    # Decoder bookkeeping per UDP source address, fed directly with a fake clock
+    def test_idle_peers_expire(self):
+        now = [0.0]
+        agg = Aggregator(udp_idle=60.0, udp_peers=3, clock=lambda: now[0])
+        encoders = {port: FrameEncoder(f"host-{port}", keyref=True) for port in range(5)}
+
+        def send(port):
+            frame = encoders[port].encode(now[0], ["cpu"], [float(port)])
+            agg._handle_udp(frame, ("10.0.0.1", port))
+
+        for port in (0, 1):
+            send(port)
+        now[0] = 30.0
+        send(0)
+        self.assertEqual(list(agg._udp), [("10.0.0.1", 1), ("10.0.0.1", 0)])
+        now[0] = 61.0  # port 1 has been quiet for over a minute, port 0 only for 31 s
+        send(2)
+        self.assertEqual(list(agg._udp), [("10.0.0.1", 0), ("10.0.0.1", 2)])
+        for port in (3, 4):
+            send(port)  # over the cap: the least recently heard peer goes
+        self.assertEqual(list(agg._udp), [("10.0.0.1", 2), ("10.0.0.1", 3), ("10.0.0.1", 4)])
+        self.assertEqual(agg.hosts["host-0"].frames, 2)
+        # A kept decoder still holds its keyframe, so the next delta frame decodes
+        send(2)
+        self.assertEqual((agg.hosts["host-2"].frames, agg.hosts["host-2"].last["cpu"]), (2, 2.0))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import math
+import socket
+import time
+import unittest
+from netprobe import NetProbe, probe_target
+
+def free_port():
+    # A port nothing listens on: connects to it are refused right away
+    s = socket.socket()
+    s.bind(("127.0.0.1", 0))
+    port = s.getsockname()[1]
+    s.close()
+    return port
+
+class LoopbackProbeTest(unittest.TestCase):
+    def setUp(self):
+        self.server = socket.socket()
+        self.server.bind(("127.0.0.1", 0))
+        self.server.listen(64)
+        self.port = self.server.getsockname()[1]
+
+    def tearDown(self):
+        self.server.close()
+
+    def test_probe_target(self):
+        r = probe_target("127.0.0.1", self.port, count=5, timeout=1.0)
+        self.assertEqual((r["target"], r["sent"], r["recv"], r["loss"]), (f"127.0.0.1:{self.port}", 5, 5, 0.0))
+        self.assertTrue(0 <= r["min"] <= r["avg"] <= r["max"] < 1000)
+        self.assertGreaterEqual(r["jitter"], 0.0)
+        down = probe_target("127.0.0.1", free_port(), count=3, timeout=0.5)
+        self.assertEqual((down["recv"], down["loss"], down["avg"], down["jitter"]), (0, 100.0, None, None))
+
+    def test_background_rounds(self):
+        probe = NetProbe([("127.0.0.1", self.port), ("127.0.0.1", free_port())], interval=0.05, count=2, timeout=0.5)
+        self.assertTrue(math.isnan(probe.ping_ms()))
+        self.assertEqual(probe.latency(), ())
+        probe.start()
+        try:
+            deadline = time.monotonic() + 5
+            while not probe.latency() and time.monotonic() < deadline: time.sleep(0.01)
+            up, down = probe.latency()
+            self.assertEqual((up["loss"], down["loss"]), (0.0, 100.0))
+            self.assertEqual(probe.ping_ms(), up["avg"])
+            self.assertIs(probe.cache.get(f"latency:127.0.0.1:{self.port}"), up)
+        finally:
+            probe.stop()
+
+    def test_all_targets_down(self):
+        probe = NetProbe([("127.0.0.1", free_port())], interval=0.05, count=1, timeout=0.5)
+        probe.start()
+        try:
+            deadline = time.monotonic() + 5
+            while not probe.latency() and time.monotonic() < deadline: time.sleep(0.01)
+            self.assertEqual(probe.ping_ms(), float("inf"))
+        finally:
+            probe.stop()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import shutil
+import tempfile
+import unittest
+from sensors import HwmonBackend, SensorHub, available_backends
+
+def write(root, rel, text):
+    path = os.path.join(root, rel)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f: f.write(text + "\n")
+
+class FakeSysfsTest(unittest.TestCase):
+    # A temporary /sys with two hwmon chips and a thermal zone, laid out like the kernel's
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        write(self.root, "class/hwmon/hwmon0/name", "acpitz")
+        write(self.root, "class/hwmon/hwmon0/temp1_input", "41000")
+        write(self.root, "class/hwmon/hwmon1/name", "coretemp")
+        write(self.root, "class/hwmon/hwmon1/temp1_input", "55000")
+        write(self.root, "class/hwmon/hwmon1/temp1_label", "Package id 0")
+        write(self.root, "class/hwmon/hwmon1/temp2_input", "52000")
+        write(self.root, "class/hwmon/hwmon1/temp2_label", "Core 0")
+        write(self.root, "class/hwmon/hwmon1/fan1_input", "1200")
+        write(self.root, "class/hwmon/hwmon1/in0_input", "1050")
+        write(self.root, "class/hwmon/hwmon1/in0_label", "Vcore")
+        write(self.root, "class/thermal/thermal_zone0/type", "x86_pkg_temp")
+        write(self.root, "class/thermal/thermal_zone0/temp", "56000")
+        self.backend = HwmonBackend(self.root)
+        self.sensors = self.backend.discover()
+
+    def tearDown(self):
+        self.backend.close(self.sensors)
+        shutil.rmtree(self.root)
+
+    def test_discover(self):
+        found = {(s.kind, s.key) for s in self.sensors}
+        self.assertEqual(found, {("temp", "acpitz/temp1"), ("temp", "coretemp/Package id 0"), ("temp", "coretemp/Core 0"),
+                                 ("fan", "coretemp/fan1"), ("in", "coretemp/Vcore"), ("temp", "x86_pkg_temp/thermal_zone0")})
+        self.assertEqual(available_backends(self.root)[0].root, self.root)
+        self.assertEqual(available_backends(os.path.join(self.root, "missing")), [])
+
+    def test_read_scales_and_rereads(self):
+        by_key = {s.key: s for s in self.sensors}
+        self.assertEqual(self.backend.read(by_key["coretemp/Package id 0"]), 55.0)
+        self.assertEqual(self.backend.read(by_key["coretemp/fan1"]), 1200.0)
+        self.assertEqual(self.backend.read(by_key["coretemp/Vcore"]), 1.05)
+        # Same descriptor, new value: every read is a pread from offset 0
+        write(self.root, "class/hwmon/hwmon1/temp1_input", "71500")
+        self.assertEqual(self.backend.read(by_key["coretemp/Package id 0"]), 71.5)
+        write(self.root, "class/hwmon/hwmon1/temp2_input", "garbage")
+        self.assertIsNone(self.backend.read(by_key["coretemp/Core 0"]))
+
+    def test_hub_periods_and_cpu_pick(self):
+        now = [0.0]
+        hub = SensorHub([HwmonBackend(self.root)], periods={"fan": 10.0}, clock=lambda: now[0])
+        try:
+            self.assertEqual(hub.cpu_sensor.key, "coretemp/Package id 0")
+            self.assertEqual(len(hub.sample()), 6)
+            self.assertEqual(hub.cpu_temp(), 55.0)
+            now[0] = 2.5  # temps are due again (2 s), fans (10 s) and voltages (10 s) are not
+            self.assertEqual(sorted(s.kind for s in hub.sample()), ["temp"] * 4)
+            self.assertEqual(hub.values("fan"), {"coretemp/fan1": 1200.0})
+        finally:
+            hub.close()
+        self.assertTrue(all(s.fd is None for s in hub.sensors))
+
+if __name__ == "__main__":
+    unittest.main()
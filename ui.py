@@ -1,16 +1,88 @@
 import tkinter as tk
 import customtkinter as ctk
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from utils import LANGUAGES, ACCENTS, ConfigManager
+from utils import LANGUAGES, ACCENTS, ConfigManager, disk_rate_text, collector_errors_text
+from charts import CHART_ENGINES, CoreHeatmap, DragZoom
+from viewport import Viewport, RANGES
+from procs import COLUMNS as PROC_COLUMNS
+from selfstats import Timings, TkHeartbeat
+from snapshot import known
+from inventory import Inventory
 import psutil
-import platform
-import keyboard
 import threading
-import socket
-from datetime import datetime
+import time
 from tkinter import messagebox
-from PIL import Image, ImageDraw
+
+# Widgets are only reconfigured when what they would render actually changes
+def set_text(widget, text):
+    if getattr(widget, "_sp_text", None) != text:
+        widget._sp_text = text
+        widget.configure(text=text)
+
+def set_progress(bar, val, resolution=0.001):
+    val = round(val / resolution) * resolution
+    if getattr(bar, "_sp_val", None) != val:
+        bar._sp_val = val
+        bar.set(val)
+
+class UIDispatcher:
+    # Hands the newest engine snapshot to the Tk thread through after(). Snapshots that arrive
+    # while one is still pending replace it instead of queueing, and each frame runs update
+    # phases only until `budget` seconds are spent; the rest continue on the next frame.
+    def __init__(self, root, phases, budget=0.012, profiler=None):
+        self.root = root
+        self.phases = phases
+        self.budget = budget
+        self.profiler = profiler
+        self.timings = Timings()  # per-phase duration histograms
+        self.dropped = 0
+        self.frames = 0
+        self._lock = threading.Lock()
+        self._latest = None
+        self._pending = False
+        self._data = None
+        self._next = 0
+        self._todo = 0
+
+    def submit(self, data):
+        # Called from the engine thread
+        with self._lock:
+            if self._latest is not None: self.dropped += 1
+            self._latest = data
+            if self._pending: return
+            self._pending = True
+        self._schedule(0)
+
+    def _schedule(self, delay):
+        try: self.root.after(delay, self._drain)
+        except (RuntimeError, tk.TclError): pass  # main loop already gone
+
+    def _drain(self):
+        with self._lock:
+            self._pending = False
+            if self._latest is not None:
+                self._data, self._latest = self._latest, None
+                self._todo = len(self.phases)
+        if not self._todo: return
+        self.frames += 1
+        start = time.perf_counter()
+        while self._todo:
+            phase = self.phases[self._next]
+            self._next = (self._next + 1) % len(self.phases)
+            self._todo -= 1
+            t0 = time.perf_counter()
+            try:
+                if self.profiler: self.profiler.call(phase, self._data)
+                else: phase(self._data)
+            except Exception: pass
+            now = time.perf_counter()
+            self.timings.observe(phase.__name__, now - t0)
+            if self._todo and now - start > self.budget:
+                # Over budget: yield to Tk and resume with the next phase (on fresher data if any)
+                with self._lock:
+                    if self._pending: return
+                    self._pending = True
+                self._schedule(1)
+                return
 
 class StatCard(ctk.CTkFrame):
     def __init__(self, master, title, value, sub, accent_color, **kwargs):
@@ -31,44 +103,73 @@ class StatCard(ctk.CTkFrame):
         self.prog.set(0)
 
     def update(self, val_text, val_float, accent=None):
-        self.lbl_val.configure(text=val_text)
-        self.prog.set(val_float)
-        if accent:
+        set_text(self.lbl_val, val_text)
+        set_progress(self.prog, val_float)
+        if accent and accent != self.accent_color:
+            self.accent_color = accent
             self.lbl_sub.configure(text_color=accent)
             self.prog.configure(progress_color=accent)
 
 class GaugeChart(ctk.CTkCanvas):
-    def __init__(self, master, size=120, title="CPU", accent="#3a7ebf", **kwargs):
+    # Canvas items are created once and updated in place; theme changes go through apply_theme()
+    def __init__(self, master, size=120, title="CPU", accent="#3a7ebf", animate=False, fps=30, **kwargs):
         super().__init__(master, width=size, height=size, highlightthickness=0, **kwargs)
         self.size = size
         self.title = title
         self.accent = accent
-        self.value = 0
-        self.draw()
+        self.value = 0    # target value
+        self.shown = 0    # value currently drawn (lags behind `value` while animating)
+        self.animate = animate
+        self.frame_ms = max(1, int(1000 / fps))
+        self._anim = None
+        self._drawn = (None, None)
 
-    def draw(self):
-        self.delete("all")
-        is_dark = ctk.get_appearance_mode() == "Dark"
-        bg_color = "#1a1a1a" if is_dark else "#f9f9f9"
-        self.configure(bg=bg_color)
-        bg_circle = "#2d2d2d" if is_dark else "#e0e0e0"
-        txt_color = "#ffffff" if is_dark else "#333333"
-        
         # Background arc
-        self.create_arc(10, 10, self.size-10, self.size-10, start=-30, extent=240, style="arc", outline=bg_circle, width=8)
-        
+        self.bg_arc = self.create_arc(10, 10, size-10, size-10, start=-30, extent=240, style="arc", width=8)
         # Value arc
-        extent = (self.value / 100) * 240
-        self.create_arc(10, 10, self.size-10, self.size-10, start=210, extent=-extent, style="arc", outline=self.accent, width=8)
-        
+        self.val_arc = self.create_arc(10, 10, size-10, size-10, start=210, extent=0, style="arc", outline=accent, width=8)
         # Text
-        self.create_text(self.size/2, self.size/2, text=f"{int(self.value)}%", fill=txt_color, font=("Outfit", 14, "bold"))
-        self.create_text(self.size/2, self.size-25, text=self.title, fill=self.accent, font=("Outfit", 9, "bold"))
+        self.val_txt = self.create_text(size/2, size/2, text="0%", font=("Outfit", 14, "bold"))
+        self.title_txt = self.create_text(size/2, size-25, text=title, fill=accent, font=("Outfit", 9, "bold"))
+        self.apply_theme()
+        self.draw()
+
+    def apply_theme(self):
+        is_dark = ctk.get_appearance_mode() == "Dark"
+        self.configure(bg="#1a1a1a" if is_dark else "#f9f9f9")
+        self.itemconfig(self.bg_arc, outline="#2d2d2d" if is_dark else "#e0e0e0")
+        self.itemconfig(self.val_txt, fill="#ffffff" if is_dark else "#333333")
+
+    def set_accent(self, accent):
+        if accent == self.accent: return
+        self.accent = accent
+        self.itemconfig(self.val_arc, outline=accent)
+        self.itemconfig(self.title_txt, fill=accent)
+
+    def draw(self):
+        extent = round(self.shown / 100 * 240, 1)
+        text = f"{int(self.shown)}%"
+        if extent != self._drawn[0]:
+            self.itemconfig(self.val_arc, extent=-extent)
+        if text != self._drawn[1]:
+            self.itemconfig(self.val_txt, text=text)
+        self._drawn = (extent, text)
 
     def set_value(self, val, accent=None):
+        if accent: self.set_accent(accent)
+        if val == self.value: return
         self.value = val
-        if accent: self.accent = accent
+        if not self.animate:
+            self.shown = val
+            self.draw()
+        elif self._anim is None:
+            self._anim = self.after(self.frame_ms, self._step)
+
+    def _step(self):
+        diff = self.value - self.shown
+        self.shown = self.value if abs(diff) < 0.5 else self.shown + diff * 0.35
         self.draw()
+        self._anim = self.after(self.frame_ms, self._step) if self.shown != self.value else None
 
 class GhostOverlay(ctk.CTkToplevel):
     def __init__(self, master, accent):
@@ -93,16 +194,144 @@ class GhostOverlay(ctk.CTkToplevel):
         self.lbl_fps = ctk.CTkLabel(self.frame, text="FPS: --", font=ctk.CTkFont(size=12), text_color=accent)
         self.lbl_fps.pack(pady=(2, 15))
 
-    def update_stats(self, data):
-        self.lbl_cpu.configure(text=f"CPU: {data['cpu']}% @ {data['cpu_t']:.0f}°C")
-        self.lbl_ram.configure(text=f"RAM: {data['ram_p']}%")
-        self.lbl_gpu.configure(text=f"GPU: {data['gpu_v']}% | {data['gpu_t']}°C")
+    def update_stats(self, snap):
+        set_text(self.lbl_cpu, f"CPU: {snap.cpu}% @ {snap.cpu_t:.0f}°C")
+        set_text(self.lbl_ram, f"RAM: {snap.ram_p}%")
+        set_text(self.lbl_gpu, f"GPU: {snap.gpu_v:.0f}% | {snap.gpu_t:.0f}°C")
+
+class ProcessWindow(ctk.CTkToplevel):
+    # Fixed pool of row widgets; refreshing only rewrites their text, and scrolling moves the
+    # window of rows over the sampler's sorted output instead of creating widgets
+    ROWS = 20
+    HEADERS = (("Process Name", "name", 180), ("PID", "pid", 60), ("CPU%", "cpu", 60), ("RAM (MB)", "mem", 80))
+
+    def __init__(self, master, engine, interval=2000):
+        super().__init__(master)
+        self.title("Apex Task Manager"); self.geometry("760x640")
+        self.engine = engine
+        self.interval = interval
+        self.sort_col, self.sort_desc = "cpu", True
+        self.offset = 0
+        self.row_pids = [None] * self.ROWS
+        self._job = None
+
+        header = ctk.CTkFrame(self, fg_color="transparent")
+        header.pack(fill="x", pady=10)
+        for i, (text, col, width) in enumerate(self.HEADERS):
+            ctk.CTkButton(header, text=text, width=width, height=24, fg_color="transparent", anchor="w" if i == 0 else "center",
+                          font=ctk.CTkFont(size=12, weight="bold"), command=lambda c=col: self.sort_by(c)).pack(side="left", padx=(10, 0) if i == 0 else 0)
+        ctk.CTkLabel(header, text="Recommendation", font=ctk.CTkFont(size=12, weight="bold"), width=150).pack(side="left")
+
+        body = ctk.CTkFrame(self, fg_color="transparent")
+        body.pack(fill="both", expand=True, padx=10, pady=5)
+        self.scrollbar = ctk.CTkScrollbar(body, command=self.on_scroll)
+        self.scrollbar.pack(side="right", fill="y")
+        table = ctk.CTkFrame(body, fg_color="transparent")
+        table.pack(side="left", fill="both", expand=True)
+
+        row_bg = "#2b2b2b" if ctk.get_appearance_mode() == "Dark" else "#f0f0f0"
+        self.rows = []
+        for i in range(self.ROWS):
+            f = ctk.CTkFrame(table, fg_color=row_bg)
+            f.pack(fill="x", pady=2)
+            cells = (
+                ctk.CTkLabel(f, text="", width=180, anchor="w", font=ctk.CTkFont(size=11)),
+                ctk.CTkLabel(f, text="", width=60),
+                ctk.CTkLabel(f, text="", width=60),
+                ctk.CTkLabel(f, text="", width=80),
+                ctk.CTkLabel(f, text="", width=150, font=ctk.CTkFont(size=10, weight="bold")),
+            )
+            cells[0].pack(side="left", padx=10)
+            for c in cells[1:]: c.pack(side="left")
+            btn = ctk.CTkButton(f, text="Kill", width=50, height=22, fg_color="#e74c3c", hover_color="#c0392b", command=lambda i=i: self.kill(i))
+            btn.pack(side="right", padx=10)
+            self.rows.append((f, cells, btn))
+            f.bind("<MouseWheel>", self.on_wheel)
+            for c in cells: c.bind("<MouseWheel>", self.on_wheel)
+
+        footer = ctk.CTkFrame(self, fg_color="transparent")
+        footer.pack(fill="x", pady=10)
+        self.count_lbl = ctk.CTkLabel(footer, text="", font=ctk.CTkFont(size=10), text_color="gray")
+        self.count_lbl.pack(side="left", padx=20)
+        ctk.CTkButton(footer, text="🔄 Refresh List", command=self.refresh_now, width=200).pack(side="right", padx=20)
+
+        self.protocol("WM_DELETE_WINDOW", self.close)
+        self.engine.watch_processes(True)
+        self._job = self.after(300, self.tick)
+
+    def sort_by(self, col):
+        self.sort_desc = not self.sort_desc if col == self.sort_col else PROC_COLUMNS[col][1]
+        self.sort_col = col
+        self.render()
+
+    def on_wheel(self, event):
+        self.scroll_to(self.offset - (3 if event.delta > 0 else -3))
+
+    def on_scroll(self, *args):
+        total = max(1, self.engine.procs.count())
+        if args[0] == "moveto": self.scroll_to(int(float(args[1]) * total))
+        elif args[0] == "scroll": self.scroll_to(self.offset + int(args[1]) * (self.ROWS if args[2] == "pages" else 1))
+
+    def scroll_to(self, offset):
+        offset = max(0, min(offset, self.engine.procs.count() - self.ROWS))
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+
+    def render(self):
+        sampler = self.engine.procs
+        total = sampler.count()
+        # Only the rows up to the visible window are selected, with a heap rather than a full sort
+        visible = sampler.top(self.offset + self.ROWS, self.sort_col, self.sort_desc)[self.offset:]
+        for i, (f, cells, btn) in enumerate(self.rows):
+            p = visible[i] if i < len(visible) else None
+            self.row_pids[i] = p.pid if p else None
+            if p is None:
+                for c in cells: set_text(c, "")
+                continue
+            # Risk Assessment
+            risk_text = "⚠️ Danger (System)" if p.is_sys else "✅ Safe (App)"
+            risk_color = "#e74c3c" if p.is_sys else "#2ecc71"
+            if not p.is_sys and p.cpu > 50:
+                risk_text = "⚡ High Load (Kill?)"
+                risk_color = "#f1c40f"
+            set_text(cells[0], p.name[:22])
+            set_text(cells[1], str(p.pid))
+            set_text(cells[2], f"{p.cpu:.1f}%")
+            set_text(cells[3], f"{p.mem_mb:.1f}")
+            set_text(cells[4], risk_text)
+            if getattr(cells[4], "_sp_color", None) != risk_color:
+                cells[4]._sp_color = risk_color
+                cells[4].configure(text_color=risk_color)
+        set_text(self.count_lbl, f"{self.offset + 1}-{self.offset + len(visible)} of {total} processes")
+        if total: self.scrollbar.set(self.offset / total, (self.offset + len(visible)) / total)
+
+    def tick(self):
+        self.render()
+        self._job = self.after(self.interval, self.tick)
+
+    def refresh_now(self):
+        threading.Thread(target=lambda: (self.engine.procs.sample(), self.after(0, self.render)), daemon=True).start()
+
+    def kill(self, i):
+        pid = self.row_pids[i]
+        if pid is None: return
+        if self.engine.kill_process(pid):
+            messagebox.showinfo("Success", f"PID {pid} terminated")
+        else:
+            messagebox.showerror("Error", "Critical System Process - Access Denied")
+
+    def close(self):
+        if self._job: self.after_cancel(self._job)
+        self.engine.watch_processes(False)
+        self.destroy()
 
 class MainApp(ctk.CTk):
-    def __init__(self, config, engine):
+    def __init__(self, config, engine, fleet=None):
         super().__init__()
         self.config = config
         self.engine = engine
+        self.fleet = fleet  # fleet.Aggregator when this instance collects other hosts
         self.is_mini = False
         
         # Apply initial config
@@ -115,8 +344,22 @@ class MainApp(ctk.CTk):
         self.grid_columnconfigure(1, weight=1)
         self.grid_rowconfigure(0, weight=1)
 
-        self.setup_ui()
+        self.current_page = None
         self.overlay = None
+        self.inventory = Inventory()
+        self.proc_win = None
+        self.setup_ui()
+        self.update_phases = [self.update_gauges, self.update_cards, self.update_labels,
+                              self.update_overlay, self.update_disks, self.update_heatmap, self.update_graph,
+                              self.update_fleet, self.update_self]
+        self.dispatcher = UIDispatcher(self, self.update_phases, profiler=engine.profiler)
+        self.heartbeat = TkHeartbeat(self)
+        engine.monitor.sources["ui"] = self.dispatcher.timings.report
+        engine.monitor.sources["tk_lag"] = self.heartbeat.hist.snapshot
+        self.bind("<Map>", self.update_demand, add="+")
+        self.bind("<Unmap>", self.update_demand, add="+")
+        self.update_demand()
+        self.after(1500, self.refresh_inventory)  # after the engine had a chance to bring up NVML
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
 
     def t(self, key):
@@ -133,6 +376,7 @@ class MainApp(ctk.CTk):
         self.btn_dash = self.create_nav(self.t("dash"), lambda: self.show_page("dash"), 1)
         self.btn_info = self.create_nav(self.t("info"), lambda: self.show_page("info"), 2)
         self.btn_proc = self.create_nav(self.t("proc"), self.show_processes, 3)
+        if self.fleet: self.btn_fleet = self.create_nav(self.t("fleet"), lambda: self.show_page("fleet"), 4)
         
         # Quick Settings
         ctk.CTkLabel(self.sidebar, text=self.t("refresh"), font=ctk.CTkFont(size=10)).grid(row=6, column=0, pady=(20, 0))
@@ -159,9 +403,9 @@ class MainApp(ctk.CTk):
         self.container.grid_columnconfigure(0, weight=1)
         self.container.grid_rowconfigure(1, weight=1)
         
+        # Pages are built the first time they are shown; only the dashboard exists at startup
         self.pages = {}
-        self.setup_dash()
-        self.setup_info()
+        self.page_builders = {"dash": self.setup_dash, "info": self.setup_info, "fleet": self.setup_fleet}
         
         # Mini Mode Return Button (Hidden by default)
         self.mini_back_btn = ctk.CTkButton(self.container, text="🔙 Full Mode", width=80, height=24, fg_color="transparent", border_width=1, command=self.disable_mini)
@@ -186,9 +430,9 @@ class MainApp(ctk.CTk):
         # Gauges
         g_frame = ctk.CTkFrame(page, fg_color="transparent")
         g_frame.pack(fill="x", pady=(0, 20))
-        self.cpu_gauge = GaugeChart(g_frame, title="CPU", accent=self.accent_color)
+        self.cpu_gauge = GaugeChart(g_frame, title="CPU", accent=self.accent_color, animate=True)
         self.cpu_gauge.pack(side="left", padx=20)
-        self.ram_gauge = GaugeChart(g_frame, title="RAM", accent=self.accent_color)
+        self.ram_gauge = GaugeChart(g_frame, title="RAM", accent=self.accent_color, animate=True)
         self.ram_gauge.pack(side="left", padx=20)
         
         # Stat Cards
@@ -216,10 +460,19 @@ class MainApp(ctk.CTk):
         self.disk_f.pack(fill="x", pady=(0, 20))
         self.disk_bars = {} # storage for dynamic bars
 
+        # Per-core heatmap (one image, constant cost regardless of core count)
+        self.core_box = ctk.CTkFrame(page, corner_radius=15, border_width=1)
+        self.core_box.pack(fill="x", pady=(0, 20))
+        ctk.CTkLabel(self.core_box, text=f"CPU Cores ({psutil.cpu_count() or 1})", font=ctk.CTkFont(size=11, weight="bold")).pack(anchor="w", padx=15, pady=(8, 0))
+        self.heatmap = CoreHeatmap(self.core_box, psutil.cpu_count() or 1, is_dark=ctk.get_appearance_mode() == "Dark")
+        self.heatmap.widget.pack(anchor="w", padx=15, pady=(4, 10))
+
         # Graph
         self.graph_box = ctk.CTkFrame(page, corner_radius=15, border_width=1)
         self.graph_box.pack(fill="both", expand=True)
-        self.setup_graph()
+        # The chart (and matplotlib) comes after the first paint: an idle callback runs after the pending
+        # redraws, and the timer it sets fires on a later loop iteration
+        self.after_idle(lambda: self.after(0, self.setup_graph))
 
     def setup_info(self):
         page = ctk.CTkFrame(self.container, fg_color="transparent")
@@ -230,8 +483,32 @@ class MainApp(ctk.CTk):
         scroll = ctk.CTkScrollableFrame(page, corner_radius=15, border_width=1)
         scroll.pack(fill="both", expand=True)
         
-        def add_section(title, data):
-            f = ctk.CTkFrame(scroll, fg_color="transparent")
+        # Inventory sections come from the cached copy; render_inventory() redraws them when a refresh lands
+        self.inv_box = ctk.CTkFrame(scroll, fg_color="transparent")
+        self.inv_box.pack(fill="x")
+        self.render_inventory(self.inventory.sections)
+
+        # SysPulse itself, refreshed by update_self while the page is open
+        f = ctk.CTkFrame(scroll, fg_color="transparent")
+        f.pack(fill="x", pady=10, padx=10)
+        ctk.CTkLabel(f, text="🔬 SysPulse Overhead", font=ctk.CTkFont(size=14, weight="bold"), text_color=self.accent_color).pack(anchor="w")
+        self.self_labels = {}
+        for k in ("CPU", "Memory (RSS)", "Threads", "UI Lag", "Slowest Collector", "Collector Errors", "Slowest UI Phase", "Profiler"):
+            row = ctk.CTkFrame(f, fg_color="transparent")
+            row.pack(fill="x", pady=1)
+            ctk.CTkLabel(row, text=f"{k}:", font=ctk.CTkFont(size=11, weight="bold"), width=120, anchor="w").pack(side="left")
+            self.self_labels[k] = ctk.CTkLabel(row, text="...", font=ctk.CTkFont(size=11), anchor="w")
+            self.self_labels[k].pack(side="left", padx=5)
+        self._self_t = 0.0
+
+        ctk.CTkLabel(scroll, text="Hotkeys: Alt+S (Toggle) | Alt+G (Overlay)", font=ctk.CTkFont(size=10), text_color="gray").pack(pady=20)
+
+    def render_inventory(self, sections):
+        for w in self.inv_box.winfo_children(): w.destroy()
+        if not sections:
+            ctk.CTkLabel(self.inv_box, text="Collecting system inventory...", font=ctk.CTkFont(size=11), text_color="gray").pack(pady=10, padx=10, anchor="w")
+        for title, data in sections.items():
+            f = ctk.CTkFrame(self.inv_box, fg_color="transparent")
             f.pack(fill="x", pady=10, padx=10)
             ctk.CTkLabel(f, text=title, font=ctk.CTkFont(size=14, weight="bold"), text_color=self.accent_color).pack(anchor="w")
             for k, v in data.items():
@@ -240,106 +517,191 @@ class MainApp(ctk.CTk):
                 ctk.CTkLabel(row, text=f"{k}:", font=ctk.CTkFont(size=11, weight="bold"), width=120, anchor="w").pack(side="left")
                 ctk.CTkLabel(row, text=str(v), font=ctk.CTkFont(size=11), anchor="w").pack(side="left", padx=5)
 
-        # OS Data
-        u = platform.uname()
-        os_data = {
-            "OS": f"{u.system} {u.release}",
-            "Build": platform.version(),
-            "Architecture": u.machine,
-            "Node Name": u.node,
-            "Boot Time": datetime.fromtimestamp(psutil.boot_time()).strftime("%Y-%m-%d %H:%M:%S")
-        }
-        add_section("🌐 Operating System", os_data)
-
-        # CPU Data
-        cpu_data = {
-            "Processor": u.processor,
-            "Physical Cores": psutil.cpu_count(logical=False),
-            "Total Threads": psutil.cpu_count(logical=True),
-            "Max Frequency": f"{psutil.cpu_freq().max:.0f}MHz" if psutil.cpu_freq() else "N/A"
-        }
-        add_section("🧠 Processor (CPU)", cpu_data)
-
-        # RAM Data
-        svmem = psutil.virtual_memory()
-        ram_data = {
-            "Total RAM": f"{svmem.total / (1024**3):.2f} GB",
-            "Available": f"{svmem.available / (1024**3):.2f} GB",
-            "Swap Total": f"{psutil.swap_memory().total / (1024**3):.2f} GB"
-        }
-        add_section("⚡ Memory (RAM)", ram_data)
-
-        # GPU Data
-        gpu_data = {"Active GPU": self.engine.gpu_name}
-        add_section("🎮 Graphics (GPU)", gpu_data)
-
-        # Network Interfaces
-        net_data = {}
-        for interface, addrs in psutil.net_if_addrs().items():
-            for addr in addrs:
-                if addr.family == socket.AF_INET:
-                    net_data[interface] = addr.address
-        add_section("📡 Network Adapters", net_data)
+    def refresh_inventory(self):
+        def done(sections):
+            # Inventory thread -> Tk thread; only redrawn if the info page exists already
+            try: self.after(0, lambda: "info" in self.pages and self.render_inventory(sections))
+            except (RuntimeError, tk.TclError): pass
+        self.inventory.refresh(lambda: self.engine.gpu_name, done)
 
-        ctk.CTkLabel(scroll, text="Hotkeys: Alt+S (Toggle) | Alt+G (Overlay)", font=ctk.CTkFont(size=10), text_color="gray").pack(pady=20)
+    def setup_fleet(self):
+        page = ctk.CTkFrame(self.container, fg_color="transparent")
+        self.pages["fleet"] = page
+        ctk.CTkLabel(page, text=f"{self.t('fleet')}  :{self.fleet.port}", font=ctk.CTkFont(size=22, weight="bold")).pack(pady=(0, 20), anchor="w")
+        self.fleet_box = ctk.CTkScrollableFrame(page, corner_radius=15, border_width=1)
+        self.fleet_box.pack(fill="both", expand=True)
+        self.fleet_box.grid_columnconfigure((1, 2), weight=1)
+        self.fleet_rows = {}  # host -> (cpu bar, ram bar, detail label)
+        self._fleet_t = 0.0
 
     def setup_graph(self):
+        # Built once; theme and accent changes restyle the existing chart in place
         is_dark = ctk.get_appearance_mode() == "Dark"
-        plt.style.use('dark_background' if is_dark else 'bmh')
-        self.fig, self.ax = plt.subplots(figsize=(8, 3), dpi=100)
-        self.fig.patch.set_facecolor('#1a1a1a' if is_dark else '#ffffff')
-        self.ax.set_facecolor('#1e1e1e' if is_dark else '#f9f9f9')
-        self.cpu_ln, = self.ax.plot(self.engine.history["cpu"], color=self.accent_color, label="CPU")
-        self.ram_ln, = self.ax.plot(self.engine.history["ram"], color="#e91e63", label="RAM")
-        self.ax.set_ylim(0, 105)
-        self.ax.legend(loc="upper right", frameon=False)
-        self.canvas = FigureCanvasTkAgg(self.fig, master=self.graph_box)
-        self.canvas.draw()
-        self.canvas.get_tk_widget().pack(fill="both", expand=True, padx=10, pady=10)
+        if getattr(self, "chart", None):
+            self.chart.restyle(is_dark, {"cpu": self.accent_color})
+            return
+        # Range presets and drag-to-zoom; the viewport decimates whatever range to about the chart's width
+        preset = self.config.get("chart_range", "10m")
+        self.viewport = Viewport(self.engine.history, ("cpu", "ram"), preset if preset in RANGES else "10m")
+        head = ctk.CTkFrame(self.graph_box, fg_color="transparent")
+        head.pack(fill="x", padx=15, pady=(8, 0))
+        ctk.CTkLabel(head, text=self.t("history"), font=ctk.CTkFont(size=11, weight="bold")).pack(side="left")
+        self.range_btn = ctk.CTkSegmentedButton(head, values=list(RANGES), command=self.set_chart_range)
+        self.range_btn.set(self.viewport.preset)
+        self.range_btn.pack(side="right")
+        engine = CHART_ENGINES.get(self.config.get("chart_engine"), CHART_ENGINES["matplotlib"])
+        self.chart = engine(self.graph_box, [("cpu", "CPU", self.accent_color), ("ram", "RAM", "#e91e63")], is_dark)
+        self.chart.widget.pack(fill="both", expand=True, padx=10, pady=10)
+        self.zoom = DragZoom(self.chart, self.zoom_chart, self.reset_chart_zoom)
+
+    def set_chart_range(self, preset):
+        self.viewport.set_range(preset)
+        self.config["chart_range"] = preset
+        self.draw_chart()
+        ConfigManager.save(self.config)
+
+    def zoom_chart(self, x0, x1):
+        self.viewport.zoom(x0, x1)
+        self.draw_chart()
+
+    def reset_chart_zoom(self):
+        self.viewport.reset()
+        self.draw_chart()
+
+    def draw_chart(self):
+        data, xlim = self.viewport.query(self.chart.widget.winfo_width())
+        self.chart.set_xlim(*xlim)
+        self.chart.update(data)
 
     def show_page(self, name):
+        if name not in self.pages: self.page_builders[name]()
+        self.current_page = name
         for p in self.pages.values(): p.pack_forget()
         self.pages[name].pack(fill="both", expand=True)
 
     def on_engine_data(self, data):
-        self.cpu_gauge.set_value(data["cpu"], self.accent_color)
-        self.ram_gauge.set_value(data["ram_p"], self.accent_color)
-        self.cpu_card.update(f"{data['cpu']}% @ {data['cpu_t']:.0f}°C", data['cpu']/100, self.accent_color)
-        self.ram_card.update(f"{data['ram_p']}%", data['ram_p']/100, self.accent_color)
-        self.gpu_card.update(f"{data['gpu_v']}% | {data['vram']:.0f}% VRAM", data['gpu_v']/100, self.accent_color)
-        if data["batt"]: self.bt_card.update(f"{data['batt'].percent}%", data['batt'].percent/100, self.accent_color)
-        self.ping_lbl.configure(text=f"Ping: {data['ping']}")
-        
+        for phase in self.update_phases:
+            phase(data)
+
+    def dash_visible(self):
+        return self.current_page == "dash" and self.state() not in ("withdrawn", "iconic")
+
+    def update_gauges(self, data):
+        if not self.dash_visible(): return
+        self.cpu_gauge.set_value(data.cpu, self.accent_color)
+        self.ram_gauge.set_value(data.ram_p, self.accent_color)
+
+    def update_cards(self, data):
+        if not self.dash_visible(): return
+        self.cpu_card.update(f"{data.cpu}% @ {data.cpu_t:.0f}°C", data.cpu/100, self.accent_color)
+        self.ram_card.update(f"{data.ram_p}% | {data.ram_used / 1024**3:.1f}GB", data.ram_p/100, self.accent_color)
+        self.gpu_card.update(f"{data.gpu_v:.0f}% | {data.vram:.0f}% VRAM", data.gpu_v/100, self.accent_color)
+        if known(data.batt): self.bt_card.update(f"{data.batt:.0f}%", data.batt/100, self.accent_color)
+
+    def update_labels(self, data):
+        if not self.dash_visible(): return
+        ping = data.ping
+        txt = "..." if not known(ping) else "N/A" if ping == float("inf") else f"{int(ping)} ms"
+        best = min((r for r in data.latency if r["avg"] is not None), key=lambda r: r["avg"], default=None)
+        if best:
+            txt += f" ±{best['jitter']:.0f}" + (f" ({best['loss']:.0f}% loss)" if best["loss"] else "")
+        set_text(self.ping_lbl, "Ping: " + txt)
+
+        # Build IP + Adapter info
+        txt = "L: %s | P: %s" % data.ips
+        if data.nic_names:
+            nics = sorted(((n, data.nic(i)) for i, n in enumerate(data.nic_names)), key=lambda kv: kv[1][0] + kv[1][1], reverse=True)[:2]
+            txt += f"\n{self.t('net')}: {data.net / 1024:.1f}KB/s  " + " | ".join(f"{k}: ↓{rx / 1024:.1f} ↑{tx / 1024:.1f}KB/s" for k, (rx, tx) in nics)
+        set_text(self.ip_display, txt)
+
+    def update_overlay(self, data):
         if self.overlay:
             self.overlay.update_stats(data)
-        
-        # Update Disks
-        if "disks" in data:
-            for d in data["disks"]:
-                name = d["name"]
-                if name not in self.disk_bars:
-                    frame = ctk.CTkFrame(self.disk_f, fg_color="transparent")
-                    frame.pack(fill="x", pady=2)
-                    ctk.CTkLabel(frame, text=f"Disk {name}", font=ctk.CTkFont(size=10)).pack(side="left", padx=5)
-                    pb = ctk.CTkProgressBar(frame, height=8, progress_color=self.accent_color)
-                    pb.pack(side="left", fill="x", expand=True, padx=10)
-                    self.disk_bars[name] = pb
-                self.disk_bars[name].set(d["used"]/100)
-        
-        # Build IP + Adapter info
-        txt = data["ip"]
-        if data["adapters"]:
-            txt += "\n" + " | ".join([f"{k}: {v:.1f}KB/s" for k,v in data["adapters"].items()][:2])
-        self.ip_display.configure(text=txt)
-        
-        if not self.is_mini:
-            self.cpu_ln.set_ydata(self.engine.history["cpu"])
-            self.ram_ln.set_ydata(self.engine.history["ram"])
-            self.canvas.draw_idle()
+
+    def update_disks(self, data):
+        if not self.dash_visible() or not data.disks: return
+        for d in data.disks:
+            name = d["name"]
+            if name not in self.disk_bars:
+                frame = ctk.CTkFrame(self.disk_f, fg_color="transparent")
+                frame.pack(fill="x", pady=2)
+                ctk.CTkLabel(frame, text=f"Disk {name}", font=ctk.CTkFont(size=10)).pack(side="left", padx=5)
+                rate = ctk.CTkLabel(frame, text="", font=ctk.CTkFont(size=10), text_color="gray", width=150, anchor="e")
+                rate.pack(side="right", padx=5)
+                pb = ctk.CTkProgressBar(frame, height=8, progress_color=self.accent_color)
+                pb.pack(side="left", fill="x", expand=True, padx=10)
+                self.disk_bars[name] = (pb, rate)
+            pb, rate = self.disk_bars[name]
+            set_progress(pb, d["used"]/100)
+            r = data.disk_io(d)
+            if r is not None:
+                set_text(rate, disk_rate_text(r))
+
+    def update_heatmap(self, data):
+        if not self.is_mini and self.dash_visible() and data.cores:
+            self.heatmap.update(data.cores)
+
+    def update_graph(self, data):
+        if not self.is_mini and self.dash_visible() and getattr(self, "chart", None):
+            self.draw_chart()
+
+    def update_fleet(self, data):
+        # Rows are created once per host and diffed afterwards; at most one pass per second
+        if not self.fleet or self.current_page != "fleet" or self.state() in ("withdrawn", "iconic"): return
+        now = time.time()
+        if now - self._fleet_t < 1.0: return
+        self._fleet_t = now
+        for h in self.fleet.snapshot():
+            row = self.fleet_rows.get(h.name)
+            if row is None:
+                r = len(self.fleet_rows)
+                ctk.CTkLabel(self.fleet_box, text=h.name, font=ctk.CTkFont(size=11, weight="bold"), anchor="w", width=160).grid(row=r, column=0, padx=10, pady=4, sticky="w")
+                cpu = ctk.CTkProgressBar(self.fleet_box, height=8, progress_color=self.accent_color)
+                cpu.grid(row=r, column=1, padx=5, sticky="ew")
+                ram = ctk.CTkProgressBar(self.fleet_box, height=8, progress_color="#e91e63")
+                ram.grid(row=r, column=2, padx=5, sticky="ew")
+                lbl = ctk.CTkLabel(self.fleet_box, text="", font=ctk.CTkFont(size=10), text_color="gray", width=260, anchor="e")
+                lbl.grid(row=r, column=3, padx=10, sticky="e")
+                row = self.fleet_rows[h.name] = (cpu, ram, lbl)
+            cpu, ram, lbl = row
+            v = h.last
+            set_progress(cpu, v.get("cpu", 0) / 100)
+            set_progress(ram, v.get("ram_p", 0) / 100)
+            age = now - h.last_seen
+            state = "live" if age < 10 else f"{age:.0f}s ago"
+            set_text(lbl, f"CPU {v.get('cpu', 0):.0f}%  RAM {v.get('ram_p', 0):.0f}%  {v.get('net', 0) / 1024:.1f}KB/s  {state}")
+
+    def update_self(self, data):
+        if self.current_page != "info" or self.state() in ("withdrawn", "iconic"): return
+        now = time.time()
+        if now - self._self_t < 2.0: return
+        self._self_t = now
+        st = self.engine.self_stats()
+        lbl = self.self_labels
+        set_text(lbl["CPU"], f"{st['cpu']:.2f}%")
+        set_text(lbl["Memory (RSS)"], f"{st['rss'] / 1048576:.1f} MB")
+        set_text(lbl["Threads"], str(st["threads"]))
+        lag = st.get("tk_lag", {})
+        set_text(lbl["UI Lag"], f"p50 {lag.get('p50_ms', 0):.1f} ms | p99 {lag.get('p99_ms', 0):.1f} ms | max {lag.get('max_ms', 0):.0f} ms")
+        for key, src, field in (("Slowest Collector", "collectors", lambda r: r["duration"]), ("Slowest UI Phase", "ui", lambda r: r)):
+            rows = st.get(src) or {}
+            if rows:
+                name, r = max(rows.items(), key=lambda kv: field(kv[1])["p99_ms"])
+                set_text(lbl[key], f"{name}: p50 {field(r)['p50_ms']:.2f} ms | p99 {field(r)['p99_ms']:.2f} ms")
+        set_text(lbl["Collector Errors"], collector_errors_text(st.get("collectors") or {}))
+        set_text(lbl["Profiler"], "recording..." if self.engine.profiler.active else (getattr(self, "last_profile", None) or "off"))
+
+    def toggle_profiler(self):
+        # Start/stop cProfile + tracemalloc; the dump path shows up on the info page
+        path = self.engine.profiler.toggle()
+        if path: self.last_profile = path
+        self._self_t = 0.0
+        return path
 
     def change_accent(self, name):
         self.accent_color = ACCENTS[name]
         self.config["accent"] = name
+        for g in (self.cpu_gauge, self.ram_gauge): g.set_accent(self.accent_color)
         self.setup_graph()
         ConfigManager.save(self.config)
 
@@ -352,6 +714,8 @@ class MainApp(ctk.CTk):
         new = "Dark" if self.theme_switch.get() else "Light"
         self.config["theme"] = new
         ctk.set_appearance_mode(new)
+        for g in (self.cpu_gauge, self.ram_gauge): g.apply_theme()
+        self.heatmap.restyle(new == "Dark")
         self.setup_graph()
         ConfigManager.save(self.config)
 
@@ -360,6 +724,7 @@ class MainApp(ctk.CTk):
         if self.is_mini:
             self.geometry("280x260")
             self.sidebar.grid_forget()
+            self.core_box.pack_forget()
             self.graph_box.pack_forget()
             self.mini_back_btn.pack(pady=(0, 10))
             self.attributes("-topmost", True)
@@ -367,6 +732,7 @@ class MainApp(ctk.CTk):
             self.geometry("1100x750")
             self.mini_back_btn.pack_forget()
             self.sidebar.grid(row=0, column=0, sticky="nsew")
+            self.core_box.pack(fill="x", pady=(0, 20), before=self.graph_box)
             self.graph_box.pack(fill="both", expand=True)
             self.attributes("-topmost", False)
 
@@ -380,6 +746,7 @@ class MainApp(ctk.CTk):
             self.overlay = None
         else:
             self.overlay = GhostOverlay(self, self.accent_color)
+        self.update_demand()
 
     def toggle_visibility(self):
         if self.state() == "withdrawn":
@@ -388,69 +755,29 @@ class MainApp(ctk.CTk):
             self.after(100, lambda: self.attributes("-topmost", False))
         else:
             self.withdraw()
+        self.update_demand()
 
     def show_processes(self):
-        w = ctk.CTkToplevel(self); w.title("Apex Task Manager"); w.geometry("700x600")
-        w.grid_columnconfigure(0, weight=1)
-        
-        header = ctk.CTkFrame(w, fg_color="transparent")
-        header.pack(fill="x", pady=10)
-        ctk.CTkLabel(header, text="Process Name", font=ctk.CTkFont(size=12, weight="bold"), width=180, anchor="w").pack(side="left", padx=10)
-        ctk.CTkLabel(header, text="CPU%", font=ctk.CTkFont(size=12, weight="bold"), width=60).pack(side="left")
-        ctk.CTkLabel(header, text="RAM (MB)", font=ctk.CTkFont(size=12, weight="bold"), width=80).pack(side="left")
-        ctk.CTkLabel(header, text="Recommendation", font=ctk.CTkFont(size=12, weight="bold"), width=150).pack(side="left")
-        
-        scroll = ctk.CTkScrollableFrame(w)
-        scroll.pack(fill="both", expand=True, padx=10, pady=5)
-        
-        def kill(pid, row_frame):
-            if self.engine.kill_process(pid):
-                row_frame.destroy()
-                messagebox.showinfo("Success", f"PID {pid} terminated")
-            else:
-                messagebox.showerror("Error", "Critical System Process - Access Denied")
-
-        def refresh():
-            for child in scroll.winfo_children(): child.destroy()
-            try:
-                procs = []
-                # Fetch more details: memory and status
-                for p in psutil.process_iter(['pid', 'name', 'username', 'cpu_percent', 'memory_info', 'status']):
-                    try: procs.append(p.info)
-                    except: pass
-                
-                procs = sorted(procs, key=lambda x: x['cpu_percent'] or 0, reverse=True)[:20]
-                
-                for p in procs:
-                    f = ctk.CTkFrame(scroll, fg_color="#2b2b2b" if ctk.get_appearance_mode() == "Dark" else "#f0f0f0")
-                    f.pack(fill="x", pady=2)
-                    
-                    # Risk Assessment
-                    is_sys = not p['username'] or any(s in p['username'].upper() for s in ['SYSTEM', 'LOCAL SERVICE', 'NETWORK SERVICE'])
-                    risk_text = "⚠️ Danger (System)" if is_sys else "✅ Safe (App)"
-                    risk_color = "#e74c3c" if is_sys else "#2ecc71"
-                    if not is_sys and p['cpu_percent'] > 50:
-                        risk_text = "⚡ High Load (Kill?)"
-                        risk_color = "#f1c40f"
-                    
-                    mem_mb = p['memory_info'].rss / (1024 * 1024) if p['memory_info'] else 0
-                    
-                    ctk.CTkLabel(f, text=f"{p['name'][:22]}", width=180, anchor="w", font=ctk.CTkFont(size=11)).pack(side="left", padx=10)
-                    ctk.CTkLabel(f, text=f"{p['cpu_percent']}%", width=60).pack(side="left")
-                    ctk.CTkLabel(f, text=f"{mem_mb:.1f}", width=80).pack(side="left")
-                    ctk.CTkLabel(f, text=risk_text, text_color=risk_color, width=150, font=ctk.CTkFont(size=10, weight="bold")).pack(side="left")
-                    
-                    btn = ctk.CTkButton(f, text="Kill", width=50, height=22, fg_color="#e74c3c", hover_color="#c0392b", command=lambda pid=p['pid'], rf=f: kill(pid, rf))
-                    btn.pack(side="right", padx=10)
-            except: pass
-
-        ctk.CTkButton(w, text="🔄 Refresh List", command=refresh, width=200).pack(pady=15)
-        refresh()
+        if self.proc_win and self.proc_win.winfo_exists():
+            self.proc_win.lift()
+            return
+        self.proc_win = ProcessWindow(self, self.engine)
 
     def on_closing(self):
         self.withdraw() # Default to tray instead of exit
+        self.update_demand()
         return "break"
 
+    def update_demand(self, event=None):
+        # Tells the engine who is looking; hidden to the tray with no overlay lets it go idle
+        if event is not None and event.widget is not self: return
+        visible = self.state() not in ("withdrawn", "iconic")
+        self.engine.set_consumer("window", visible)
+        self.engine.set_consumer("overlay", self.overlay is not None)
+        self.heartbeat.interval = 100 if visible else 1000
+
     def exit_app(self):
+        self.heartbeat.stop()
         self.engine.stop()
+        if self.fleet: self.fleet.stop()
         self.destroy()
@@ -7,24 +7,24 @@ LANGUAGES = {
         "log": "💾 Export Log", "refresh": "Refresh (s)", "appearance": "Theme", "dark": "Dark", "light": "Light",
         "lang": "Language", "overview": "System Overview", "cpu": "CPU Load", "ram": "RAM Usage", "gpu": "GPU Power",
         "batt": "Battery", "disk": "Disk Capacity", "net": "Network Traffic", "proc_list": "Top Processes",
-        "refresh_btn": "Refresh", "mini_mode": "Mini Mode", "accent": "Accent Color", "history": "Performance History (10m)",
-        "ping": "Latency (Ping)", "save": "Save Settings", "start_msg": "Initial Configuration"
+        "refresh_btn": "Refresh", "mini_mode": "Mini Mode", "accent": "Accent Color", "history": "Performance History",
+        "ping": "Latency (Ping)", "save": "Save Settings", "start_msg": "Initial Configuration", "fleet": "🌐 Fleet"
     },
     "Türkçe": {
         "title": "SysPulse Ultimate", "dash": "📊 Panel", "info": "ℹ️ Sistem Bilgisi", "proc": "⚙️ İşlemler",
         "log": "💾 Günlüğü Kaydet", "refresh": "Yenileme (s)", "appearance": "Tema", "dark": "Karanlık", "light": "Aydınlık",
         "lang": "Dil", "overview": "Sistem Özeti", "cpu": "İşlemci", "ram": "Bellek", "gpu": "Ekran Kartı",
         "batt": "Pil", "disk": "Disk Doluluğu", "net": "Ağ Trafiği", "proc_list": "En Çok Tüketenler",
-        "refresh_btn": "Yenile", "mini_mode": "Mini Mod", "accent": "Vurgu Rengi", "history": "Performans Geçmişi (10dk)",
-        "ping": "Gecikme (Ping)", "save": "Ayarları Kaydet", "start_msg": "İlk Yapılandırma"
+        "refresh_btn": "Yenile", "mini_mode": "Mini Mod", "accent": "Vurgu Rengi", "history": "Performans Geçmişi",
+        "ping": "Gecikme (Ping)", "save": "Ayarları Kaydet", "start_msg": "İlk Yapılandırma", "fleet": "🌐 Filo"
     },
     "Deutsch": {
         "title": "SysPulse Ultimate", "dash": "📊 Dashboard", "info": "ℹ️ Systeminfo", "proc": "⚙️ Prozesse",
         "log": "💾 Protokoll", "refresh": "Rate (s)", "appearance": "Thema", "dark": "Dunkel", "light": "Hell",
         "lang": "Sprache", "overview": "Systemübersicht", "cpu": "CPU-Last", "ram": "Speicher", "gpu": "GPU-Leistung",
         "batt": "Batterie", "disk": "Speicherkapazität", "net": "Netzwerktraffic", "proc_list": "Top-Prozesse",
-        "refresh_btn": "Aktualisieren", "mini_mode": "Mini-Modus", "accent": "Akzentfarbe", "history": "Leistungsverlauf (10m)",
-        "ping": "Latenz (Ping)", "save": "Einstellungen speichern", "start_msg": "Erstkonfiguration"
+        "refresh_btn": "Aktualisieren", "mini_mode": "Mini-Modus", "accent": "Akzentfarbe", "history": "Leistungsverlauf",
+        "ping": "Latenz (Ping)", "save": "Einstellungen speichern", "start_msg": "Erstkonfiguration", "fleet": "🌐 Flotte"
     }
 }
 
@@ -37,6 +37,18 @@ ACCENTS = {
     "Pink": "#e91e63"
 }
 
+def disk_rate_text(rates):
+    # Dashboard disk row: Snapshot.disk_io() rates in MB/s
+    return f"R {rates[0]/1048576:.1f} W {rates[1]/1048576:.1f} MB/s"
+
+def collector_errors_text(report):
+    # Info page: failing scheduler jobs from Scheduler.report(), most errors first
+    failing = sorted((r["errors"], name, r["last_error"]) for name, r in report.items() if r.get("errors"))
+    if not failing: return "none"
+    n, name, err = failing[-1]
+    more = f" (+{len(failing) - 1} more)" if len(failing) > 1 else ""
+    return f"{name}: {n}x {err}{more}"
+
 class ConfigManager:
     FILE = "config.json"
     DEFAULTS = {
@@ -44,18 +56,49 @@ class ConfigManager:
         "theme": "Dark",
         "accent": "Blue",
         "refresh_rate": 1.0,
+        "chart_engine": "matplotlib",
+        "chart_range": "10m",
+        "backend": "auto",
+        "sampler": "thread",
+        "sampler_name": "syspulse",
+        "adaptive": True,
+        "adaptive_ceiling": 10.0,
+        "adaptive_visible_ceiling": 2.0,
+        "adaptive_threshold": 5.0,
+        "adaptive_idle_factor": 4.0,
+        "sensor_periods": {"temp": 2.0, "fan": 5.0, "in": 10.0},
+        "exporter_port": 0,
+        "exporter_host": "127.0.0.1",
+        "fleet_target": "",
+        "fleet_name": "",
+        "fleet_port": 0,
+        "fleet_host": "0.0.0.0",
+        "history_retention_hours": 24,
+        "archive_enabled": True,
+        "archive_dir": "archive",
+        "archive_retention_days": 7,
+        "attribution": True,
+        "attribution_slots": 64,
+        "alert_rules": [
+            {"metric": "cpu", "threshold": 92, "clear": 85, "min_duration": 3, "cooldown": 60},
+            {"metric": "ram", "threshold": 92, "clear": 88, "min_duration": 3, "cooldown": 60}
+        ],
+        "alert_sinks": ["sound", "file", "desktop"],
+        "alert_webhook": "",
+        "profile_dir": "profiles",
         "first_run": True
     }
 
     @staticmethod
     def load():
         if not os.path.exists(ConfigManager.FILE):
-            return ConfigManager.DEFAULTS
+            return ConfigManager.DEFAULTS.copy()
         try:
             with open(ConfigManager.FILE, "r") as f:
-                return json.load(f)
+                # Keys added in newer versions fall back to their defaults
+                return {**ConfigManager.DEFAULTS, **json.load(f)}
         except:
-            return ConfigManager.DEFAULTS
+            return ConfigManager.DEFAULTS.copy()
 
     @staticmethod
     def save(config):
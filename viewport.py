@@ -0,0 +1,149 @@
+import bisect
+import time
+
+# History chart ranges: preset -> span in seconds
+RANGES = {"1m": 60, "10m": 600, "1h": 3600, "24h": 86400}
+# Zoomed windows up to this long are decoded at full resolution from the compressed chunks (then LTTB);
+# anything longer, and every live range past the raw window, is drawn from the roll-up tiers
+FULL_RES_SPAN = 7200
+
+def minmax(xs, ys, n):
+    # Min and max of each of n // 2 equal-count buckets, in time order: every spike survives
+    m = len(xs)
+    if m <= n or n < 2: return list(xs), list(ys)
+    buckets = n // 2
+    ox, oy = [], []
+    for b in range(buckets):
+        lo, hi = b * m // buckets, (b + 1) * m // buckets
+        if hi <= lo: continue
+        seg = ys[lo:hi]
+        i, j = lo + seg.index(min(seg)), lo + seg.index(max(seg))
+        for k in ((i, j) if i <= j else (j, i)):
+            ox.append(xs[k])
+            oy.append(ys[k])
+    return ox, oy
+
+def lttb(xs, ys, n):
+    # Largest-Triangle-Three-Buckets (Steinarsson, 2013): keeps first and last point and, per bucket, the
+    # point forming the largest triangle with the previously kept point and the next bucket's average
+    m = len(xs)
+    if m <= n or n < 3: return list(xs), list(ys)
+    every = (m - 2) / (n - 2)
+    ox, oy = [xs[0]], [ys[0]]
+    a = 0
+    for i in range(n - 2):
+        lo, hi = int(i * every) + 1, int((i + 1) * every) + 1
+        s, e = hi, min(int((i + 2) * every) + 1, m)
+        if e <= s: s, e = m - 1, m
+        avx = sum(xs[s:e]) / (e - s)
+        avy = sum(ys[s:e]) / (e - s)
+        ax, ay = xs[a], ys[a]
+        best, area = lo, -1.0
+        for j in range(lo, hi):
+            ar = abs((ax - avx) * (ys[j] - ay) - (ax - xs[j]) * (avy - ay))
+            if ar > area: area, best = ar, j
+        ox.append(xs[best])
+        oy.append(ys[best])
+        a = best
+    ox.append(xs[-1])
+    oy.append(ys[-1])
+    return ox, oy
+
+class Viewport:
+    # What the history chart shows: a live preset that follows the newest sample, or a fixed zoomed window.
+    # query() gives at most ~width points per series with x in seconds relative to the window end (<= 0),
+    # so the chart's x limits only change with the range, not every tick. Decimated data is cached per series
+    # and viewport (preset or zoom window, width) and only recomputed when its source has moved on.
+    def __init__(self, history, keys, preset="10m", clock=time.time):
+        self.history = history
+        self.keys = keys
+        self.clock = clock
+        self.preset = preset
+        self.zoomed = None  # (start, end) absolute
+        self.end = None  # end of the last drawn window, to map chart x back to time
+        self._cache = {}
+
+    def set_range(self, preset):
+        self.preset = preset
+        self.zoomed = None
+        self._cache.clear()
+
+    def zoom(self, x0, x1):
+        # x0/x1 in chart units (seconds relative to the drawn window end)
+        if self.end is None or abs(x1 - x0) < 1: return
+        lo, hi = sorted((x0, x1))
+        self.zoomed = (self.end + lo, self.end + hi)
+        self._cache.clear()
+
+    def reset(self):
+        self.set_range(self.preset)
+
+    def window(self):
+        if self.zoomed: return self.zoomed
+        end = self.clock()
+        return end - RANGES[self.preset], end
+
+    def query(self, width):
+        start, end = self.window()
+        self.end = end
+        n = max(16, int(width))
+        out = {}
+        for key in self.keys:
+            xs, ys = self._series(key, start, end, n)
+            out[key] = ([x - end for x in xs], ys)
+        return out, (start - end, 0.0)
+
+    def _series(self, key, start, end, n):
+        s = self.history.get(key)
+        if s is None or not s.t.count: return [], []
+        t = s.t.valid()
+        span = end - start
+        # Live windows slide every tick, so they are keyed by preset and revalidated by their source's stamp
+        view = (self.zoomed or self.preset, n)
+        # Raw window covers it (or holds everything recorded so far): slice, then min/max if there are more
+        # samples than pixels. At a fast refresh the raw window can be shorter than a preset; the tiers
+        # then have the older part.
+        if t[0] <= start or s.t.count < s.t.capacity:
+            stamp = (s.t.last(), s.t.count)
+            hit = self._cache.get(key)
+            if hit and hit[:2] == (stamp, view): return hit[2]
+            i = bisect.bisect_left(t, start)
+            j = bisect.bisect_right(t, end)
+            res = minmax(t[i:j].tolist(), s.raw.valid()[i:j].tolist(), n)
+        elif self.zoomed and span <= FULL_RES_SPAN and s.chunks:
+            # Fixed window at full resolution; cached until new samples land inside it
+            stamp = min(end, s.t.last())
+            hit = self._cache.get(key)
+            if hit and hit[:2] == (stamp, view): return hit[2]
+            xs, ys = s.range(start, end)
+            res = lttb(xs, ys, n)
+        else:
+            # Finest roll-up tier long enough for the span; each bucket contributes its low and high
+            if not s.tiers: return [], []
+            tier = s.tiers[-1]
+            for tr in s.tiers:
+                if tr.resolution * tr.t.capacity >= span:
+                    tier = tr
+                    break
+            # The bucket still filling is only in the raw window; it is spliced in while it is wider than
+            # about a pixel (so the newest seconds of a short range are not missing)
+            tail = tier.resolution * n > span
+            stamp = (tier.t.last(), tier.t.count, s.t.last() if tail else None)
+            hit = self._cache.get(key)
+            if hit and hit[:2] == (stamp, view): return hit[2]
+            tt = tier.t.valid()
+            i = bisect.bisect_left(tt, start - tier.resolution)
+            j = bisect.bisect_right(tt, end)
+            half = tier.resolution / 2
+            xs, ys = [], []
+            for x, lo, hi in zip(tt[i:j].tolist(), tier.lo.valid()[i:j].tolist(), tier.hi.valid()[i:j].tolist()):
+                xs += (x, x + half)
+                ys += (lo, hi)
+            if tail:
+                k = bisect.bisect_left(t, max(tt[-1] + tier.resolution if len(tt) else start, start))
+                m = bisect.bisect_right(t, end)
+                xs += t[k:m].tolist()
+                ys += s.raw.valid()[k:m].tolist()
+            res = minmax(xs, ys, n)
+        self._cache[key] = (stamp, view, res)
+        return res